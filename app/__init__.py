@@ -17,14 +17,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_cors import CORS
-from flask_mail import Mail
 from .config import Config
 from .health_monitoring.events import socketio
 
 # Initialize Flask extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
-mail = Mail()
 
 def create_app():
     """
@@ -42,13 +40,32 @@ def create_app():
     db.init_app(app)
     migrate = Migrate(app, db)
     CORS(app)
-    mail.init_app(app)
     socketio.init_app(app, async_mode="eventlet", cors_allowed_origins="*")
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
     
     from .chat_app import chat_socket
     from .health_monitoring import events
+    events.broadcaster.init_app(app)
+    events.alert_engine.init_app(app)
+    
+    from .sms_utils.sms_queue import sms_dispatcher
+    sms_dispatcher.init_app(app)
+    
+    from .email_utils.email_queue import email_dispatcher
+    email_dispatcher.init_app(app)
+    
+    from .auth.otp import otp_manager
+    otp_manager.init_app(app)
+    
+    from .chatbot.response_cache import response_cache
+    response_cache.init_app(app)
+    
+    from .chatbot.language import language_detector
+    language_detector.init_app(app)
+    
+    from .chatbot.memory import conversation_memory
+    conversation_memory.init_app(app)
     
     # Import blueprints
     from .auth import auth_bp as auth_blueprint
@@ -68,13 +85,14 @@ def create_app():
     app.register_blueprint(health_monitoring_blueprint, url_prefix='/health-monitoring')
     app.register_blueprint(chat_app_blueprint, url_prefix='/chat-app')
     
-    # Import models
-    from .models import User
+    # Cache the logged-in user and their profile between requests
+    from .identity import identity_cache
+    identity_cache.init_app(app)
     
     @login_manager.user_loader
     def load_user(user_id):
         """
-        Function to load a user object from the database.
+        Function to load a user object, from the identity cache when possible.
 
         Args:
             user_id (int): The ID of the user to load.
@@ -82,6 +100,6 @@ def create_app():
         Returns:
             User: The user object corresponding to the user ID.
         """
-        return User.query.get(int(user_id))
+        return identity_cache.load_user(int(user_id))
     
     return app
\ No newline at end of file
@@ -13,7 +13,7 @@ from flask_wtf import FlaskForm
 from wtforms import SelectField, IntegerField, SubmitField, StringField, FileField, TextAreaField, PasswordField
 from wtforms.validators import DataRequired, Length, Email, EqualTo, NumberRange, InputRequired, Regexp
 from flask_wtf.file import FileAllowed, FileRequired
-from app.utils import KENYA_COUNTIES
+from app.utils import KENYA_COUNTIES, VET_SPECIALIZATIONS
 
 class RoleSelectForm(FlaskForm):
     """
@@ -155,15 +155,7 @@ class VetRegistrationForm(BaseRegistrationForm):
     
     specialization = SelectField(
         'Specialization *',
-        choices=[
-            ('', 'Select Specialization'),
-            ('cattle', 'Cattle'),
-            ('poultry', 'Poultry'),
-            ('sheep', 'Sheep'),
-            ('goat', 'Goat'),
-            ('pig', 'Pig'),
-            ('general', 'General')
-            ],
+        choices=VET_SPECIALIZATIONS,
         validators=[DataRequired()]
         )
     
@@ -0,0 +1,168 @@
+"""
+This module issues and verifies the one-time passwords of the login flow.
+
+It provides the following:
+- OTPRateLimited: Raised when a user or client asks for or tries too many OTPs
+- OTPManager: Rate-limited OTP issuance and verification with a short-lived user cache
+- otp_manager: The process-wide manager instance
+
+Issuing an OTP only queues the SMS (see app.sms_utils.sms_queue), so login
+responds without waiting for the SMS provider; the verification page polls
+the message's delivery status instead. Issuance and verification are limited
+per user and per client IP with in-memory token buckets. The few user fields
+verification needs are cached when the OTP is issued, so verification
+attempts do not query the database.
+"""
+
+import pyotp
+
+from app.cache import TTLCache
+from app.models import db, User
+from app.ratelimit import TokenBucketLimiter
+from app.sms_utils.sms_queue import queue_sms, sms_dispatcher
+from app.sms_utils.sms_templates import otp_template
+
+
+class OTPRateLimited(Exception):
+    """
+    Raised when an OTP is requested or tried too often.
+
+    Attributes:
+        retry_after (float): Seconds until the next attempt would be allowed.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many attempts, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class OTPManager:
+    """
+    Rate-limited OTP issuance and verification.
+
+    Attributes:
+        issue_limiter (TokenBucketLimiter): OTPs sent per user.
+        verify_limiter (TokenBucketLimiter): Verification attempts per user.
+        ip_limiter (TokenBucketLimiter): Logins and verification attempts per client IP.
+        pending (TTLCache): User records of issued OTPs by user ID.
+    """
+
+    def __init__(self):
+        self.issue_limiter = TokenBucketLimiter(capacity=3, refill_seconds=60)
+        self.verify_limiter = TokenBucketLimiter(capacity=5, refill_seconds=30)
+        self.ip_limiter = TokenBucketLimiter(capacity=20, refill_seconds=6)
+        self.pending = TTLCache(maxsize=10000, ttl=300)
+
+    def init_app(self, app):
+        """
+        Configure the rate limits and the cache lifetime from the Flask application.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.issue_limiter = TokenBucketLimiter(app.config.get('OTP_ISSUE_BURST', 3),
+                                                app.config.get('OTP_ISSUE_REFILL_SECONDS', 60))
+        self.verify_limiter = TokenBucketLimiter(app.config.get('OTP_VERIFY_BURST', 5),
+                                                 app.config.get('OTP_VERIFY_REFILL_SECONDS', 30))
+        self.ip_limiter = TokenBucketLimiter(app.config.get('OTP_IP_BURST', 20),
+                                             app.config.get('OTP_IP_REFILL_SECONDS', 6))
+        self.pending = TTLCache(maxsize=10000, ttl=app.config.get('OTP_CACHE_SECONDS', 300))
+
+    def check_ip(self, ip):
+        """
+        Count an attempt from a client IP against its limit.
+
+        Args:
+            ip (str): The client's IP address.
+
+        Raises:
+            OTPRateLimited: If the IP made too many attempts.
+        """
+        wait = self.ip_limiter.hit(ip)
+        if wait:
+            raise OTPRateLimited(wait)
+
+    def issue(self, user):
+        """
+        Queue an OTP SMS for a user and cache what verification needs.
+
+        Args:
+            user (User): The user who passed the password check.
+
+        Returns:
+            int: The ID of the queued SMS, for delivery status checks.
+
+        Raises:
+            OTPRateLimited: If the user was sent too many OTPs recently.
+        """
+        wait = self.issue_limiter.hit(user.id)
+        if wait:
+            raise OTPRateLimited(wait)
+
+        self.pending.set(user.id, {"otp_secret": user.otp_secret, "email": user.email})
+
+        return queue_sms(
+            phone_number=user.phone.lstrip('+'),
+            message=otp_template(pyotp.TOTP(user.otp_secret).now()),
+            ref_id='OTP',
+        )
+
+    def pending_user(self, user_id):
+        """
+        Get the cached record of a user waiting to verify an OTP, loading it if it expired.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            dict: The user's otp_secret and email, or None if the user does not exist.
+        """
+        record = self.pending.get(user_id)
+        if record is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return None
+            record = {"otp_secret": user.otp_secret, "email": user.email}
+            self.pending.set(user_id, record)
+        return record
+
+    def verify(self, user_id, otp):
+        """
+        Check an OTP entered by a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            otp (str): The code the user entered.
+
+        Returns:
+            bool: True if the code is valid.
+
+        Raises:
+            OTPRateLimited: If the user tried too many codes recently.
+        """
+        wait = self.verify_limiter.hit(user_id)
+        if wait:
+            raise OTPRateLimited(wait)
+
+        record = self.pending_user(user_id)
+        if record is None or not pyotp.TOTP(record["otp_secret"]).verify(otp, valid_window=1):
+            return False
+
+        self.pending.delete(user_id)
+        self.verify_limiter.reset(user_id)
+        return True
+
+    def delivery_status(self, sms_id):
+        """
+        Get the delivery status of an OTP SMS.
+
+        Args:
+            sms_id (int): The ID returned by issue().
+
+        Returns:
+            str: "pending", "sent" or "failed", or None if unknown.
+        """
+        return sms_dispatcher.status(sms_id) if sms_id else None
+
+
+otp_manager = OTPManager()
@@ -3,28 +3,30 @@ This module defines the routes for authentication-related functionalities in the
 
 It includes the following routes:
 - User login
+- OTP verification, resend and delivery status
 - User registration
 - User logout
 
 Functions:
 - login(): Handles user login.
+- verify_otp(): Verifies the OTP and logs the user in.
+- resend_otp(): Sends a new OTP.
+- otp_status(): Returns the delivery status of the last OTP SMS.
 - register(): Handles user registration.
 - logout(): Logs out the current user.
 """
 
-from flask import current_app,  render_template, request, redirect, url_for, flash, jsonify, session
+from flask import render_template, request, redirect, url_for, flash, jsonify, session
 from flask_login import login_user, logout_user, login_required
-from flask_mail import Message
-import pyotp
 from werkzeug.utils import secure_filename
 from app.models import db, User, Vet, Farmer, Location
 from app.utils import allowed_file
 from .forms import RoleSelectForm, FarmerRegistrationForm, VetRegistrationForm, LoginForm, OTPForm, ForgotPasswordForm, ResetPasswordForm
 from app.utils import COUNTY_TOWNS
 from .utils import register_user, get_serializer, verify_email_token, send_verification_email
-from app import mail
-from app.sms_utils.sms_service import send_sms
-from app.sms_utils.sms_templates import otp_template
+from app.email_utils.email_queue import queue_email
+from app.identity import identity_cache
+from .otp import otp_manager, OTPRateLimited
 
 from . import auth_bp
 
@@ -171,6 +173,12 @@ def login():
             flash('Please fill in all fields', 'warning')
             return redirect(url_for('auth.login'))
         
+        try:
+            otp_manager.check_ip(request.remote_addr)
+        except OTPRateLimited as e:
+            flash(f'Too many login attempts, please try again in {e.retry_after:.0f} seconds', 'danger')
+            return redirect(url_for('auth.login'))
+        
         user = User.query.filter(User.email == email).first()
         
         if user and user.check_password(password):
@@ -178,23 +186,20 @@ def login():
                 flash('Please verify your email address to log in', 'warning')
                 return redirect(url_for('auth.login'))
         
-            session['email'] = email # Store the email in the session
+            # Upgrade the hash if the hashing parameters changed since it was made
+            if user.password_needs_rehash():
+                user.set_password(password)
+                db.session.commit()
         
-            # Generate 6-digit OTP
-            otp = pyotp.TOTP(user.otp_secret).now()
-            print('OTP:', otp)
-            
-            # Send OTP to user's phone
-            send_sms(
-                phone_number=user.phone.lstrip('+'),
-                message=otp_template(otp),
-                ref_id='OTP',
-            )
+            session['email'] = email # Store the email in the session
+            session['otp_user_id'] = user.id
         
-            # Send OTP to user's email
-            msg = Message('Your 2FA Code', sender=current_app.config['MAIL_USERNAME'], recipients=[email])
-            msg.body = f'Your One-Time password (OTP) is: {otp}'
-            # mail.send(msg)
+            # Queue the OTP to the user's phone; the verify page tracks its delivery
+            try:
+                session['otp_sms_id'] = otp_manager.issue(user)
+            except OTPRateLimited as e:
+                flash(f'Too many codes requested, please try again in {e.retry_after:.0f} seconds', 'danger')
+                return redirect(url_for('auth.verify_otp'))
         
             flash('A 6-digit OTP has been sent to your phone', 'info')
             return redirect(url_for('auth.verify_otp'))
@@ -218,7 +223,7 @@ def verify_otp():
     Returns:
         Response: Rendered HTML template for the OTP verification page or redirects to the appropriate profile page.
     """
-    if 'email' not in session:
+    if 'otp_user_id' not in session:
         flash('Unauthorized access', 'warning')
         return redirect(url_for('auth.login'))
     
@@ -227,41 +232,83 @@ def verify_otp():
         print('Form validated successfully')
         otp = form.otp.data
         
-        user = User.query.filter(User.email == session['email']).first()
+        try:
+            otp_manager.check_ip(request.remote_addr)
+            verified = otp_manager.verify(session['otp_user_id'], otp)
+        except OTPRateLimited as e:
+            flash(f'Too many attempts, please try again in {e.retry_after:.0f} seconds', 'danger')
+            return render_template('verify_otp.html', form=form), 429
+        
+        user = identity_cache.load_user(session['otp_user_id']) if verified else None
 
         if user:
-            print(f'Stored OTP secret: {user.otp_secret}')
-            print(f'Entered OTP: {otp}')
-            print(f'Generated OTP: {pyotp.TOTP(user.otp_secret).now()}')
-
-            if pyotp.TOTP(user.otp_secret).verify(otp, valid_window=1):
-                session['user_id'] = user.id # Store the user ID in the session
-                session['username'] = user.last_name # Store the username in the session
-                print(f'Logged in user: {user.email}')
-                login_user(user)
-                print('Logged in successfully')
-                flash('You have successfully logged in', 'success')
-                
-                print(f'User role: {user.user_role}')
-                
-                if user.user_role == 'farmer':
-                    return redirect(url_for('farmer.farmer_profile'))
-                elif user.user_role == 'vet':
-                    return redirect(url_for('vet.vet_profile'))
-                elif user.user_role == 'admin':
-                    return redirect(url_for('admin.admin_profile'))
-                
-                flash('Invalid user role', 'danger')
-                return redirect(url_for('auth.login'))
+            session.pop('otp_user_id', None)
+            session.pop('otp_sms_id', None)
+            session['user_id'] = user.id # Store the user ID in the session
+            session['username'] = user.last_name # Store the username in the session
+            print(f'Logged in user: {user.email}')
+            login_user(user)
+            print('Logged in successfully')
+            flash('You have successfully logged in', 'success')
             
-            else:
-                flash('Invalid OTP', 'danger')
-                print('OTP verification failed')
+            print(f'User role: {user.user_role}')
+            
+            if user.user_role == 'farmer':
+                return redirect(url_for('farmer.farmer_profile'))
+            elif user.user_role == 'vet':
+                return redirect(url_for('vet.vet_profile'))
+            elif user.user_role == 'admin':
+                return redirect(url_for('admin.admin_profile'))
+            
+            flash('Invalid user role', 'danger')
+            return redirect(url_for('auth.login'))
+        
+        else:
+            flash('Invalid OTP', 'danger')
+            print('OTP verification failed')
     else:
         print('Form validation failed', form.errors)
         
     return render_template('verify_otp.html', form=form)
 
+@auth_bp.route('/resend-otp', methods=['POST'])
+def resend_otp():
+    """
+    Route to send a new OTP to a user who passed the password check.
+
+    Returns:
+        Response: Redirects to the OTP verification page.
+    """
+    if 'otp_user_id' not in session:
+        flash('Unauthorized access', 'warning')
+        return redirect(url_for('auth.login'))
+    
+    user = identity_cache.load_user(session['otp_user_id'])
+    if user is None:
+        return redirect(url_for('auth.login'))
+    
+    try:
+        otp_manager.check_ip(request.remote_addr)
+        session['otp_sms_id'] = otp_manager.issue(user)
+        flash('A new OTP has been sent to your phone', 'info')
+    except OTPRateLimited as e:
+        flash(f'Too many codes requested, please try again in {e.retry_after:.0f} seconds', 'danger')
+    
+    return redirect(url_for('auth.verify_otp'))
+
+@auth_bp.route('/otp-status', methods=['GET'])
+def otp_status():
+    """
+    Route to report the delivery status of the last OTP SMS.
+
+    Returns:
+        Response: JSON object with the status ("pending", "sent" or "failed").
+    """
+    if 'otp_user_id' not in session:
+        return jsonify({"status": "error", "message": "Unauthorized access"}), 403
+    
+    return jsonify({"status": otp_manager.delivery_status(session.get('otp_sms_id'))}), 200
+
 @auth_bp.route('/forgot-password', methods=['GET', 'POST'])
 def forgot_password():
     """
@@ -285,11 +332,9 @@ def forgot_password():
             token = s.dumps(email, salt='password-reset-salt')
             reset_url = url_for('auth.reset_password', token=token, _external=True)
             
-            msg = Message('Password Reset Request', sender=current_app.config['MAIL_USERNAME'], recipients=[email])
-            msg.body = f'Click the link below to reset your password:\n{reset_url}'
-            
             try:
-                # mail.send(msg)
+                queue_email(email, 'Password Reset Request',
+                            f'Click the link below to reset your password:\n{reset_url}')
                 flash('A password reset link has been sent to your email.', 'info')
             except Exception as e:
                 flash('An error occured sending password-reset email', 'danger')
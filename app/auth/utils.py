@@ -1,8 +1,8 @@
 from flask import flash, current_app, url_for
 from flask_login import login_user
 from itsdangerous import URLSafeTimedSerializer
-from flask_mail import Message
-from app import db, mail
+from app import db
+from app.email_utils.email_queue import queue_email
 from app.models import User, Location, Farmer, Vet
 from app.utils import save_file
 import pyotp
@@ -134,11 +134,9 @@ def send_verification_email(user):
     
     verify_url = url_for('auth.verify_email', token=token, _external=True)
     
-    msg = Message('Confirm Your Email Address', sender=current_app.config['MAIL_USERNAME'], recipients=[user.email])
-    msg.body = f'Click the link below to verify your email address:\n{verify_url}'
-    
     try:
-        # mail.send(msg)
+        queue_email(user.email, 'Confirm Your Email Address',
+                    f'Click the link below to verify your email address:\n{verify_url}')
         flash('A verification email has been sent to your email address.', 'info')
     except Exception as e:
         flash('An error occurred sending the verification email.', 'danger')
@@ -0,0 +1,102 @@
+"""
+This module provides a small in-process cache for the Flask application.
+
+Classes:
+- TTLCache: A thread-safe LRU cache whose entries expire after a fixed time.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A thread-safe LRU cache whose entries expire ttl seconds after they are set.
+
+    Attributes:
+        maxsize (int): Maximum number of entries; the least recently used is evicted.
+        ttl (float): Seconds an entry stays valid.
+        hits (int): Number of get() calls that found a valid entry.
+        misses (int): Number of get() calls that did not.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key: The cache key.
+            default: Value returned if the key is missing or expired.
+
+        Returns:
+            The cached value, or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """
+        Cache a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+            ttl (float): Seconds the entry stays valid, defaults to the cache's ttl.
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove a key from the cache if it is present.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Get the cache's size and hit rate.
+
+        Returns:
+            dict: Entry count, hits, misses and hit_rate (None before the first get()).
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
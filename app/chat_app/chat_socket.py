@@ -1,16 +1,82 @@
+"""
+This module handles the Socket.IO events of farmer-vet chat conversations.
+
+Each conversation has its own room that only its two members may join, so a
+message is emitted to the sockets of that conversation instead of every
+connected client. Messages are stored before they are emitted.
+"""
+
+from flask import request
+from flask_login import current_user
+from flask_socketio import emit, join_room, leave_room
+
 from app.health_monitoring.extensions import socketio
-from flask_socketio import emit
+
+from .conversations import MAX_MESSAGE_LENGTH, conversation_room, is_member, post_message
+
+
+def _conversation_id(data):
+    """Get the conversation ID of an event's data, or None if it has none"""
+    if not isinstance(data, dict):
+        return None
+    try:
+        return int(data.get('conversation_id'))
+    except (TypeError, ValueError):
+        return None
+
+
+@socketio.on('join_conversation')
+def handle_join_conversation(data):
+    """
+    Join the room of a conversation of the connected user.
+
+    Args:
+        data (dict): The data received from the client, with a conversation_id.
+    """
+    conversation_id = _conversation_id(data)
+    if not current_user.is_authenticated or conversation_id is None or not is_member(conversation_id, current_user.id):
+        print(f"❌ Client {request.sid} may not join conversation {data}")
+        return {"status": "error", "message": "Conversation not found"}
+
+    join_room(conversation_room(conversation_id))
+    return {"status": "success"}
+
+
+@socketio.on('leave_conversation')
+def handle_leave_conversation(data):
+    """
+    Leave the room of a conversation.
+
+    Args:
+        data (dict): The data received from the client, with a conversation_id.
+    """
+    conversation_id = _conversation_id(data)
+    if conversation_id is not None:
+        leave_room(conversation_room(conversation_id))
+
 
 @socketio.on("message")
 def handle_message(data):
     """
     Handle incoming messages from clients.
     
-    This function is triggered when a message is received from a client.
-    It emits the message back to all connected clients.
+    Stores the message and emits it to the members of its conversation.
     
     Args:
-        data (dict): The data received from the client.
+        data (dict): The data received from the client, with a conversation_id and text.
     """
-    # Emit the message back to all connected clients
-    emit("message", data, broadcast=True)
\ No newline at end of file
+    conversation_id = _conversation_id(data)
+    if not current_user.is_authenticated or conversation_id is None or not is_member(conversation_id, current_user.id):
+        return {"status": "error", "message": "Conversation not found"}
+
+    text = str(data.get('text') or '').strip()
+    if not text:
+        return {"status": "error", "message": "Message is empty"}
+    if len(text) > MAX_MESSAGE_LENGTH:
+        return {"status": "error", "message": f"Messages are limited to {MAX_MESSAGE_LENGTH} characters"}
+
+    message = post_message(conversation_id, current_user, text)
+    
+    # Emit the message to the conversation's members only
+    emit("message", message, to=conversation_room(conversation_id))
+    return {"status": "success", "id": message["id"]}
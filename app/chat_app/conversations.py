@@ -0,0 +1,196 @@
+"""
+This module stores and reads farmer-vet chat conversations.
+
+It provides the following:
+- conversation_room(): Name of the Socket.IO room of a conversation
+- start_conversation(): Get or create the conversation of a farmer and a vet
+- user_conversations(): The conversations of a user, most recently active first
+- conversation_members(): The two members of a conversation, cached
+- is_member(): Whether a user takes part in a conversation
+- message_history(): A page of a conversation's messages, by keyset
+- post_message(): Store a message and build the payload emitted to the room
+
+Messages are appended to chat_messages and read newest first through the
+(conversation_id, id) index, so loading older history costs the same on the
+first page as on the hundredth. Membership of a conversation never changes,
+so it is cached and checking it does not query the database per message.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from app.cache import TTLCache
+from app.models import db, User, Conversation, ChatMessage
+
+MESSAGES_PER_PAGE = 50
+MAX_MESSAGE_LENGTH = 2000
+
+# Farmer and vet user IDs of recently used conversations by conversation ID
+_members = TTLCache(maxsize=10000, ttl=3600)
+
+
+def conversation_room(conversation_id):
+    """Name of the room that receives the messages of a conversation"""
+    return f"conversation_{conversation_id}"
+
+
+def start_conversation(user, other_user_id):
+    """
+    Get or create the conversation between a user and a user of the other role.
+
+    Args:
+        user (User): The current user, a farmer or a vet.
+        other_user_id (int): The ID of the vet or farmer to talk to.
+
+    Returns:
+        Conversation: The conversation, or None if the two are not a farmer and a vet.
+    """
+    other = db.session.get(User, other_user_id)
+    if other is None:
+        return None
+
+    roles = {user.user_role: user.id, other.user_role: other.id}
+    if set(roles) != {'farmer', 'vet'}:
+        return None
+
+    conversation = Conversation.query.filter_by(farmer_id=roles['farmer'], vet_id=roles['vet']).first()
+    if conversation is not None:
+        return conversation
+
+    conversation = Conversation(farmer_id=roles['farmer'], vet_id=roles['vet'])
+    db.session.add(conversation)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Both users started the conversation at the same time
+        db.session.rollback()
+        conversation = Conversation.query.filter_by(farmer_id=roles['farmer'], vet_id=roles['vet']).first()
+    return conversation
+
+
+def user_conversations(user_id):
+    """
+    Get the conversations of a user with the name of the other member.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        list: (conversation, other_name) tuples, most recently active first.
+    """
+    Other = db.aliased(User)
+    rows = db.session.query(Conversation, Other.first_name, Other.last_name).join(
+        Other, db.case((Conversation.farmer_id == user_id, Conversation.vet_id), else_=Conversation.farmer_id) == Other.id
+    ).filter(
+        or_(Conversation.farmer_id == user_id, Conversation.vet_id == user_id)
+    ).order_by(
+        Conversation.last_message_at.is_(None), Conversation.last_message_at.desc(), Conversation.id.desc()
+    ).all()
+
+    conversations = []
+    for conversation, first_name, last_name in rows:
+        _members.set(conversation.id, (conversation.farmer_id, conversation.vet_id))
+        conversations.append((conversation, f"{first_name} {last_name}"))
+    return conversations
+
+
+def conversation_members(conversation_id):
+    """
+    Get the members of a conversation.
+
+    Args:
+        conversation_id (int): The ID of the conversation.
+
+    Returns:
+        tuple: (farmer_id, vet_id), or None if the conversation does not exist.
+    """
+    members = _members.get(conversation_id)
+    if members is None:
+        row = db.session.query(Conversation.farmer_id, Conversation.vet_id).filter_by(id=conversation_id).first()
+        if row is None:
+            return None
+        members = tuple(row)
+        _members.set(conversation_id, members)
+    return members
+
+
+def is_member(conversation_id, user_id):
+    """
+    Check whether a user takes part in a conversation.
+
+    Args:
+        conversation_id (int): The ID of the conversation.
+        user_id (int): The ID of the user.
+
+    Returns:
+        bool: True if the user is the conversation's farmer or vet.
+    """
+    members = conversation_members(conversation_id)
+    return members is not None and user_id in members
+
+
+def _payload(message, sender_name):
+    """Build the JSON form of a message sent to clients"""
+    return {
+        "id": message.id,
+        "conversation_id": message.conversation_id,
+        "sender_id": message.sender_id,
+        "username": sender_name,
+        "text": message.body,
+        "time": message.created_at.isoformat() + "Z",
+    }
+
+
+def message_history(conversation_id, before=None, limit=MESSAGES_PER_PAGE):
+    """
+    Get a page of a conversation's messages.
+
+    Args:
+        conversation_id (int): The ID of the conversation.
+        before (int): Only return messages with a smaller ID, i.e. older ones.
+        limit (int): Maximum number of messages.
+
+    Returns:
+        tuple: (messages, next_before) where messages are message payloads,
+            oldest first, and next_before is the cursor of the previous page
+            or None if there are no older messages.
+    """
+    query = db.session.query(ChatMessage, User.first_name, User.last_name).join(
+        User, ChatMessage.sender_id == User.id
+    ).filter(ChatMessage.conversation_id == conversation_id)
+    if before is not None:
+        query = query.filter(ChatMessage.id < before)
+    rows = query.order_by(ChatMessage.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    messages = [_payload(message, f"{first_name} {last_name}") for message, first_name, last_name in reversed(rows)]
+    next_before = messages[0]["id"] if has_more else None
+    return messages, next_before
+
+
+def post_message(conversation_id, sender, text):
+    """
+    Store a message in a conversation.
+
+    Args:
+        conversation_id (int): The ID of the conversation.
+        sender (User): The user sending the message, who must be a member.
+        text (str): The text of the message.
+
+    Returns:
+        dict: The message payload to emit to the conversation's room.
+    """
+    message = ChatMessage(conversation_id=conversation_id, sender_id=sender.id,
+                          body=text, created_at=datetime.utcnow())
+    db.session.add(message)
+    db.session.execute(
+        db.update(Conversation).where(Conversation.id == conversation_id).values(last_message_at=message.created_at)
+    )
+    db.session.flush()
+    # Built before the commit expires the message, which would reload it
+    payload = _payload(message, sender.full_name)
+    db.session.commit()
+    return payload
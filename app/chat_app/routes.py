@@ -1,21 +1,86 @@
 # chat_app/routes.py
+"""
+This module defines the routes of the farmer-vet chat application.
 
-from flask import render_template, session, redirect, url_for
+It includes the following routes:
+- Render the chat application page
+- Start a conversation with a farmer or vet
+- Page through the history of a conversation
+
+Functions:
+- chat_app(): Renders the chat page with the user's conversations.
+- start_chat(): Opens the conversation with another user, starting it if needed.
+- conversation_messages(): Returns a page of a conversation's messages.
+"""
+
+from flask import render_template, request, redirect, url_for, flash, jsonify, abort
+from flask_login import login_required, current_user
 from . import chat_app_bp
+from .conversations import MESSAGES_PER_PAGE, start_conversation, user_conversations, is_member, message_history
 
 @chat_app_bp.route('/')
+@login_required
 def chat_app():
     """
     Render the chat application page.
     
-    This function handles the rendering of the chat application page.
-    It checks if the user is logged in and renders the appropriate template.
+    Lists the user's conversations and opens the one selected with the
+    conversation query parameter, or the most recently active one.
     
     Returns:
         str: Rendered HTML template for the chat application page.
     """
-    # Check if user is logged in
-    if 'user_id' not in session:
-        return redirect(url_for('auth.login'))
+    conversations = user_conversations(current_user.id)
+    
+    selected = request.args.get('conversation', type=int)
+    if selected is None and conversations:
+        selected = conversations[0][0].id
+    elif selected is not None and not any(conversation.id == selected for conversation, _ in conversations):
+        abort(404)
+
+    return render_template('chat_app.html', username=current_user.full_name, user_id=current_user.id,
+                           conversations=conversations, selected=selected)
+
+@chat_app_bp.route('/with/<int:user_id>', methods=['POST'])
+@login_required
+def start_chat(user_id):
+    """
+    Open the conversation with another user, starting it if they have none.
+    
+    Only farmers and vets can talk to each other.
+    
+    Args:
+        user_id (int): The ID of the farmer or vet to talk to.
+    
+    Returns:
+        Response: Redirect to the chat page with the conversation open.
+    """
+    conversation = start_conversation(current_user, user_id)
+    if conversation is None:
+        flash('You can only chat with vets as a farmer, or with farmers as a vet.', 'danger')
+        return redirect(url_for('chat_app.chat_app'))
+
+    return redirect(url_for('chat_app.chat_app', conversation=conversation.id))
+
+@chat_app_bp.route('/conversations/<int:conversation_id>/messages', methods=['GET'])
+@login_required
+def conversation_messages(conversation_id):
+    """
+    Return a page of a conversation's messages, newest page first.
+    
+    Query parameters: before, the next_before cursor of the previous
+    response to get older messages, and limit.
+    
+    Args:
+        conversation_id (int): The ID of the conversation.
+    
+    Returns:
+        Response: JSON object with the messages, oldest first, and next_before.
+    """
+    if not is_member(conversation_id, current_user.id):
+        abort(404)
 
-    return render_template('chat_app.html', username=session['username'])
\ No newline at end of file
+    before = request.args.get('before', type=int)
+    limit = min(max(request.args.get('limit', MESSAGES_PER_PAGE, type=int), 1), MESSAGES_PER_PAGE)
+    messages, next_before = message_history(conversation_id, before, limit)
+    return jsonify({"messages": messages, "next_before": next_before}), 200
@@ -1,50 +1,110 @@
 const socket = io();
 const username = document.body.getAttribute("data-username");
+const userId = Number(document.body.getAttribute("data-user-id"));
+const conversationId = Number(document.body.getAttribute("data-conversation-id")) || null;
+const historyUrl = document.body.getAttribute("data-history-url");
+
+const msgBox = document.getElementById("messages");
+const loadOlderBtn = document.getElementById("loadOlder");
+let nextBefore = null;
 
 socket.on("connect", () => {
     console.log("Connected as", username);
+    // Join (again, after a reconnect) the room of the open conversation
+    if (conversationId) {
+        socket.emit("join_conversation", { conversation_id: conversationId }, (ack) => {
+            if (ack.status !== "success") console.log("Could not join conversation:", ack.message);
+        });
+    }
 });
 
 socket.on("disconnect", () => {
     console.log("Disconnected from server");
 });
 
-socket.on("message", (msg) => {
-    const msgBox = document.getElementById("messages");
-    // const isOwnMessage = msg.startsWith(username + ": ");
-    const isOwnMessage = msg.username === username; // Check if the message is from the current user
+function renderMessage(msg) {
+    const isOwnMessage = msg.sender_id === userId; // Check if the message is from the current user
 
     const messageDiv = document.createElement("div");
     messageDiv.classList.add("message");
     messageDiv.classList.add(isOwnMessage ? "own" : "other");
-    messageDiv.textContent = msg;
+    messageDiv.dataset.id = msg.id;
 
-    const time = msg.time || "Unknown time"; // Fallback for time if not provided
-    messageDiv.innerHTML = `<span class="timestamp">[${time}]</span> <strong>${msg.username}:</strong> ${msg.text}`;
+    const time = msg.time
+        ? new Date(msg.time).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
+        : "Unknown time"; // Fallback for time if not provided
 
-    msgBox.appendChild(messageDiv);
-    msgBox.scrollTop = msgBox.scrollHeight; // Scroll to the bottom of the message box
+    const timestamp = document.createElement("span");
+    timestamp.classList.add("timestamp");
+    timestamp.textContent = `[${time}]`;
+    const sender = document.createElement("strong");
+    sender.textContent = `${msg.username}:`;
+    messageDiv.append(timestamp, " ", sender, " ", msg.text);
+    return messageDiv;
+}
+
+socket.on("message", (msg) => {
+    if (msg.conversation_id !== conversationId) return;
+    if (msgBox.querySelector(`[data-id="${msg.id}"]`)) return; // Already shown
 
-    // msgBox.innerHTML += `<div><strong>${msg}</strong></div>`;
+    msgBox.appendChild(renderMessage(msg));
+    msgBox.scrollTop = msgBox.scrollHeight; // Scroll to the bottom of the message box
 });
 
+async function loadHistory() {
+    if (!historyUrl) return;
+
+    const url = nextBefore ? `${historyUrl}?before=${nextBefore}` : historyUrl;
+    const response = await fetch(url, { credentials: "same-origin" });
+    if (!response.ok) return;
+    const page = await response.json();
+
+    // Older messages go above the ones already shown, keeping the scroll position
+    const firstShown = loadOlderBtn.nextSibling;
+    const previousHeight = msgBox.scrollHeight;
+    page.messages.forEach((msg) => {
+        // A message may have arrived over the socket before its history page
+        if (msgBox.querySelector(`[data-id="${msg.id}"]`)) return;
+        msgBox.insertBefore(renderMessage(msg), firstShown);
+    });
+
+    if (nextBefore) {
+        msgBox.scrollTop += msgBox.scrollHeight - previousHeight;
+    } else {
+        msgBox.scrollTop = msgBox.scrollHeight;
+    }
+
+    nextBefore = page.next_before;
+    loadOlderBtn.hidden = !nextBefore;
+}
+
+loadOlderBtn.addEventListener("click", loadHistory);
+
 function sendMessage() {
     const input = document.getElementById("messageInput");
     const messageText = input.value.trim();
 
-    if (messageText === "") return; // Don't send empty messages
+    if (messageText === "" || !conversationId) return; // Don't send empty messages
 
-    const timestamp = new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
     const msg = {
-        username: username,
-        text: messageText,
-        time: timestamp
+        conversation_id: conversationId,
+        text: messageText
     };
 
-    socket.emit("message", msg); // Send the message object to the server
-
-    // const msg = `${username}: ${input.value}`;
-    // socket.send(msg);
+    // The server stores the message and sends it back to everyone in the conversation
+    socket.emit("message", msg, (ack) => {
+        if (ack.status !== "success") alert(ack.message);
+    });
     
     input.value = ""; // Clear the input field after sending
-}
\ No newline at end of file
+}
+
+// Send message on Enter key press
+const messageInput = document.getElementById("messageInput");
+if (messageInput) {
+    messageInput.addEventListener("keypress", (event) => {
+        if (event.key === "Enter") sendMessage();
+    });
+}
+
+loadHistory();
@@ -0,0 +1,238 @@
+"""
+This module talks to the language model behind the chatbot.
+
+It provides the following:
+- get_client(): The shared OpenAI client with a pooled HTTP connection
+- build_messages(): Build the prompt for a question in its language
+- model_name(): The configured model
+- complete(): Get a whole reply at once
+- stream_reply(): Yield a reply piece by piece as the model produces it
+- ChatbotMetrics: Time-to-first-token and total latency of recent replies
+
+One client with a bounded keep-alive connection pool is shared by every
+request, so replies reuse open TLS connections to the API. Under eventlet the
+client's sockets are green, so waiting for the model yields the hub to other
+requests instead of holding it. Setting OPENAI_BASE_URL points the client at
+another OpenAI-compatible server, e.g. scripts/mock_completion_server.py for
+local testing.
+"""
+
+import threading
+import time
+from collections import deque
+
+import httpx
+from flask import current_app
+from openai import OpenAI
+
+SYSTEM_MESSAGES = {
+    "sw": "Wewe ni mtaalamu wa mifugo na unatoa ushauri kuhusu afya ya wanyama.",
+    "en": "You are a helpful veterinary assistant providing insights on animal health.",
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class ChatbotMetrics:
+    """
+    Latency of recent chatbot replies.
+
+    Attributes:
+        window (int): Number of recent replies the percentiles are computed over.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._ttft = deque(maxlen=window)
+        self._total = deque(maxlen=window)
+        self._counters = {"replies": 0, "streamed": 0, "errors": 0}
+
+    def record(self, ttft, total, streamed):
+        """
+        Record a finished reply.
+
+        Args:
+            ttft (float): Seconds until the first token arrived.
+            total (float): Seconds until the reply was complete.
+            streamed (bool): Whether the reply was streamed.
+        """
+        with self._lock:
+            self._counters["replies"] += 1
+            if streamed:
+                self._counters["streamed"] += 1
+            self._ttft.append(ttft)
+            self._total.append(total)
+
+    def record_error(self):
+        """
+        Record a reply that failed.
+        """
+        with self._lock:
+            self._counters["errors"] += 1
+
+    @staticmethod
+    def _percentiles(values):
+        values = sorted(values)
+        if not values:
+            return {"avg": None, "p50": None, "p95": None}
+        return {
+            "avg": sum(values) / len(values),
+            "p50": values[len(values) // 2],
+            "p95": values[int(len(values) * 0.95)],
+        }
+
+    def snapshot(self):
+        """
+        Get the counters and latency percentiles.
+
+        Returns:
+            dict: Counters plus ttft and total latency (avg, p50, p95) in seconds.
+        """
+        with self._lock:
+            metrics = dict(self._counters)
+            ttft, total = list(self._ttft), list(self._total)
+        metrics["ttft"] = self._percentiles(ttft)
+        metrics["total"] = self._percentiles(total)
+        return metrics
+
+
+metrics = ChatbotMetrics()
+
+
+def get_client():
+    """
+    Get the shared OpenAI client, creating it on first use.
+
+    Returns:
+        OpenAI: The client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            config = current_app.config
+            connections = config.get('OPENAI_MAX_CONNECTIONS', 20)
+            _client = OpenAI(
+                api_key=config.get('OPENAI_API_KEY'),
+                base_url=config.get('OPENAI_BASE_URL') or None,
+                max_retries=config.get('OPENAI_MAX_RETRIES', 2),
+                http_client=httpx.Client(
+                    timeout=httpx.Timeout(config.get('OPENAI_TIMEOUT', 30), connect=5),
+                    limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+                ),
+            )
+        return _client
+
+
+def build_messages(user_message, language, summary=None, history=()):
+    """
+    Build the prompt for a question in its language.
+
+    The parts that change least come first, so consecutive prompts of a
+    conversation share a prefix the API can cache.
+
+    Args:
+        user_message (str): The user's question.
+        language (str): The language code of the question, see app.chatbot.language.
+        summary (str): A summary of the earlier conversation, if any.
+        history (list): Recent {"role", "content"} messages of the conversation, oldest first.
+
+    Returns:
+        list: The chat prompt.
+    """
+    system_message = SYSTEM_MESSAGES.get(language, SYSTEM_MESSAGES["en"])
+    messages = [{"role": "system", "content": system_message}]
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the conversation so far: {summary}"})
+    messages.extend(history)
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+def model_name():
+    """
+    Get the name of the model replies come from.
+
+    Returns:
+        str: The configured model.
+    """
+    return current_app.config.get('OPENAI_MODEL', 'gpt-4o-mini')
+
+
+def _request_options():
+    """Get the model options shared by complete() and stream_reply()"""
+    return {
+        "model": model_name(),
+        "max_tokens": current_app.config.get('CHATBOT_MAX_TOKENS', 150),
+    }
+
+
+def _usage(usage):
+    """Convert the API's token usage to a dict"""
+    if usage is None:
+        return None
+    return {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+
+
+def complete(messages, stats=None):
+    """
+    Get a whole reply at once.
+
+    Args:
+        messages (list): The chat prompt.
+        stats (dict): If given, filled with the call's "seconds" and token "usage".
+
+    Returns:
+        str: The reply.
+    """
+    started = time.perf_counter()
+    try:
+        completion = get_client().chat.completions.create(messages=messages, **_request_options())
+    except Exception:
+        metrics.record_error()
+        raise
+    elapsed = time.perf_counter() - started
+    metrics.record(elapsed, elapsed, streamed=False)
+    if stats is not None:
+        stats.update(seconds=elapsed, usage=_usage(completion.usage))
+    return completion.choices[0].message.content
+
+
+def stream_reply(messages, stats=None):
+    """
+    Yield a reply piece by piece as the model produces it.
+
+    Args:
+        messages (list): The chat prompt.
+        stats (dict): If given, filled with the call's "seconds" and token
+            "usage" once the reply is complete.
+
+    Yields:
+        str: Text deltas of the reply, in order.
+    """
+    started = time.perf_counter()
+    first_token = None
+    usage = None
+    try:
+        stream = get_client().chat.completions.create(
+            messages=messages, stream=True, stream_options={"include_usage": True}, **_request_options())
+        with stream:
+            for chunk in stream:
+                if chunk.usage is not None:
+                    usage = _usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                    yield delta
+    except Exception:
+        metrics.record_error()
+        raise
+
+    total = time.perf_counter() - started
+    metrics.record(first_token if first_token is not None else total, total, streamed=True)
+    if stats is not None:
+        stats.update(seconds=total, usage=usage)
@@ -0,0 +1,199 @@
+"""
+This module detects the language of chatbot questions.
+
+It provides the following:
+- user_language(): The language code of a user's preferred language, if they have one
+- LanguageDetector: Layered, deterministic language detection with per-conversation memos
+- language_detector: The process-wide detector instance
+
+langdetect loads its language profiles lazily on the first call, which
+stalls that request, and it is random unless seeded, so the same short
+message can come back as different languages. It is also the slowest and
+least reliable step on short messages. The detector therefore tries cheaper
+answers first and only falls back to langdetect when none applies:
+
+1. Keywords: common Swahili and English words that clearly outnumber the other language's
+2. The farmer's preferred language
+3. The language already detected earlier in the same conversation
+4. langdetect, seeded and with profiles loaded at startup
+
+A confident answer from steps 1 or 4 is remembered for the conversation.
+"""
+
+import re
+import threading
+from collections import Counter
+
+from langdetect import DetectorFactory
+from langdetect.detector_factory import PROFILES_DIRECTORY
+from langdetect.lang_detect_exception import LangDetectException
+
+from app.cache import TTLCache
+
+# Language codes of the languages farmers can choose at registration
+PREFERRED_LANGUAGES = {"English": "en", "Swahili": "sw"}
+
+SWAHILI_KEYWORDS = frozenset("""
+    na ni wa ya kwa za la ana wana wangu yangu zangu wetu nini gani je vipi lini
+    sana hana hapana ndiyo hii huyu hiyo hawa tafadhali asante habari naomba nifanye
+    ng'ombe ngombe mbuzi kondoo kuku nguruwe punda mifugo mnyama wanyama ndama
+    homa mgonjwa ugonjwa dawa daktari chanjo kula hali maji damu kuharisha kukohoa
+    anakula hanywi haili anaharisha anakohoa amechoka
+""".split())
+
+ENGLISH_KEYWORDS = frozenset("""
+    the is are was my our his her what how why when which who do does did has have had
+    a an and of to in on with for not no yes should can could please help
+    cow cows goat goats sheep chicken chickens pig pigs calf animal animals
+    fever sick disease eating eat drink vaccine vet medicine cough diarrhea
+""".split())
+
+_WORDS = re.compile(r"[\w']+")
+
+
+def user_language(user):
+    """
+    Get the language code of a user's preferred language.
+
+    Args:
+        user (User): The user, or an anonymous user.
+
+    Returns:
+        str: The language code, or None if the user has no preferred language.
+    """
+    if not getattr(user, "is_authenticated", False):
+        return None
+    farmer = user.farmer_profile
+    if farmer is None:
+        return None
+    return PREFERRED_LANGUAGES.get(farmer.preferred_language)
+
+
+class LanguageDetector:
+    """
+    Layered language detection for chatbot questions.
+
+    Attributes:
+        default (str): Language code used when nothing else gives an answer.
+        min_probability (float): langdetect probability needed to remember its answer.
+        memos (TTLCache): Language of each recent conversation by conversation ID.
+    """
+
+    def __init__(self):
+        self.default = "en"
+        self.seed = 0
+        self.min_probability = 0.9
+        self._factory = None
+        self.memos = TTLCache(maxsize=10000, ttl=1800)
+        self._lock = threading.Lock()
+        self._sources = Counter()
+
+    def init_app(self, app):
+        """
+        Load the langdetect profiles and configure the detector from the Flask application.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.seed = app.config.get('CHATBOT_LANGUAGE_SEED', 0)
+        self._factory = None
+        self._load_factory()
+        self.min_probability = app.config.get('CHATBOT_LANGUAGE_MIN_PROBABILITY', 0.9)
+        self.memos = TTLCache(maxsize=10000, ttl=app.config.get('CHATBOT_LANGUAGE_MEMO_TTL', 1800))
+
+    @staticmethod
+    def from_keywords(text):
+        """
+        Guess the language from common Swahili and English words.
+
+        Args:
+            text (str): The message.
+
+        Returns:
+            str: "sw" or "en" if one language's words clearly dominate, otherwise None.
+        """
+        swahili = english = 0
+        for word in _WORDS.findall(text.casefold()):
+            if word in SWAHILI_KEYWORDS:
+                swahili += 1
+            elif word in ENGLISH_KEYWORDS:
+                english += 1
+
+        if swahili > 2 * english:
+            return "sw"
+        if english > 2 * swahili:
+            return "en"
+        return None
+
+    def _load_factory(self):
+        """Load the langdetect profiles once, however many threads ask at the same time"""
+        with self._lock:
+            if self._factory is None:
+                factory = DetectorFactory()
+                factory.load_profile(PROFILES_DIRECTORY)
+                factory.set_seed(self.seed)
+                self._factory = factory
+        return self._factory
+
+    def from_langdetect(self, text):
+        """
+        Detect the language with langdetect.
+
+        Args:
+            text (str): The message.
+
+        Returns:
+            tuple: (language, probability), or (None, 0.0) if the text has no letters.
+        """
+        detector = (self._factory or self._load_factory()).create()
+        detector.append(text)
+        try:
+            best = detector.get_probabilities()[0]
+        except (LangDetectException, IndexError):
+            return None, 0.0
+        return best.lang, best.prob
+
+    def detect(self, text, preferred=None, conversation_id=None):
+        """
+        Detect the language of a message.
+
+        Args:
+            text (str): The message.
+            preferred (str): The sender's preferred language code, see user_language().
+            conversation_id: Key of the conversation the message belongs to, if any.
+
+        Returns:
+            str: The language code.
+        """
+        language = self.from_keywords(text)
+        if language is not None:
+            source, remember = "keywords", True
+        elif preferred is not None:
+            language, source, remember = preferred, "preferred", False
+        elif conversation_id is not None and (memo := self.memos.get(conversation_id)) is not None:
+            language, source, remember = memo, "memo", False
+        else:
+            language, probability = self.from_langdetect(text)
+            source, remember = "langdetect", probability >= self.min_probability
+            if language is None:
+                language, source, remember = self.default, "default", False
+
+        if remember and conversation_id is not None:
+            self.memos.set(conversation_id, language)
+        with self._lock:
+            self._sources[source] += 1
+        return language
+
+    def metrics(self):
+        """
+        Get how often each detection step gave the answer.
+
+        Returns:
+            dict: Answer counts by step, and the number of remembered conversations.
+        """
+        with self._lock:
+            sources = dict(self._sources)
+        return {"sources": sources, "conversations": len(self.memos)}
+
+
+language_detector = LanguageDetector()
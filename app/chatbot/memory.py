@@ -0,0 +1,275 @@
+"""
+This module keeps the chatbot's conversation memory within a token budget.
+
+It provides the following:
+- estimate_tokens(): A rough, pessimistic token count of a text
+- ConversationMemory: Per-user conversations with rolling summaries
+- conversation_memory: The process-wide memory instance
+
+Each user's conversation is stored in the chatbot_conversations and
+chatbot_turns tables. The prompt for a new message is the system prompt,
+then the summary of older turns, then the recent turns verbatim, then the
+new message, so its size is bounded by CHATBOT_SUMMARY_TOKENS plus
+CHATBOT_HISTORY_TOKENS however long the conversation runs.
+
+Once the verbatim turns outgrow CHATBOT_HISTORY_TOKENS, a background task
+folds the oldest of them into the summary until they fit in half the budget.
+Between those compactions each prompt only appends to the previous one, so
+its prefix stays byte-identical and the API's prompt caching can reuse it.
+"""
+
+import threading
+
+from app.health_monitoring.extensions import socketio
+from app.models import db, ChatbotConversation, ChatbotTurn
+
+from .assistant import get_client, model_name
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation between a livestock farmer and a veterinary assistant "
+    "in at most {words} words. Keep the animals, symptoms, treatments and advice discussed, "
+    "and write it in the language the farmer uses."
+)
+
+ROLE_NAMES = {"user": "Farmer", "assistant": "Assistant"}
+
+
+def estimate_tokens(text):
+    """
+    Estimate the token count of a message.
+
+    Three characters per token errs high for English and about right for
+    Swahili, which splits into more tokens.
+
+    Args:
+        text (str): The message.
+
+    Returns:
+        int: The estimated token count, including the message overhead.
+    """
+    return len(text) // 3 + 4
+
+
+class ConversationMemory:
+    """
+    Chatbot conversations kept within a token budget.
+
+    Attributes:
+        history_tokens (int): Token budget of the turns sent verbatim.
+        summary_tokens (int): Maximum tokens of the rolling summary.
+        max_turns (int): Maximum number of turns loaded for one prompt.
+    """
+
+    def __init__(self, history_tokens=800, summary_tokens=200, max_turns=40):
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.max_turns = max_turns
+        self.app = None
+        self._lock = threading.Lock()
+        self._compacting = set()
+
+    def init_app(self, app):
+        """
+        Bind the memory to the Flask application.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.app = app
+        self.history_tokens = app.config.get('CHATBOT_HISTORY_TOKENS', self.history_tokens)
+        self.summary_tokens = app.config.get('CHATBOT_SUMMARY_TOKENS', self.summary_tokens)
+        self.max_turns = app.config.get('CHATBOT_HISTORY_MAX_TURNS', self.max_turns)
+
+    def latest(self, user_id):
+        """
+        Get a user's current conversation.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            ChatbotConversation: The latest conversation, or None if the user has none.
+        """
+        return ChatbotConversation.query.filter_by(user_id=user_id).order_by(ChatbotConversation.id.desc()).first()
+
+    def current(self, user_id):
+        """
+        Get a user's current conversation, starting one if they have none.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            ChatbotConversation: The conversation.
+        """
+        return self.latest(user_id) or self.start(user_id)
+
+    def start(self, user_id):
+        """
+        Start a new conversation for a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            ChatbotConversation: The new conversation.
+        """
+        conversation = ChatbotConversation(user_id=user_id)
+        db.session.add(conversation)
+        db.session.commit()
+        return conversation
+
+    def recent_turns(self, conversation, limit=50):
+        """
+        Get the latest turns of a conversation for display.
+
+        Args:
+            conversation (ChatbotConversation): The conversation.
+            limit (int): Maximum number of turns.
+
+        Returns:
+            list: ChatbotTurn objects, oldest first.
+        """
+        turns = ChatbotTurn.query.filter_by(conversation_id=conversation.id).order_by(
+            ChatbotTurn.id.desc()).limit(limit).all()
+        return turns[::-1]
+
+    def _unsummarized(self, conversation):
+        """Get the newest turns not yet folded into the summary, oldest first"""
+        turns = ChatbotTurn.query.filter(
+            ChatbotTurn.conversation_id == conversation.id,
+            ChatbotTurn.id > conversation.summarized_through,
+        ).order_by(ChatbotTurn.id.desc()).limit(self.max_turns).all()
+        return turns[::-1]
+
+    def context(self, conversation):
+        """
+        Get what the model should know about a conversation before the next message.
+
+        Normally every turn not yet summarized fits the budget. If a compaction
+        is still running or failed, only the newest turns that fit are returned.
+
+        Args:
+            conversation (ChatbotConversation): The conversation.
+
+        Returns:
+            tuple: (summary, history) where summary is the rolling summary or None
+                and history a list of {"role", "content"} messages, oldest first.
+        """
+        history, tokens = [], 0
+        for turn in reversed(self._unsummarized(conversation)):
+            tokens += turn.tokens
+            if tokens > self.history_tokens:
+                break
+            history.append({"role": turn.role, "content": turn.content})
+        return conversation.summary, history[::-1]
+
+    def record(self, conversation, user_message, reply):
+        """
+        Add a question and its reply to a conversation.
+
+        Starts a compaction in the background if the turns outgrew the budget.
+
+        Args:
+            conversation (ChatbotConversation): The conversation.
+            user_message (str): The user's question.
+            reply (str): The chatbot's reply.
+        """
+        db.session.add_all([
+            ChatbotTurn(conversation_id=conversation.id, role='user',
+                        content=user_message, tokens=estimate_tokens(user_message)),
+            ChatbotTurn(conversation_id=conversation.id, role='assistant',
+                        content=reply, tokens=estimate_tokens(reply)),
+        ])
+        db.session.commit()
+
+        unsummarized = db.session.query(db.func.coalesce(db.func.sum(ChatbotTurn.tokens), 0)).filter(
+            ChatbotTurn.conversation_id == conversation.id,
+            ChatbotTurn.id > conversation.summarized_through,
+        ).scalar()
+        if unsummarized > self.history_tokens:
+            self.schedule_compaction(conversation.id)
+
+    def schedule_compaction(self, conversation_id):
+        """
+        Fold a conversation's oldest turns into its summary in the background.
+
+        Args:
+            conversation_id (int): The ID of the conversation.
+        """
+        with self._lock:
+            if conversation_id in self._compacting:
+                return
+            self._compacting.add(conversation_id)
+        socketio.start_background_task(self._compact, conversation_id)
+
+    def _compact(self, conversation_id):
+        """Background task folding turns into the summary until the rest fit half the budget"""
+        try:
+            with self.app.app_context():
+                self.compact(conversation_id)
+        except Exception as e:
+            print(f"❌ Chatbot conversation {conversation_id} compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting.discard(conversation_id)
+
+    def compact(self, conversation_id):
+        """
+        Fold a conversation's oldest turns into its summary until the rest fit half the budget.
+
+        Args:
+            conversation_id (int): The ID of the conversation.
+        """
+        conversation = db.session.get(ChatbotConversation, conversation_id)
+        turns = ChatbotTurn.query.filter(
+            ChatbotTurn.conversation_id == conversation_id,
+            ChatbotTurn.id > conversation.summarized_through,
+        ).order_by(ChatbotTurn.id).all()
+
+        # Keep the newest turns that fit in half the budget, fold the rest
+        split, tokens = len(turns), 0
+        while split > 0 and tokens + turns[split - 1].tokens <= self.history_tokens // 2:
+            split -= 1
+            tokens += turns[split].tokens
+        # Never keep a reply without its question
+        if split < len(turns) and turns[split].role == 'assistant':
+            split += 1
+        folded = turns[:split]
+        if not folded:
+            return
+
+        summary = self.summarize(conversation.summary, folded)
+        conversation.summary = summary
+        conversation.summary_tokens = estimate_tokens(summary)
+        conversation.summarized_through = folded[-1].id
+        db.session.commit()
+        print(f"🧠 Folded {len(folded)} turns into the summary of chatbot conversation {conversation_id}")
+
+    def summarize(self, summary, turns):
+        """
+        Ask the model to fold turns into a conversation's summary.
+
+        Args:
+            summary (str): The summary so far, or None.
+            turns (list): The ChatbotTurn objects to fold, oldest first.
+
+        Returns:
+            str: The new summary.
+        """
+        transcript = "\n".join(f"{ROLE_NAMES[turn.role]}: {turn.content}" for turn in turns)
+        if summary:
+            transcript = f"Summary so far: {summary}\n\n{transcript}"
+
+        completion = get_client().chat.completions.create(
+            model=model_name(),
+            max_tokens=self.summary_tokens,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT.format(words=self.summary_tokens * 3 // 4)},
+                {"role": "user", "content": transcript},
+            ],
+        )
+        return completion.choices[0].message.content.strip()
+
+
+conversation_memory = ConversationMemory()
@@ -0,0 +1,296 @@
+"""
+This module caches chatbot replies so repeated questions skip the model.
+
+It provides the following:
+- normalize_question(): Reduce a question to the form it is cached under
+- embed(): A small local embedding of a question for similarity lookups
+- ResponseCache: TTL/LRU reply cache with an optional similarity index and savings metrics
+- response_cache: The process-wide cache instance
+
+Replies are keyed by detected language, a hash of the system prompt, the
+model and the normalized question, so "My cow has fever, what to do?" and
+"my cow has fever what to do" share an entry but a Swahili question never
+gets an English reply and a prompt change never serves old replies.
+
+When CHATBOT_CACHE_SIMILARITY is above 0, a miss on the exact key falls back
+to the most similar cached question of the same language and prompt, using
+cosine similarity of hashed word and character trigram vectors. Those are
+computed locally with numpy, so a lookup costs no API call. Keep the
+threshold high: it is meant to catch rewordings and typos, not related
+questions.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+from app.cache import TTLCache
+
+EMBEDDING_DIM = 1024
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text):
+    """
+    Reduce a question to the form it is cached under.
+
+    Args:
+        text (str): The question as the user typed it.
+
+    Returns:
+        str: The question case-folded, without punctuation and with single spaces.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _bucket(feature):
+    """Hash a feature to a dimension of the embedding"""
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=4).digest(), "little") % EMBEDDING_DIM
+
+
+def embed(normalized):
+    """
+    Embed a normalized question as a unit vector of hashed words and character trigrams.
+
+    Args:
+        normalized (str): The question, as returned by normalize_question().
+
+    Returns:
+        numpy.ndarray: The embedding, or None if the question has no features.
+    """
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for word in normalized.split(" "):
+        if not word:
+            continue
+        vector[_bucket("w:" + word)] += 2.0
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            vector[_bucket("c:" + padded[i:i + 3])] += 1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+class _SimilarityIndex:
+    """
+    The embeddings of the cached questions of one language and prompt.
+
+    The stacked matrix is rebuilt lazily after a change, so lookups between
+    changes cost one matrix-vector product.
+    """
+
+    def __init__(self):
+        self.vectors = OrderedDict()
+        self._keys = []
+        self._matrix = None
+
+    def add(self, key, vector):
+        self.vectors[key] = vector
+        self._matrix = None
+
+    def remove(self, key):
+        if self.vectors.pop(key, None) is not None:
+            self._matrix = None
+
+    def nearest(self, vector):
+        """
+        Find the most similar cached question.
+
+        Returns:
+            tuple: (key, similarity), or (None, 0.0) if the index is empty.
+        """
+        if not self.vectors:
+            return None, 0.0
+        if self._matrix is None:
+            self._keys = list(self.vectors)
+            self._matrix = np.stack(list(self.vectors.values()))
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        return self._keys[best], float(scores[best])
+
+
+class ResponseCache:
+    """
+    A TTL/LRU cache of chatbot replies.
+
+    Attributes:
+        enabled (bool): Whether lookups and stores do anything.
+        similarity (float): Minimum cosine similarity of a similar-question hit, 0 disables it.
+        replies (TTLCache): Cached replies with the cost of producing them, by exact key.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.similarity = 0.0
+        self.input_cost = 0.0
+        self.output_cost = 0.0
+        self.replies = TTLCache(maxsize=2048, ttl=86400)
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._counters = {"exact_hits": 0, "similar_hits": 0, "misses": 0}
+        self._saved = {"seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._lookup_seconds = 0.0
+
+    def init_app(self, app):
+        """
+        Configure the cache from the Flask application.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        ttl = app.config.get('CHATBOT_CACHE_TTL', 86400)
+        self.enabled = ttl > 0
+        self.similarity = app.config.get('CHATBOT_CACHE_SIMILARITY', 0.0)
+        self.input_cost = app.config.get('OPENAI_INPUT_COST_PER_1M', 0.0) / 1_000_000
+        self.output_cost = app.config.get('OPENAI_OUTPUT_COST_PER_1M', 0.0) / 1_000_000
+        self.replies = TTLCache(maxsize=app.config.get('CHATBOT_CACHE_SIZE', 2048), ttl=ttl)
+        with self._lock:
+            self._indexes.clear()
+
+    @staticmethod
+    def _partition(language, system_prompt, model):
+        prompt_hash = hashlib.sha1(system_prompt.encode()).hexdigest()[:16]
+        return language, prompt_hash, model
+
+    def lookup(self, language, system_prompt, model, question):
+        """
+        Find a cached reply to a question.
+
+        Args:
+            language (str): The detected language of the question.
+            system_prompt (str): The system prompt the reply would be made with.
+            model (str): The model the reply would come from.
+            question (str): The question as the user typed it.
+
+        Returns:
+            str: The cached reply, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        started = time.perf_counter()
+        partition = self._partition(language, system_prompt, model)
+        normalized = normalize_question(question)
+        entry = self.replies.get(partition + (normalized,))
+        kind = "exact_hits"
+
+        if entry is None and self.similarity > 0:
+            kind = "similar_hits"
+            entry = self._lookup_similar(partition, normalized)
+
+        with self._lock:
+            self._lookup_seconds += time.perf_counter() - started
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters[kind] += 1
+            self._saved["seconds"] += entry["seconds"]
+            self._saved["prompt_tokens"] += entry["prompt_tokens"]
+            self._saved["completion_tokens"] += entry["completion_tokens"]
+        return entry["reply"]
+
+    def _lookup_similar(self, partition, normalized):
+        """Find the entry of the most similar cached question, dropping expired ones from the index"""
+        vector = embed(normalized)
+        if vector is None:
+            return None
+
+        while True:
+            with self._lock:
+                index = self._indexes.get(partition)
+                if index is None:
+                    return None
+                key, score = index.nearest(vector)
+            if key is None or score < self.similarity:
+                return None
+
+            entry = self.replies.get(partition + (key,))
+            if entry is not None:
+                return entry
+            with self._lock:
+                index.remove(key)
+
+    def store(self, language, system_prompt, model, question, reply, seconds, usage=None):
+        """
+        Cache a reply the model produced.
+
+        Args:
+            language (str): The detected language of the question.
+            system_prompt (str): The system prompt the reply was made with.
+            model (str): The model the reply came from.
+            question (str): The question as the user typed it.
+            reply (str): The model's reply.
+            seconds (float): How long the model took, counted as saved on each hit.
+            usage (dict): prompt_tokens and completion_tokens of the call, if known.
+        """
+        if not self.enabled or not reply:
+            return
+
+        usage = usage or {}
+        partition = self._partition(language, system_prompt, model)
+        normalized = normalize_question(question)
+        self.replies.set(partition + (normalized,), {
+            "reply": reply,
+            "seconds": seconds,
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+        })
+
+        if self.similarity > 0:
+            vector = embed(normalized)
+            if vector is None:
+                return
+            with self._lock:
+                index = self._indexes.setdefault(partition, _SimilarityIndex())
+                index.add(normalized, vector)
+                # Evicted and expired entries linger in the index until they
+                # are looked up; trim it once it grows well past the cache
+                while len(index.vectors) > 2 * self.replies.maxsize:
+                    index.remove(next(iter(index.vectors)))
+
+    def clear(self):
+        """
+        Remove every cached reply.
+        """
+        self.replies.clear()
+        with self._lock:
+            self._indexes.clear()
+
+    def metrics(self):
+        """
+        Get the cache's hit rate and what its hits saved.
+
+        Returns:
+            dict: Size, hit and miss counts, hit_rate, average lookup time, and
+                the model seconds, tokens and estimated cost saved by hits.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            saved = dict(self._saved)
+            lookup_seconds = self._lookup_seconds
+
+        lookups = sum(counters.values())
+        hits = counters["exact_hits"] + counters["similar_hits"]
+        return {
+            "enabled": self.enabled,
+            "size": len(self.replies),
+            **counters,
+            "hit_rate": hits / lookups if lookups else None,
+            "avg_lookup_seconds": lookup_seconds / lookups if lookups else None,
+            "saved_seconds": saved["seconds"],
+            "saved_tokens": saved["prompt_tokens"] + saved["completion_tokens"],
+            "saved_cost_usd": round(saved["prompt_tokens"] * self.input_cost
+                                    + saved["completion_tokens"] * self.output_cost, 6),
+        }
+
+
+response_cache = ResponseCache()
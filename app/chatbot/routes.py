@@ -4,26 +4,69 @@ This module defines the routes for chatbot-related functionalities in the Flask
 It includes the following routes:
 - Render the chatbot page
 - Get a response from the chatbot
+- Stream a response from the chatbot
+- Start a new chatbot conversation
+- Chatbot latency metrics
+
+Signed-in users' questions and replies are kept as a conversation (see
+app.chatbot.memory), so follow-up questions are answered in context.
 
 Functions:
-- chatbot(): Renders the chatbot page.
+- chatbot(): Renders the chatbot page with the current conversation.
 - get_response(): Gets a response from the chatbot based on user input.
+- stream_response(): Streams a response from the chatbot as server-sent events.
+- new_conversation(): Starts a new conversation for the current user.
+- chatbot_metrics(): Returns the chatbot's latency, cache and language detection metrics.
 """
 
-from flask import render_template, request, jsonify
-from flask_login import login_required
-from openai import OpenAI
-from langdetect import detect
-from dotenv import load_dotenv
-import os
-
-# Load environment variables from .env
-load_dotenv()
+import json
 
-# Load the OpenAI API key from the environment
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from flask import render_template, request, jsonify, Response, stream_with_context, abort
+from flask_login import login_required, current_user
 
 from . import chatbot_bp
+from .assistant import build_messages, complete, stream_reply, model_name, metrics
+from .language import language_detector, user_language
+from .memory import conversation_memory
+from .response_cache import response_cache
+
+
+def prepare_prompt(user_message):
+    """
+    Build the prompt for a message from the current user, with their conversation so far.
+
+    Args:
+        user_message (str): The message.
+
+    Returns:
+        tuple: (conversation, language, messages, cacheable) where conversation
+            is None for anonymous users and cacheable tells whether the reply
+            may come from or go to the response cache, which only holds replies
+            to questions asked without earlier context.
+    """
+    conversation, summary, history = None, None, []
+    if current_user.is_authenticated:
+        conversation = conversation_memory.current(current_user.id)
+        summary, history = conversation_memory.context(conversation)
+
+    conversation_key = f"chatbot:{conversation.id}" if conversation else None
+    language = language_detector.detect(user_message, user_language(current_user), conversation_key)
+    messages = build_messages(user_message, language, summary, history)
+    return conversation, language, messages, not (summary or history)
+
+
+def sse_event(event, data):
+    """
+    Format a server-sent event.
+
+    Args:
+        event (str): The event name.
+        data (dict): The event payload, sent as JSON.
+
+    Returns:
+        str: The event in text/event-stream format.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 @chatbot_bp.route('/', methods=['GET'])
@@ -35,7 +78,9 @@ def chatbot():
     Returns:
         Response: Rendered HTML template for the chatbot page.
     """
-    return render_template('chatbot.html')
+    conversation = conversation_memory.latest(current_user.id)
+    turns = conversation_memory.recent_turns(conversation) if conversation else []
+    return render_template('chatbot.html', turns=turns)
 
 
 @chatbot_bp.route('/get_response', methods=['POST'])
@@ -43,7 +88,9 @@ def get_response():
     """
     Route to get a response from the chatbot.
 
-    Processes the user message, detects the language, and gets a response from the OpenAI API.
+    Processes the user message, detects the language, and gets a response from
+    the response cache or else the OpenAI API. For signed-in users the
+    conversation so far is sent along and the exchange is added to it.
 
     Returns:
         Response: JSON response containing the chatbot's reply and detected language.
@@ -55,28 +102,115 @@ def get_response():
         return jsonify({"error": "No message provided"}), 400
     
     try:
-        # Detect language
-        detected_lang = detect(user_message)
+        conversation, detected_lang, messages, cacheable = prepare_prompt(user_message)
+        system_prompt = messages[0]["content"]
+        
+        response = None
+        if cacheable:
+            response = response_cache.lookup(detected_lang, system_prompt, model_name(), user_message)
+        cached = response is not None
         
-        # Modify system message based on language
-        if detected_lang == "sw":
-            system_message = "Wewe ni mtaalamu wa mifugo na unatoa ushauri kuhusu afya ya wanyama."
-        else:
-            system_message = "You are a helpful veterinary assistant providing insights on animal health."
+        if not cached:
+            stats = {}
+            response = complete(messages, stats)
+            if cacheable:
+                response_cache.store(detected_lang, system_prompt, model_name(), user_message,
+                                     response, stats["seconds"], stats["usage"])
         
-        # Get response from OpenAI
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=150
-        )
-        response = completion.choices[0].message.content
+        if conversation is not None:
+            conversation_memory.record(conversation, user_message, response)
         
-        return jsonify({"reply": response, "language": detected_lang}), 200
+        return jsonify({"reply": response, "language": detected_lang, "cached": cached}), 200
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+@chatbot_bp.route('/stream', methods=['POST'])
+@login_required
+def stream_response():
+    """
+    Route to stream a response from the chatbot.
+
+    Sends the reply as server-sent events while the model produces it: a
+    "language" event first, then a "token" event per text delta, and finally
+    "done" or "error". A cached reply is sent as a single "token" event.
+
+    Returns:
+        Response: A text/event-stream response.
+    """
+    data = request.get_json(silent=True) or {}
+    user_message = (data.get("message") or "").strip()
+
+    if not user_message:
+        return jsonify({"error": "No message provided"}), 400
+
+    conversation, detected_lang, messages, cacheable = prepare_prompt(user_message)
+    system_prompt = messages[0]["content"]
+    model = model_name()
+    cached = None
+    if cacheable:
+        cached = response_cache.lookup(detected_lang, system_prompt, model, user_message)
+
+    def generate():
+        yield sse_event("language", {"language": detected_lang})
+        if cached is not None:
+            yield sse_event("token", {"text": cached})
+            conversation_memory.record(conversation, user_message, cached)
+            yield sse_event("done", {"cached": True})
+            return
+
+        stats, parts = {}, []
+        try:
+            for delta in stream_reply(messages, stats):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+        except Exception as e:
+            print(f"❌ Chatbot stream failed: {e}")
+            yield sse_event("error", {"error": "Sorry, something went wrong."})
+            return
+        reply = "".join(parts)
+        if cacheable:
+            response_cache.store(detected_lang, system_prompt, model, user_message,
+                                 reply, stats["seconds"], stats["usage"])
+        conversation_memory.record(conversation, user_message, reply)
+        yield sse_event("done", {"cached": False})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@chatbot_bp.route('/new', methods=['POST'])
+@login_required
+def new_conversation():
+    """
+    Route to start a new conversation, so later questions are answered without the earlier ones.
+
+    Returns:
+        Response: JSON object with the ID of the new conversation.
+    """
+    conversation = conversation_memory.start(current_user.id)
+    return jsonify({"conversation_id": conversation.id}), 201
+
+
+@chatbot_bp.route('/metrics', methods=['GET'])
+@login_required
+def chatbot_metrics():
+    """
+    Route to report the chatbot's time-to-first-token, latency, response cache
+    and language detection metrics to admins.
+
+    Returns:
+        Response: JSON object with the chatbot metrics.
+    """
+    if current_user.user_role != 'admin':
+        abort(403)
+
+    return jsonify({
+        **metrics.snapshot(),
+        "cache": response_cache.metrics(),
+        "language": language_detector.metrics(),
+    }), 200
@@ -21,13 +21,100 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Mail configurations
-    MAIL_SERVER = 'smtp.gmail.com'
-    MAIL_PORT = 587
-    MAIL_USE_TLS = True
+    MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+    MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
+    MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'True').lower() in ('true', '1', 'yes')
+    MAIL_USE_SSL = os.getenv('MAIL_USE_SSL', 'False').lower() in ('true', '1', 'yes')
     MAIL_USERNAME = os.getenv('EMAIL_USER')
     MAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', os.getenv('EMAIL_USER'))
     
     # File upload configurations
     UPLOAD_FOLDER = 'uploads'
     PROFILE_PIC_FOLDER = 'static/uploads/profile_pics'
-    VERIFICATION_FOLDER = 'static/uploads/verification'
\ No newline at end of file
+    VERIFICATION_FOLDER = 'static/uploads/verification'
+    
+    # Health monitoring configurations
+    TELEMETRY_BROADCAST_INTERVAL = float(os.getenv('TELEMETRY_BROADCAST_INTERVAL', 10))
+    TELEMETRY_COALESCE_WINDOW = float(os.getenv('TELEMETRY_COALESCE_WINDOW', 0.25))
+    
+    # Health data retention configurations (days, 0 keeps data forever)
+    HEALTH_RAW_RETENTION_DAYS = int(os.getenv('HEALTH_RAW_RETENTION_DAYS', 30))
+    HEALTH_MINUTE_ROLLUP_RETENTION_DAYS = int(os.getenv('HEALTH_MINUTE_ROLLUP_RETENTION_DAYS', 90))
+    HEALTH_HOUR_ROLLUP_RETENTION_DAYS = int(os.getenv('HEALTH_HOUR_ROLLUP_RETENTION_DAYS', 730))
+    HEALTH_DAY_ROLLUP_RETENTION_DAYS = int(os.getenv('HEALTH_DAY_ROLLUP_RETENTION_DAYS', 0))
+    
+    # Alert configurations
+    ALERT_COOLDOWN_SECONDS = float(os.getenv('ALERT_COOLDOWN_SECONDS', 900))
+    ALERT_HYSTERESIS_TEMPERATURE = float(os.getenv('ALERT_HYSTERESIS_TEMPERATURE', 0.5))
+    ALERT_HYSTERESIS_PULSE = float(os.getenv('ALERT_HYSTERESIS_PULSE', 5))
+    
+    # OTP rate limits (token buckets: burst size and seconds to regain one attempt)
+    OTP_ISSUE_BURST = int(os.getenv('OTP_ISSUE_BURST', 3))
+    OTP_ISSUE_REFILL_SECONDS = float(os.getenv('OTP_ISSUE_REFILL_SECONDS', 60))
+    OTP_VERIFY_BURST = int(os.getenv('OTP_VERIFY_BURST', 5))
+    OTP_VERIFY_REFILL_SECONDS = float(os.getenv('OTP_VERIFY_REFILL_SECONDS', 30))
+    OTP_IP_BURST = int(os.getenv('OTP_IP_BURST', 20))
+    OTP_IP_REFILL_SECONDS = float(os.getenv('OTP_IP_REFILL_SECONDS', 6))
+    OTP_CACHE_SECONDS = float(os.getenv('OTP_CACHE_SECONDS', 300))
+    
+    # Password hashing configurations (a Werkzeug method string, see scripts/password_hash_benchmark.py)
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    
+    # User identity cache configurations (USER_CACHE_TTL=0 disables the cache;
+    # USER_CACHE_REDIS_URL shares it between processes and needs the redis package)
+    USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 300))
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 4096))
+    USER_CACHE_REDIS_URL = os.getenv('USER_CACHE_REDIS_URL', '')
+    USER_CACHE_LOCAL_TTL = float(os.getenv('USER_CACHE_LOCAL_TTL', 5))
+    
+    # Chatbot configurations (OPENAI_BASE_URL points the chatbot at another OpenAI-compatible
+    # server, e.g. scripts/mock_completion_server.py)
+    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')
+    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', 30))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', 2))
+    OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', 20))
+    CHATBOT_MAX_TOKENS = int(os.getenv('CHATBOT_MAX_TOKENS', 150))
+    
+    # Chatbot conversation memory (token budgets of the verbatim recent turns and of the
+    # rolling summary of older ones; together they bound the size of every prompt)
+    CHATBOT_HISTORY_TOKENS = int(os.getenv('CHATBOT_HISTORY_TOKENS', 800))
+    CHATBOT_SUMMARY_TOKENS = int(os.getenv('CHATBOT_SUMMARY_TOKENS', 200))
+    CHATBOT_HISTORY_MAX_TURNS = int(os.getenv('CHATBOT_HISTORY_MAX_TURNS', 40))
+    
+    # Chatbot language detection (seed keeps langdetect deterministic; memos last per conversation)
+    CHATBOT_LANGUAGE_SEED = int(os.getenv('CHATBOT_LANGUAGE_SEED', 0))
+    CHATBOT_LANGUAGE_MIN_PROBABILITY = float(os.getenv('CHATBOT_LANGUAGE_MIN_PROBABILITY', 0.9))
+    CHATBOT_LANGUAGE_MEMO_TTL = float(os.getenv('CHATBOT_LANGUAGE_MEMO_TTL', 1800))
+    
+    # Chatbot response cache (CHATBOT_CACHE_TTL=0 disables it; CHATBOT_CACHE_SIMILARITY is the
+    # cosine similarity a reworded question needs to reuse a reply, 0 disables that lookup)
+    CHATBOT_CACHE_TTL = float(os.getenv('CHATBOT_CACHE_TTL', 86400))
+    CHATBOT_CACHE_SIZE = int(os.getenv('CHATBOT_CACHE_SIZE', 2048))
+    CHATBOT_CACHE_SIMILARITY = float(os.getenv('CHATBOT_CACHE_SIMILARITY', 0.9))
+    # Model prices in USD per million tokens, used to estimate what cache hits saved
+    OPENAI_INPUT_COST_PER_1M = float(os.getenv('OPENAI_INPUT_COST_PER_1M', 0.15))
+    OPENAI_OUTPUT_COST_PER_1M = float(os.getenv('OPENAI_OUTPUT_COST_PER_1M', 0.60))
+    
+    # Vet availability configurations
+    AVAILABILITY_WINDOW_DAYS = int(os.getenv('AVAILABILITY_WINDOW_DAYS', 28))
+    
+    # SMS dispatch configurations
+    SMS_WORKERS = int(os.getenv('SMS_WORKERS', 4))
+    SMS_MAX_RETRIES = int(os.getenv('SMS_MAX_RETRIES', 5))
+    SMS_BACKOFF_BASE = float(os.getenv('SMS_BACKOFF_BASE', 2))
+    SMS_BACKOFF_MAX = float(os.getenv('SMS_BACKOFF_MAX', 300))
+    SMS_POLL_INTERVAL = float(os.getenv('SMS_POLL_INTERVAL', 5))
+    SMS_BATCH_SIZE = int(os.getenv('SMS_BATCH_SIZE', 50))
+    
+    # Email dispatch configurations
+    EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', 2))
+    EMAIL_POOL_SIZE = int(os.getenv('EMAIL_POOL_SIZE', 2))
+    EMAIL_SMTP_TIMEOUT = float(os.getenv('EMAIL_SMTP_TIMEOUT', 10))
+    EMAIL_MAX_RETRIES = int(os.getenv('EMAIL_MAX_RETRIES', 5))
+    EMAIL_BACKOFF_BASE = float(os.getenv('EMAIL_BACKOFF_BASE', 2))
+    EMAIL_BACKOFF_MAX = float(os.getenv('EMAIL_BACKOFF_MAX', 600))
+    EMAIL_POLL_INTERVAL = float(os.getenv('EMAIL_POLL_INTERVAL', 5))
+    EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', 20))
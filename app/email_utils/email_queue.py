@@ -0,0 +1,121 @@
+"""
+This module provides asynchronous delivery of outbound email.
+
+It provides the following:
+- EmailDispatcher: The email_outbox table's dispatcher, see app.outbox
+- email_dispatcher: The process-wide dispatcher instance
+- queue_email(): Queue an email and return without waiting for the SMTP server
+
+Emails are written to the email_outbox table before they are sent, so pending
+emails survive restarts. Each worker drains up to EMAIL_BATCH_SIZE queued
+emails at a time and sends them over one pooled SMTP connection. Temporary
+failures are retried with exponential backoff until EMAIL_MAX_RETRIES attempts
+have been made; permanent ones (5xx replies) fail straight away.
+"""
+
+from app.outbox import OutboxDispatcher
+
+from .email_service import SMTPPool, build_message, is_permanent
+
+
+class EmailDispatcher(OutboxDispatcher):
+    """
+    Outbound email queue backed by the email_outbox table.
+
+    Configured by the EMAIL_* settings; see OutboxDispatcher for the other attributes.
+
+    Attributes:
+        sender (str): The From address of every email.
+        pool (SMTPPool): The SMTP connections shared by the workers.
+    """
+
+    name = "email"
+    config_prefix = "EMAIL"
+
+    def __init__(self, workers=2, max_retries=5, backoff_base=2, backoff_max=600, poll_interval=5,
+                 queue_size=1000, batch_size=20):
+        super().__init__(workers, max_retries, backoff_base, backoff_max, poll_interval, queue_size, batch_size)
+        self.sender = None
+        self.pool = None
+
+    def model(self):
+        """The email_outbox model"""
+        from app.models import EmailMessage
+
+        return EmailMessage
+
+    def send(self, messages):
+        """Send a batch of emails over one pooled SMTP connection"""
+        return self.pool.send_batch([
+            build_message(self.sender, email.recipient, email.subject, email.body, email.html_body)
+            for email in messages
+        ])
+
+    def is_permanent(self, error):
+        """5xx SMTP replies fail without further attempts"""
+        return is_permanent(error)
+
+    def init_app(self, app):
+        """
+        Bind the dispatcher to the Flask application and configure the SMTP pool.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        super().init_app(app)
+        self.sender = app.config.get('MAIL_DEFAULT_SENDER') or app.config.get('MAIL_USERNAME')
+        self.pool = SMTPPool(
+            host=app.config.get('MAIL_SERVER'),
+            port=app.config.get('MAIL_PORT'),
+            username=app.config.get('MAIL_USERNAME'),
+            password=app.config.get('MAIL_PASSWORD'),
+            use_tls=app.config.get('MAIL_USE_TLS', True),
+            use_ssl=app.config.get('MAIL_USE_SSL', False),
+            size=app.config.get('EMAIL_POOL_SIZE', self.workers),
+            timeout=app.config.get('EMAIL_SMTP_TIMEOUT', 10)
+        )
+
+    def enqueue(self, recipient, subject, body, html_body=None):
+        """
+        Persist an email to the outbox and hand it to the workers.
+
+        Args:
+            recipient (str): The recipient's email address.
+            subject (str): The subject line.
+            body (str): The plain text body.
+            html_body (str): An optional HTML version of the body.
+
+        Returns:
+            int: The ID of the queued email.
+        """
+        return self._enqueue(recipient=recipient, subject=subject[:255], body=body, html_body=html_body)
+
+    def metrics(self):
+        """
+        Get the dispatcher's counters, delivery latency and SMTP connection count.
+
+        Returns:
+            dict: The shared outbox metrics plus the number of SMTP connections opened.
+        """
+        metrics = super().metrics()
+        metrics["connections_opened"] = self.pool.connects if self.pool is not None else 0
+        return metrics
+
+
+email_dispatcher = EmailDispatcher()
+
+
+def queue_email(recipient, subject, body, html_body=None):
+    """
+    Queue an email for asynchronous delivery.
+
+    Args:
+        recipient (str): The recipient's email address.
+        subject (str): The subject line.
+        body (str): The plain text body.
+        html_body (str): An optional HTML version of the body.
+
+    Returns:
+        int: The ID of the queued email.
+    """
+    return email_dispatcher.enqueue(recipient, subject, body, html_body)
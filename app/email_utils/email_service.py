@@ -0,0 +1,213 @@
+"""
+This module sends email over a pool of persistent SMTP connections.
+
+It provides the following:
+- SMTPPool: Reusable SMTP connections that reconnect when the server drops them
+- build_message(): Build a MIME message from a recipient, subject and body
+
+Opening an SMTP connection costs a TCP handshake, STARTTLS and a login, which
+is far more than sending one message over it. The pool keeps up to `size`
+logged-in connections open between batches and sends a whole batch over one
+connection; each sending worker uses one connection at a time. A
+connection that has been idle for a while is checked with NOOP before use,
+and one the server has closed is replaced transparently.
+
+For local testing point MAIL_SERVER/MAIL_PORT at an SMTP stub, e.g.
+`python -m aiosmtpd -n -l localhost:8025` with MAIL_USE_TLS=False and no
+MAIL_USERNAME.
+"""
+
+import smtplib
+import threading
+import time
+from email.message import EmailMessage as MIMEMessage
+from email.utils import make_msgid
+
+
+def build_message(sender, recipient, subject, body, html_body=None, message_id=None):
+    """
+    Build a MIME message.
+
+    Args:
+        sender (str): The From address.
+        recipient (str): The To address.
+        subject (str): The subject line.
+        body (str): The plain text body.
+        html_body (str): An optional HTML alternative of the body.
+        message_id (str): The Message-ID header, generated if not given.
+
+    Returns:
+        email.message.EmailMessage: The message.
+    """
+    message = MIMEMessage()
+    message['From'] = sender
+    message['To'] = recipient
+    message['Subject'] = subject
+    message['Message-ID'] = message_id or make_msgid()
+    message.set_content(body)
+    if html_body:
+        message.add_alternative(html_body, subtype='html')
+    return message
+
+
+def is_permanent(error):
+    """
+    Check whether an SMTP error will fail again on retry.
+
+    Args:
+        error (Exception): The error raised while sending.
+
+    Returns:
+        bool: True for 5xx replies and refused recipients, False for
+            temporary (4xx) and connection errors.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500 and not isinstance(error, smtplib.SMTPAuthenticationError)
+    return False
+
+
+class SMTPPool:
+    """
+    Pool of persistent, logged-in SMTP connections.
+
+    Attributes:
+        host (str): The SMTP server.
+        port (int): The SMTP port.
+        username (str): The login user, or None to send without logging in.
+        password (str): The login password.
+        use_tls (bool): Upgrade connections with STARTTLS.
+        use_ssl (bool): Connect with implicit TLS (port 465).
+        size (int): Maximum number of idle connections kept open.
+        timeout (float): Socket timeout in seconds.
+        idle_check (float): Seconds of idleness after which a connection is checked with NOOP.
+        max_messages (int): Messages sent over a connection before it is recycled.
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_tls=True, use_ssl=False,
+                 size=2, timeout=10, idle_check=30, max_messages=100):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.size = size
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self.max_messages = max_messages
+        self._idle = []
+        self._lock = threading.Lock()
+        self.connects = 0
+
+    def _connect(self):
+        """Open and log in a new connection"""
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                conn.starttls()
+        if self.username:
+            conn.login(self.username, self.password)
+        self.connects += 1
+        return [conn, time.monotonic(), 0]
+
+    @staticmethod
+    def _close(entry):
+        """Close a connection, ignoring errors from an already dead one"""
+        try:
+            entry[0].quit()
+        except (smtplib.SMTPException, OSError):
+            entry[0].close()
+
+    def _acquire(self):
+        """Take an idle connection that still works, or open a new one"""
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return self._connect()
+            if time.monotonic() - entry[1] < self.idle_check:
+                return entry
+            try:
+                if entry[0].noop()[0] == 250:
+                    return entry
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(entry)
+
+    def _release(self, entry):
+        """Return a connection to the pool, or close it if it is worn out or the pool is full"""
+        entry[1] = time.monotonic()
+        with self._lock:
+            if entry[2] < self.max_messages and len(self._idle) < self.size:
+                self._idle.append(entry)
+                return
+        self._close(entry)
+
+    def _reconnect(self, entry):
+        """Close a broken connection so the next send opens a fresh one"""
+        if entry is not None:
+            self._close(entry)
+        return None
+
+    def send_batch(self, messages):
+        """
+        Send messages over one pooled connection.
+
+        If the server drops the connection mid-batch it is reopened once and
+        the remaining messages are sent over the new connection.
+
+        Args:
+            messages (list): email.message.EmailMessage objects.
+
+        Returns:
+            list: For each message, None if it was accepted or the exception that
+                made it fail, in the same order as messages.
+        """
+        results = []
+        entry = None
+        reconnected = False
+
+        while len(results) < len(messages):
+            message = messages[len(results)]
+            try:
+                if entry is None:
+                    entry = self._acquire()
+                entry[0].send_message(message)
+                entry[2] += 1
+                results.append(None)
+            except smtplib.SMTPServerDisconnected as e:
+                entry = self._reconnect(entry)
+                if reconnected:
+                    results.extend(e for _ in range(len(messages) - len(results)))
+                reconnected = True
+            except smtplib.SMTPException as e:
+                # Checked before OSError, which SMTPException subclasses
+                if entry is None:
+                    # Connecting failed, e.g. a rejected login; the rest would fail too
+                    results.extend(e for _ in range(len(messages) - len(results)))
+                else:
+                    # The server refused this message; the connection is still usable
+                    results.append(e)
+            except OSError as e:
+                # A socket error or timeout; the connection cannot be trusted any more
+                entry = self._reconnect(entry)
+                if reconnected:
+                    results.extend(e for _ in range(len(messages) - len(results)))
+                reconnected = True
+
+        if entry is not None:
+            self._release(entry)
+        return results
+
+    def close(self):
+        """
+        Close every idle connection.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._close(entry)
@@ -0,0 +1,103 @@
+"""
+This module contains the booking of vet availability slots by farmers.
+
+It provides the following:
+- SlotUnavailable: Raised when a slot is already booked, in the past or gone
+- book_slot(): Atomically reserve a slot and create its appointment
+
+A slot is reserved with a single conditional UPDATE that only matches while
+the slot is free, so of many concurrent attempts exactly one changes the row
+and the others see zero affected rows. The unique constraint on the
+appointments' active_slot_id backs this up at the database level, and a
+client idempotency key makes retried requests return the original appointment
+instead of booking twice.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app.models import db, Appointment, VetAvailability
+from app.queries import invalidate_vet_search
+
+
+class SlotUnavailable(Exception):
+    """
+    Raised when a slot cannot be booked.
+    """
+
+
+def _find_by_idempotency_key(farmer_id, idempotency_key):
+    """Get the appointment a farmer already made with an idempotency key"""
+    if not idempotency_key:
+        return None
+    return Appointment.query.filter_by(farmer_id=farmer_id, idempotency_key=idempotency_key).first()
+
+
+def book_slot(farmer_id, slot_id, livestock_id, notes='', idempotency_key=None, now=None):
+    """
+    Reserve a slot and create the appointment in one transaction.
+
+    Args:
+        farmer_id (int): The user ID of the farmer booking the slot.
+        slot_id (int): The ID of the slot to book.
+        livestock_id (int): The ID of the livestock the appointment is for.
+        notes (str): Notes for the vet.
+        idempotency_key (str): Client key identifying this booking attempt; a
+            repeated key returns the appointment made by the first attempt.
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        tuple: (appointment, created) where created is False when an earlier
+            attempt with the same idempotency key already booked it.
+
+    Raises:
+        SlotUnavailable: If the slot is booked, in the past or does not exist.
+    """
+    existing = _find_by_idempotency_key(farmer_id, idempotency_key)
+    if existing:
+        return existing, False
+
+    reserved = db.session.execute(
+        update(VetAvailability)
+        .where(
+            VetAvailability.id == slot_id,
+            VetAvailability.is_booked == False,
+            VetAvailability.start_time > (now or datetime.utcnow())
+        )
+        .values(is_booked=True)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    if reserved != 1:
+        db.session.rollback()
+        # A concurrent retry of the same request may have won the slot
+        existing = _find_by_idempotency_key(farmer_id, idempotency_key)
+        if existing:
+            return existing, False
+        raise SlotUnavailable()
+
+    slot = db.session.get(VetAvailability, slot_id)
+    appointment = Appointment(
+        farmer_id=farmer_id,
+        vet_id=slot.vet_id,
+        slot_id=slot_id,
+        livestock_id=livestock_id,
+        notes=notes,
+        idempotency_key=idempotency_key or None
+    )
+    db.session.add(appointment)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        existing = _find_by_idempotency_key(farmer_id, idempotency_key)
+        if existing:
+            return existing, False
+        raise SlotUnavailable()
+
+    # The slot was reserved with a bulk UPDATE, which skips the ORM events
+    invalidate_vet_search()
+    return appointment, True
@@ -10,7 +10,7 @@ It includes the following routes:
 
 Functions:
 - farmer_profile(): Allows farmers to view and update their profile.
-- find_vets(): Allows farmers to view available vets.
+- find_vets(): Allows farmers to search vets by location, specialization, rating and availability.
 - vet_availability(vet_id): Allows farmers to view a vet's availability slots.
 - book_appointment(slot_id): Allows farmers to book an appointment with a vet.
 - farmer_appointments(): Allows farmers to view their appointments.
@@ -18,11 +18,16 @@ Functions:
 
 from flask import current_app, render_template, request, redirect, url_for, flash, abort
 from flask_login import login_required, current_user
-from app.models import db, Appointment, Vet, VetAvailability, Livestock
-from app.utils import send_email
+from app.models import db, Vet, VetAvailability, Livestock
+from app.queries import farmer_appointments as farmer_appointments_page
+from app.queries import search_vets, vets_free_this_week, week_end, VetPage, VETS_PER_PAGE
+from app.utils import send_email, KENYA_COUNTIES, VET_SPECIALIZATIONS, COUNTY_TOWNS
 from datetime import datetime
+import uuid
 from .forms import LivestockForm
-from app.sms_utils.sms_service import send_sms
+from .booking import book_slot, SlotUnavailable
+from app.vet.availability import materialize_slots
+from app.sms_utils.sms_queue import queue_sms
 from app.sms_utils.sms_templates import appointment_notification_vet_template
 
 from . import farmer_bp
@@ -42,26 +47,56 @@ def farmer_profile():
     if current_user.user_role != 'farmer':
         abort(403)
     
-    appointments = Appointment.query.filter(
-        Appointment.farmer_id == current_user.id
-    ).all()
+    page = farmer_appointments_page(current_user.id, request.args.get('cursor'))
     
-    return render_template('farmer_profile.html', appointments=appointments)
+    return render_template('farmer_profile.html', appointments=page.items, next_cursor=page.next_cursor)
 
 @farmer_bp.route('/find-vets', methods=['GET'])
 @login_required
 def find_vets():
     """
-    Route for farmers to view available vets.
+    Route for farmers to search vets.
+    
+    Query parameters filter by county, town, specialization, min_rating,
+    verified=1 and available=week (a free slot before the end of this week),
+    and select the page.
 
     Returns:
         Response: Rendered HTML template for viewing available vets.
     """
     if current_user.user_role != 'farmer':
         abort(403)
-
-    vets = Vet.query.all()
-    return render_template('find_vets.html', vets=vets)
+    
+    filters = {
+        "county": request.args.get('county') or None,
+        "town": request.args.get('town') or None,
+        "specialization": request.args.get('specialization') or None,
+        "min_rating": request.args.get('min_rating', type=float),
+        "verified_only": request.args.get('verified') == '1',
+    }
+    free_this_week = request.args.get('available') == 'week'
+    page_number = request.args.get('page', 1, type=int)
+    
+    if free_this_week and filters["county"] and not any((filters["town"], filters["specialization"], filters["min_rating"])):
+        # Common case served from the per-county cache
+        vets = vets_free_this_week(filters["county"])
+        if filters["verified_only"]:
+            vets = [vet for vet in vets if vet.is_verified]
+        start = (max(page_number, 1) - 1) * VETS_PER_PAGE
+        page = VetPage(vets[start:start + VETS_PER_PAGE], max(page_number, 1), len(vets) > start + VETS_PER_PAGE)
+    else:
+        free_before = week_end() if free_this_week else None
+        page = search_vets(free_before=free_before, page=page_number, **filters)
+    
+    return render_template(
+        'find_vets.html',
+        vets=page.items,
+        page=page.page,
+        has_next=page.has_next,
+        counties=KENYA_COUNTIES,
+        specializations=VET_SPECIALIZATIONS,
+        towns=COUNTY_TOWNS.get(filters["county"], [])
+    )
 
 @farmer_bp.route('/vet/<int:vet_id>/availability', methods=['GET'])
 @login_required
@@ -77,6 +112,9 @@ def vet_availability(vet_id):
     """
     vet = Vet.query.get_or_404(vet_id)
     
+    # Generate any slots due from the vet's weekly schedule
+    materialize_slots(vet.user_id)
+    
     # Get available slots in the future
     availability_slots = VetAvailability.query.filter(
         VetAvailability.vet_id == vet.user_id,
@@ -89,13 +127,20 @@ def vet_availability(vet_id):
         flash('You need to add livestock before booking an appointment.', 'warning')
         return redirect(url_for('farmer.add_livestock'))
     
-    return render_template('vet_availability.html', vet=vet, availability_slots=availability_slots, livestock_list=livestock_list)
+    # One key per page view, so resubmitting a form from this page cannot book twice
+    idempotency_key = uuid.uuid4().hex
+    
+    return render_template('vet_availability.html', vet=vet, availability_slots=availability_slots,
+                           livestock_list=livestock_list, idempotency_key=idempotency_key)
 
 @farmer_bp.route('/book_appointment/<int:slot_id>', methods=['POST'])
 @login_required
 def book_appointment(slot_id):
     """
     Route for farmers to book an appointment with a vet.
+    
+    The form carries an idempotency_key (or the client sends an
+    Idempotency-Key header) so a resubmitted form does not book twice.
 
     Args:
         slot_id (int): The ID of the slot to book.
@@ -108,38 +153,40 @@ def book_appointment(slot_id):
         
     slot = VetAvailability.query.get_or_404(slot_id)
     
-    if slot.is_booked:
-        flash('This slot is already booked', 'danger')
-        return redirect(url_for('farmer.vet_availability', vet_id=slot.vet_id))
-    
     if slot.start_time < datetime.utcnow():
         flash('Cannot book past availability slots', 'danger')
-        return redirect(url_for('farmer.vet_availability', vet_id=slot.vet_id))
+        return redirect(url_for('farmer.vet_availability', vet_id=slot.vet.vet_profile.id))
     
     # Extract livestock ID from the form data
     livestock_id = request.form.get('livestock_id')
     if not livestock_id:
         flash('Please select a livestock to book an appointment.', 'danger')
-        return redirect(url_for('farmer.vet_availability', vet_id=slot.vet_id))
-    
-    appointment = Appointment(
-        farmer_id=current_user.id,
-        vet_id=slot.vet_id,
-        slot_id=slot.id,
-        livestock_id=int(livestock_id),
-        notes=request.form.get('notes', '')
-    )
+        return redirect(url_for('farmer.vet_availability', vet_id=slot.vet.vet_profile.id))
+    
+    idempotency_key = (request.headers.get('Idempotency-Key') or request.form.get('idempotency_key') or '')[:64]
     
-    slot.is_booked = True
-    db.session.add(appointment)
-    db.session.commit()
+    try:
+        appointment, created = book_slot(
+            current_user.id,
+            slot.id,
+            int(livestock_id),
+            notes=request.form.get('notes', ''),
+            idempotency_key=idempotency_key
+        )
+    except SlotUnavailable:
+        flash('This slot is already booked', 'danger')
+        return redirect(url_for('farmer.vet_availability', vet_id=slot.vet.vet_profile.id))
+    
+    if not created:
+        flash('Appointment already booked', 'info')
+        return redirect(url_for('farmer.farmer_profile'))
     
     # Send Email to Vet
     vet = Vet.query.filter_by(user_id=slot.vet_id).first()
     if vet:
         vet_email = vet.user.email
         message = f"Hello {vet.user.last_name},\n\nYou have a new appointment with {current_user.last_name} on {slot.start_time}."
-        send_sms(
+        queue_sms(
             vet.user.phone.lstrip('+'),
             appointment_notification_vet_template(
                 current_user.last_name,
@@ -201,8 +248,7 @@ def farmer_appointments():
     if current_user.user_role != 'farmer':
         abort(403)
         
-    appointments = Appointment.query.filter_by(farmer_id=current_user.id)\
-        .order_by(Appointment.created_at.desc()).all()
+    page = farmer_appointments_page(current_user.id, request.args.get('cursor'))
     
-    return render_template('farmer_appointments.html', appointments=appointments)
+    return render_template('farmer_appointments.html', appointments=page.items, next_cursor=page.next_cursor)
 
@@ -4,6 +4,7 @@ This module initializes the health monitoring blueprint for the Flask applicatio
 It sets up the following:
 - Blueprint for health monitoring routes
 - Imports the routes for health monitoring
+- Imports the `flask health` CLI commands for health data maintenance
 
 The blueprint handles functionalities related to health monitoring of livestock.
 """
@@ -11,7 +12,7 @@ The blueprint handles functionalities related to health monitoring of livestock.
 from flask import Blueprint
 
 # Create a blueprint for health monitoring
-health_monitoring_bp = Blueprint('health_monitoring', __name__, template_folder='templates')
+health_monitoring_bp = Blueprint('health_monitoring', __name__, template_folder='templates', cli_group='health')
 
-# Import the routes for health monitoring
-from . import routes
\ No newline at end of file
+# Import the routes and CLI commands for health monitoring
+from . import routes, commands
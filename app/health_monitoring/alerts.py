@@ -0,0 +1,174 @@
+"""
+This module defines the alert engine for livestock threshold breaches.
+
+It provides the following:
+- AlertEngine: Stateful deduplication of alerts per (livestock, metric, direction)
+
+An alert fires once when a reading enters a breach. It is re-armed only after
+the value has recovered past the threshold by a hysteresis margin, and a new
+breach inside the cooldown period after the last alert is suppressed. This
+bounds the number of SMS sent per incident no matter how often readings arrive.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Alert states
+NORMAL = "normal"
+BREACHED = "breached"
+
+# Default hysteresis margins per metric
+DEFAULT_HYSTERESIS = {
+    "temperature": 0.5,
+    "pulse": 5,
+}
+
+
+class AlertEngine:
+    """
+    Stateful alert engine keyed by (livestock_id, metric, direction).
+
+    Attributes:
+        cooldown (float): Minimum seconds between two alerts for the same key.
+        hysteresis (dict): Recovery margin per metric before an alert is re-armed.
+        history_size (int): Number of state transitions kept in memory.
+    """
+
+    def __init__(self, cooldown=900, hysteresis=None, history_size=1000):
+        self.cooldown = cooldown
+        self.hysteresis = dict(DEFAULT_HYSTERESIS, **(hysteresis or {}))
+        self._lock = threading.Lock()
+        self._states = {}
+        self._breached = {}
+        self._last_fired = {}
+        self._history = deque(maxlen=history_size)
+
+    def init_app(self, app):
+        """
+        Load the alert settings from the Flask application config.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.cooldown = app.config.get('ALERT_COOLDOWN_SECONDS', self.cooldown)
+        self.hysteresis.update({
+            "temperature": app.config.get('ALERT_HYSTERESIS_TEMPERATURE', self.hysteresis["temperature"]),
+            "pulse": app.config.get('ALERT_HYSTERESIS_PULSE', self.hysteresis["pulse"]),
+        })
+
+    def evaluate(self, livestock_id, metric, value, low, high):
+        """
+        Evaluate a reading against its thresholds and update the alert state.
+
+        Args:
+            livestock_id (int): The ID of the livestock.
+            metric (str): The metric being evaluated ("temperature" or "pulse").
+            value (float): The current value of the metric.
+            low (float): The low threshold, or None to skip the low check.
+            high (float): The high threshold, or None to skip the high check.
+
+        Returns:
+            list: Directions ("high" or "low") for which an alert should be sent now.
+        """
+        margin = self.hysteresis.get(metric, 0)
+        fired = []
+
+        with self._lock:
+            if high is not None:
+                if self._transition(livestock_id, metric, "high", value,
+                                    breached=value > high, recovered=value <= high - margin):
+                    fired.append("high")
+            if low is not None:
+                if self._transition(livestock_id, metric, "low", value,
+                                    breached=value < low, recovered=value >= low + margin):
+                    fired.append("low")
+
+        return fired
+
+    def _transition(self, livestock_id, metric, direction, value, breached, recovered):
+        """
+        Move one alert key through its state machine. Must be called with the lock held.
+
+        Returns:
+            bool: True if an alert should be sent.
+        """
+        key = (livestock_id, metric, direction)
+        state = self._states.get(key, NORMAL)
+        now = time.monotonic()
+
+        if state == NORMAL and breached:
+            self._states[key] = BREACHED
+            self._breached[livestock_id] = self._breached.get(livestock_id, 0) + 1
+            last_fired = self._last_fired.get(key)
+            if last_fired is not None and now - last_fired < self.cooldown:
+                self._record(key, "suppressed", value)
+                return False
+            self._last_fired[key] = now
+            self._record(key, "raised", value)
+            return True
+
+        if state == BREACHED and recovered:
+            self._states[key] = NORMAL
+            self._breached[livestock_id] -= 1
+            if not self._breached[livestock_id]:
+                del self._breached[livestock_id]
+            self._record(key, "cleared", value)
+
+        return False
+
+    def _record(self, key, event, value):
+        """
+        Record an alert state transition. Must be called with the lock held.
+        """
+        livestock_id, metric, direction = key
+        transition = {
+            "livestock_id": livestock_id,
+            "metric": metric,
+            "direction": direction,
+            "event": event,
+            "value": value,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        self._history.append(transition)
+        print(f"🚨 Alert {event}: livestock {livestock_id} {metric} {direction} ({value})")
+
+    def state(self, livestock_id, metric, direction):
+        """
+        Get the current state of an alert key.
+
+        Returns:
+            str: "normal" or "breached".
+        """
+        with self._lock:
+            return self._states.get((livestock_id, metric, direction), NORMAL)
+
+    def is_breached(self, livestock_id):
+        """
+        Check whether any alert of a livestock is currently in breach.
+
+        Args:
+            livestock_id (int): The ID of the livestock.
+
+        Returns:
+            bool: True if at least one metric of the livestock is breached.
+        """
+        with self._lock:
+            return livestock_id in self._breached
+
+    def history(self, livestock_id=None):
+        """
+        Get the recorded alert state transitions, oldest first.
+
+        Args:
+            livestock_id (int): Only return transitions of this livestock if given.
+
+        Returns:
+            list: Transition dicts.
+        """
+        with self._lock:
+            return [
+                transition for transition in self._history
+                if livestock_id is None or transition["livestock_id"] == livestock_id
+            ]
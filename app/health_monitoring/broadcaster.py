@@ -0,0 +1,139 @@
+"""
+This module defines the process-wide telemetry broadcaster.
+
+It provides the following:
+- LivestockBroadcaster: A single background loop shared by every connected dashboard
+
+The loop is started when the first dashboard subscribes and stops on its own
+once the last one disconnects, so the work done per tick does not grow with
+the number of open dashboards. Between ticks the loop sleeps until new data is
+published, then waits a short coalescing window so a burst of readings goes
+out in one tick.
+"""
+
+import threading
+
+
+class LivestockBroadcaster:
+    """
+    Reference-counted background broadcaster for livestock telemetry.
+
+    Attributes:
+        socketio (SocketIO): The SocketIO instance used to run the background task.
+        tick (callable): Function called when data is published, and at least once
+            per interval while there are subscribers.
+        interval (float): Maximum seconds to wait between ticks when nothing is published.
+        coalesce_window (float): Seconds to wait after a publish before ticking.
+    """
+
+    def __init__(self, socketio, tick, interval=10, coalesce_window=0.25):
+        self.socketio = socketio
+        self.tick = tick
+        self.interval = interval
+        self.coalesce_window = coalesce_window
+        self.app = None
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._running = False
+        self._wakeup = None
+
+    def init_app(self, app):
+        """
+        Bind the broadcaster to the Flask application.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.app = app
+        self.interval = app.config.get('TELEMETRY_BROADCAST_INTERVAL', self.interval)
+        self.coalesce_window = app.config.get('TELEMETRY_COALESCE_WINDOW', self.coalesce_window)
+
+    def _get_wakeup(self):
+        """
+        Get the event used to wake the loop, created for the server's async mode.
+        """
+        if self._wakeup is None:
+            self._wakeup = self.socketio.server.eio.create_event()
+        return self._wakeup
+
+    def notify(self):
+        """
+        Wake the background loop because new data was published.
+        """
+        if self.is_running:
+            self._get_wakeup().set()
+
+    @property
+    def subscriber_count(self):
+        """
+        int: The number of subscribed clients.
+        """
+        with self._lock:
+            return len(self._subscribers)
+
+    @property
+    def is_running(self):
+        """
+        bool: True while the background loop is running.
+        """
+        with self._lock:
+            return self._running
+
+    def subscribe(self, sid):
+        """
+        Subscribe a client and start the background loop if it is not running.
+
+        Args:
+            sid (str): The Socket.IO session ID of the client.
+        """
+        with self._lock:
+            self._subscribers.add(sid)
+            if self._running:
+                return
+            self._running = True
+
+        print("🐄 Starting livestock broadcaster")
+        self.socketio.start_background_task(self._run)
+
+    def unsubscribe(self, sid):
+        """
+        Unsubscribe a client. The background loop stops once no clients remain.
+
+        Args:
+            sid (str): The Socket.IO session ID of the client.
+        """
+        with self._lock:
+            self._subscribers.discard(sid)
+            empty = not self._subscribers
+
+        # Let the loop notice straight away that it has nothing left to do
+        if empty and self.is_running:
+            self._get_wakeup().set()
+
+    def _run(self):
+        """
+        Run the tick function on every publish until there are no subscribers.
+        """
+        wakeup = self._get_wakeup()
+
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._running = False
+                    print("🛑 No subscribers left. Stopping livestock broadcaster")
+                    return
+                clients = len(self._subscribers)
+
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        self.tick(clients)
+                else:
+                    self.tick(clients)
+            except Exception as e:
+                print(f"❌ Livestock broadcaster tick failed: {e}")
+
+            # Sleep until data is published, then gather the rest of the burst
+            if wakeup.wait(timeout=self.interval):
+                self.socketio.sleep(self.coalesce_window)
+            wakeup.clear()
@@ -0,0 +1,46 @@
+"""
+This module defines the `flask health` CLI commands for health data maintenance.
+
+It provides the following:
+- flask health prune: Apply the retention policies to raw readings and rollups
+- flask health rebuild-rollups: Recompute rollups from raw readings
+
+Run `flask health prune` periodically, e.g. daily from cron.
+"""
+
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+
+from . import health_monitoring_bp
+
+
+@health_monitoring_bp.cli.command('prune')
+def prune():
+    """
+    Delete raw readings and rollups that are past their retention period.
+    """
+    from .storage import apply_retention
+
+    deleted = apply_retention(current_app.config)
+    for name, count in deleted.items():
+        print(f"🧹 Pruned {count} {name} rows")
+
+
+@health_monitoring_bp.cli.command('rebuild-rollups')
+@click.option('--days', default=30, show_default=True, help='Number of past days to rebuild.')
+def rebuild_rollups(days):
+    """
+    Recompute the rollups of the last DAYS days from the raw readings.
+
+    Use this once after upgrading to backfill rollups for readings stored
+    before rollups existed, and before those readings are pruned. Days whose
+    raw readings were already partly pruned keep their rollups.
+    """
+    from .storage import rebuild_rollups as rebuild
+
+    end = datetime.utcnow()
+    count = rebuild(end - timedelta(days=days), end,
+                    raw_retention_days=current_app.config.get('HEALTH_RAW_RETENTION_DAYS', 30), now=end)
+    print(f"📊 Rebuilt rollups from {count} readings")
@@ -0,0 +1,62 @@
+"""
+This module contains downsampling of time series for the metrics charts.
+
+It provides the following:
+- lttb(): Largest-Triangle-Three-Buckets downsampling of an (x, y) series
+
+LTTB keeps the first and last points and, from each bucket in between, the
+point forming the largest triangle with its neighbours. Peaks and dips survive
+downsampling, which matters for health data where the outliers are the point.
+"""
+
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """
+    Downsample a series to at most threshold points.
+
+    Args:
+        x (numpy.ndarray): Monotonically increasing x values, e.g. timestamps.
+        y (numpy.ndarray): The y values.
+        threshold (int): The maximum number of points to return.
+
+    Returns:
+        tuple: (x, y) arrays of the selected points, in order.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket i covers points [edges[i], edges[i + 1]); the first and last
+    # points are buckets of their own
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.intp) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
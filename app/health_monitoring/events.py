@@ -1,120 +1,228 @@
 from flask import request, current_app
+from flask_login import current_user
 
-from flask_socketio import join_room
-import eventlet
-from datetime import datetime, timedelta
+from flask_socketio import join_room, leave_room
 
-from app.sms_utils.sms_service import send_sms
+from app.sms_utils.sms_queue import queue_sms
 from app.sms_utils.sms_templates import livestock_alert_template
 
 from .extensions import socketio
 from .shared_data import latest_health_data
+from .broadcaster import LivestockBroadcaster
+from .alerts import AlertEngine
+from .thresholds import rule_cache, TEMP_LOW, TEMP_HIGH, PULSE_LOW, PULSE_HIGH
+
+# Readings older than this are no longer streamed or alerted on
+STALE_AFTER_SECONDS = 15
+
+# Maximum seconds between broadcaster ticks when no readings arrive
+BROADCAST_INTERVAL = 10
+
+# Seconds to gather a burst of readings before emitting them
+COALESCE_WINDOW = 0.25
+
+def farmer_room(farmer_id):
+    """Name of the room that receives every reading of a farmer's livestock"""
+    return f"farmer_{farmer_id}"
+
+
+def livestock_room(livestock_id):
+    """Name of the room that receives the readings of a single livestock"""
+    return f"livestock_{livestock_id}"
 
-# Thresholds
-TEMP_THRESHOLD_HIGH = 40.0
-TEMP_THRESHOLD_LOW = 10.0
-PULSE_THRESHOLD_HIGH = 100
-PULSE_THRESHOLD_LOW = 60
 
 @socketio.on('connect')
 def handle_connect():
     """Handle Client Connection"""
     sid = request.sid
+    
+    if not current_user.is_authenticated:
+        print(f"❌ Rejected unauthenticated client {sid}")
+        return False
+    
     print(f"✅ Client connected with session_id {sid}!")
     
-    join_room("livestock_room")
-    print(f"🔹 Client {sid} joined 'livestock_room'")
+    # Only farmers receive telemetry; other roles share the socket for chat
+    farmer = current_user.farmer_profile
+    if farmer is None:
+        return
+    
+    join_room(farmer_room(farmer.id))
+    print(f"🔹 Client {sid} joined '{farmer_room(farmer.id)}'")
+    
+    broadcaster.subscribe(sid)
+
+
+@socketio.on('disconnect')
+def handle_disconnect(reason=None):
+    """Handle Client Disconnection"""
+    sid = request.sid
+    print(f"👋 Client {sid} disconnected")
+    
+    broadcaster.unsubscribe(sid)
+
+
+@socketio.on('watch_livestock')
+def handle_watch_livestock(data):
+    """
+    Join the room of a single livestock owned by the connected farmer.
+
+    Args:
+        data (dict): The data received from the client, with a livestock_id.
+    """
+    from app.models import Livestock
+    
+    farmer = current_user.farmer_profile if current_user.is_authenticated else None
+    livestock = Livestock.query.get(data.get('livestock_id')) if farmer and isinstance(data, dict) else None
+    
+    if not livestock or livestock.farmer_id != farmer.id:
+        print(f"❌ Client {request.sid} may not watch livestock {data}")
+        return {"status": "error", "message": "Livestock not found"}
     
-    socketio.start_background_task(send_livestock_data)
-
-
-def send_livestock_data():
-    print("🐄 Sending Livestock Data...")
-
-    while True:
-        clients = len(list(socketio.server.manager.get_participants('/', 'livestock_room')))
-        print(f"👥 Connected clients: {clients}")
-
-        if clients > 0 and latest_health_data:
-            try:
-                data_time = datetime.fromisoformat(latest_health_data.get("timestamp", ""))
-                now = datetime.utcnow()
-
-                # Only proceed if data is fresh
-                if now - data_time > timedelta(seconds=15):
-                    print("⚠️ Latest data is stale. Skipping emission and alerts.")
-                    eventlet.sleep(10)
-                    continue
-            except Exception as e:
-                print(f"❌ Error parsing timestamp or missing timestamp: {e}")
-                eventlet.sleep(10)
-                continue
-
-            print(f"📊 Sending fresh data: {latest_health_data}")
-
-            farmer_phone = latest_health_data.get("farmer_phone")
-            if not farmer_phone:
-                print("❌ Farmer phone number not found in latest health data.")
-                eventlet.sleep(10)
-                continue
-
-            # --- Send alerts only for fresh data ---
-            if latest_health_data["temperature"] > TEMP_THRESHOLD_HIGH:
-                send_sms(
-                    phone_number=farmer_phone.lstrip('+'),
-                    message=livestock_alert_template("temperature", latest_health_data["temperature"], True),
-                    ref_id="livestock_alert"
-                )
-                socketio.emit("livestock_alert", {
-                    "message": "High temperature detected!",
-                    "type": "temperature",
-                    "value": latest_health_data["temperature"],
-                    "isExceeding": True
-                }, room="livestock_room")
-            elif latest_health_data["temperature"] < TEMP_THRESHOLD_LOW:
-                send_sms(
-                    phone_number=farmer_phone.lstrip('+'),
-                    message=livestock_alert_template("temperature", latest_health_data["temperature"], False),
-                    ref_id="livestock_alert"
-                )
-                socketio.emit("livestock_alert", {
-                    "message": "Low temperature detected!",
-                    "type": "temperature",
-                    "value": latest_health_data["temperature"],
-                    "isExceeding": False
-                }, room="livestock_room")
-
-            if latest_health_data["pulse"] > PULSE_THRESHOLD_HIGH:
-                send_sms(
-                    phone_number=farmer_phone.lstrip('+'),
-                    message=livestock_alert_template("pulse", latest_health_data["pulse"], True),
-                    ref_id="livestock_alert"
-                )
-                socketio.emit("livestock_alert", {
-                    "message": "High pulse rate detected!",
-                    "type": "pulse",
-                    "value": latest_health_data["pulse"],
-                    "isExceeding": True
-                }, room="livestock_room")
-            elif latest_health_data["pulse"] < PULSE_THRESHOLD_LOW:
-                send_sms(
-                    phone_number=farmer_phone.lstrip('+'),
-                    message=livestock_alert_template("pulse", latest_health_data["pulse"], False),
-                    ref_id="livestock_alert"
-                )
-                socketio.emit("livestock_alert", {
-                    "message": "Low pulse rate detected!",
-                    "type": "pulse",
-                    "value": latest_health_data["pulse"],
-                    "isExceeding": False
-                }, room="livestock_room")
-
-            # Emit the data itself
-            socketio.emit("livestock_data", latest_health_data, room="livestock_room")
-        else:
-            print("🚫 No clients connected or no data. Skipping data transmission.")
-
-        eventlet.sleep(10)
+    join_room(livestock_room(livestock.id))
+    return {"status": "success"}
+
+
+@socketio.on('unwatch_livestock')
+def handle_unwatch_livestock(data):
+    """
+    Leave the room of a single livestock.
+
+    Args:
+        data (dict): The data received from the client, with a livestock_id.
+    """
+    if isinstance(data, dict) and data.get('livestock_id') is not None:
+        leave_room(livestock_room(data['livestock_id']))
+
+
+def send_livestock_data(clients):
+    """
+    Emit every reading that changed since the previous tick.
+
+    Readings of the same livestock that arrived within one tick are coalesced
+    into the latest one, and unchanged livestock are not re-sent.
+
+    Args:
+        clients (int): The number of subscribed clients.
+    """
+    print(f"👥 Connected clients: {clients}")
+
+    # Drop readings from livestock that stopped reporting
+    stale = latest_health_data.expire(STALE_AFTER_SECONDS)
+    if stale:
+        print(f"⚠️ Dropped stale data for livestock {stale}")
+
+    changed = latest_health_data.pop_changed()
+    if not changed:
+        print("🚫 No new data. Skipping data transmission.")
+        return
+
+    # Check the whole batch against each animal's threshold profile at once
+    readings = list(changed.values())
+    limits, breached = rule_cache.get().evaluate(readings)
+
+    for reading, reading_limits, is_breached in zip(readings, limits, breached):
+        # Readings inside their limits only matter to animals with an open alert
+        check_alerts = bool(is_breached) or alert_engine.is_breached(reading["livestock_id"])
+        send_reading(reading, reading_limits if check_alerts else None)
+
+
+def send_reading(reading, limits=None):
+    """
+    Check a single livestock reading against its thresholds and emit it.
+
+    Args:
+        reading (dict): The latest reading of one livestock.
+        limits (numpy.ndarray): The reading's compiled limits, or None to skip
+            the alert checks.
+    """
+    print(f"📊 Sending fresh data: {reading}")
+
+    farmer_phone = reading.get("farmer_phone")
+    if not farmer_phone:
+        print(f"❌ Farmer phone number not found for livestock {reading.get('livestock_id')}.")
+        return
+
+    # --- Send alerts only when a breach starts, not on every reading ---
+    if limits is not None:
+        livestock_id = reading["livestock_id"]
+        for direction in alert_engine.evaluate(livestock_id, "temperature", reading["temperature"],
+                                               limits[TEMP_LOW], limits[TEMP_HIGH]):
+            is_exceeding = direction == "high"
+            send_alert(reading, "temperature", is_exceeding,
+                       "High temperature detected!" if is_exceeding else "Low temperature detected!")
+
+        for direction in alert_engine.evaluate(livestock_id, "pulse", reading["pulse"],
+                                               limits[PULSE_LOW], limits[PULSE_HIGH]):
+            is_exceeding = direction == "high"
+            send_alert(reading, "pulse", is_exceeding,
+                       "High pulse rate detected!" if is_exceeding else "Low pulse rate detected!")
+
+    # Emit the data itself, only to the rooms that own the livestock
+    socketio.emit("livestock_data", public_reading(reading), to=reading_rooms(reading))
+
+
+def send_alert(reading, alert_type, is_exceeding, message):
+    """
+    Notify the farmer by SMS and the dashboards by socket of a threshold breach.
+
+    Args:
+        reading (dict): The reading that breached the threshold.
+        alert_type (str): The metric that breached ("temperature" or "pulse").
+        is_exceeding (bool): True if the value is above the high threshold.
+        message (str): Message shown on the dashboard.
+    """
+    # Queue the SMS so a slow provider does not delay emits
+    queue_sms(
+        phone_number=reading["farmer_phone"].lstrip('+'),
+        message=livestock_alert_template(alert_type, reading[alert_type], is_exceeding),
+        ref_id="livestock_alert"
+    )
+    socketio.emit("livestock_alert", {
+        "message": message,
+        "type": alert_type,
+        "value": reading[alert_type],
+        "livestock_id": reading["livestock_id"],
+        "isExceeding": is_exceeding
+    }, to=reading_rooms(reading))
+
+
+def reading_rooms(reading):
+    """
+    Get the rooms that should receive a reading.
+
+    Args:
+        reading (dict): The latest reading of one livestock.
+
+    Returns:
+        list: Room names of the owning farmer and of the livestock itself.
+    """
+    return [farmer_room(reading["farmer_id"]), livestock_room(reading["livestock_id"])]
+
+
+def public_reading(reading):
+    """
+    Strip the owner's contact details from a reading before it is emitted.
+
+    Args:
+        reading (dict): The latest reading of one livestock.
+
+    Returns:
+        dict: The reading without farmer_phone.
+    """
+    return {key: value for key, value in reading.items() if key != "farmer_phone"}
+
+
+# Deduplicates alerts so each breach is reported once per incident
+alert_engine = AlertEngine()
+
+# Single process-wide broadcaster shared by every connected dashboard
+broadcaster = LivestockBroadcaster(
+    socketio,
+    tick=send_livestock_data,
+    interval=BROADCAST_INTERVAL,
+    coalesce_window=COALESCE_WINDOW
+)
 
 # def get_farmer_phone(livestock_id):
 #     with current_app.app_context():
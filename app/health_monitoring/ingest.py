@@ -0,0 +1,185 @@
+"""
+This module contains the ingest pipeline for livestock health readings.
+
+It provides the following:
+- Validation of raw readings posted by LoRa/ESP32 devices and gateways
+- Resolution of livestock -> farmer -> phone ownership in a single query
+- Bulk insertion of validated readings into the livestock_health table,
+  together with their minute/hour/day rollups
+
+The same pipeline is used for single readings and for gateway batches, so a
+batch of N readings costs one SELECT and one INSERT instead of N of each.
+"""
+
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import db
+from app.models import Livestock, LivestockHealth, Farmer, User
+
+from .storage import update_rollups
+
+# Upper bound on readings accepted in one gateway batch
+MAX_BATCH_SIZE = 1000
+
+# How far ahead of the server clock a device timestamp may be
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+
+def validate_readings(readings, default_livestock_id=None):
+    """
+    Validate a list of raw readings in a single pass.
+
+    Args:
+        readings (list): Raw reading dicts as posted by the device or gateway.
+        default_livestock_id (int): Livestock ID to use when a reading omits one.
+
+    Returns:
+        tuple: (valid, errors) where valid is a list of normalised reading dicts
+            and errors is a list of {"index", "message"} dicts for rejected readings.
+    """
+    valid = []
+    errors = []
+    now = datetime.utcnow()
+
+    for index, reading in enumerate(readings):
+        if not isinstance(reading, dict):
+            errors.append({"index": index, "message": "Reading must be an object"})
+            continue
+
+        livestock_id = reading.get('livestock_id', default_livestock_id)
+        temperature = reading.get('temperature')
+        pulse = reading.get('pulse')
+
+        if temperature is None or pulse is None:
+            errors.append({"index": index, "message": "Missing temperature or pulse values"})
+            continue
+
+        try:
+            livestock_id = int(livestock_id)
+            temperature = float(temperature)
+            pulse = float(pulse)
+        except (TypeError, ValueError):
+            errors.append({"index": index, "message": "Invalid livestock_id, temperature or pulse value"})
+            continue
+
+        # NaN and infinity parse as floats but would poison the rollups and alerts
+        if not (math.isfinite(temperature) and math.isfinite(pulse)):
+            errors.append({"index": index, "message": "Temperature and pulse must be finite numbers"})
+            continue
+        pulse = int(pulse)
+
+        recorded_at = now
+        if reading.get('timestamp'):
+            try:
+                recorded_at = datetime.fromisoformat(reading['timestamp'])
+            except (TypeError, ValueError):
+                errors.append({"index": index, "message": "Invalid timestamp"})
+                continue
+            # Store as naive UTC, like the server-side timestamps
+            recorded_at = recorded_at.replace(tzinfo=None) - (recorded_at.utcoffset() or timedelta())
+            if recorded_at > now + MAX_CLOCK_SKEW:
+                errors.append({"index": index, "message": "Timestamp is in the future"})
+                continue
+
+        valid.append({
+            "index": index,
+            "livestock_id": livestock_id,
+            "temperature": temperature,
+            "pulse": pulse,
+            "created_at": recorded_at,
+        })
+
+    return valid, errors
+
+
+def resolve_owners(livestock_ids):
+    """
+    Resolve the owning farmer and their phone number for many livestock at once.
+
+    Args:
+        livestock_ids (iterable): IDs of the livestock to resolve.
+
+    Returns:
+        dict: Mapping of livestock_id to {"farmer_id", "farmer_phone", "breed",
+            "livestock_type"}.
+            Unknown livestock IDs are absent from the mapping.
+    """
+    ids = set(livestock_ids)
+    if not ids:
+        return {}
+
+    rows = db.session.query(Livestock.id, Livestock.farmer_id, User.phone, Livestock.breed, Farmer.livestock_type)\
+        .join(Farmer, Livestock.farmer_id == Farmer.id)\
+        .join(User, Farmer.user_id == User.id)\
+        .filter(Livestock.id.in_(ids))\
+        .all()
+
+    return {
+        livestock_id: {
+            "farmer_id": farmer_id,
+            "farmer_phone": phone,
+            "breed": breed,
+            "livestock_type": livestock_type,
+        }
+        for livestock_id, farmer_id, phone, breed, livestock_type in rows
+    }
+
+
+def store_readings(readings):
+    """
+    Write validated readings to the livestock_health table with one bulk insert
+    and fold them into the rollups in the same transaction.
+
+    Args:
+        readings (list): Validated reading dicts from validate_readings().
+    """
+    if not readings:
+        return
+
+    db.session.execute(
+        insert(LivestockHealth),
+        [
+            {
+                "livestock_id": reading["livestock_id"],
+                "temperature": reading["temperature"],
+                "pulse": reading["pulse"],
+                "created_at": reading["created_at"],
+            }
+            for reading in readings
+        ]
+    )
+    update_rollups(readings)
+    db.session.commit()
+
+
+def ingest_readings(readings, default_livestock_id=None):
+    """
+    Validate, resolve and store a batch of readings.
+
+    Args:
+        readings (list): Raw reading dicts as posted by the device or gateway.
+        default_livestock_id (int): Livestock ID to use when a reading omits one.
+
+    Returns:
+        tuple: (accepted, errors) where accepted is the list of stored readings,
+            each enriched with its owner details from resolve_owners(), and errors lists the
+            rejected readings by index.
+    """
+    valid, errors = validate_readings(readings, default_livestock_id)
+    owners = resolve_owners(reading["livestock_id"] for reading in valid)
+
+    accepted = []
+    for reading in valid:
+        owner = owners.get(reading["livestock_id"])
+        if not owner:
+            errors.append({"index": reading["index"], "message": "Livestock not found"})
+            continue
+        reading.update(owner)
+        accepted.append(reading)
+
+    store_readings(accepted)
+    errors.sort(key=lambda error: error["index"])
+    return accepted, errors
@@ -1,6 +1,6 @@
-from flask import render_template, request, jsonify
-from flask_login import login_required
-from datetime import datetime
+from flask import render_template, request, jsonify, current_app
+from flask_login import login_required, current_user
+from datetime import datetime, timedelta
 
 from . import health_monitoring_bp
 
@@ -10,10 +10,76 @@ def metrics_monitoring():
     """
     Route to display metrics monitoring page.
     
+    Farmers can pick one of their livestock with the livestock_id query
+    parameter; the first of their livestock is shown by default.
+    
     Returns:
         render_template: HTML template for metrics monitoring page.
     """
-    return render_template('metrics_monitoring.html')
+    farmer = current_user.farmer_profile
+    livestock_list = farmer.livestock if farmer else []
+    selected_id = request.args.get('livestock_id', type=int)
+    selected = next((livestock for livestock in livestock_list if livestock.id == selected_id), None)
+    if selected is None and livestock_list:
+        selected = livestock_list[0]
+    
+    return render_template('metrics_monitoring.html', livestock_list=livestock_list, selected_livestock=selected)
+
+@health_monitoring_bp.route('/livestock-health-data/<int:livestock_id>/history', methods=['GET'])
+@login_required
+def livestock_health_history(livestock_id):
+    """
+    Endpoint to get the downsampled history of a health metric for the charts.
+    
+    Query parameters:
+        metric: "temperature" or "pulse" (default "temperature").
+        from, to: ISO-8601 UTC range (default the last 24 hours).
+        points: Maximum number of points to return (default 500, at most 2000).
+    
+    Args:
+        livestock_id (int): The ID of the livestock.
+    
+    Returns:
+        Response: JSON with the resolution read and parallel arrays of epoch
+            millisecond timestamps and values.
+    """
+    from app.models import Livestock
+    from .storage import load_history, METRICS
+    
+    livestock = Livestock.query.get_or_404(livestock_id)
+    farmer = current_user.farmer_profile
+    if not farmer or livestock.farmer_id != farmer.id:
+        return jsonify({"status": "error", "message": "Unauthorized access"}), 403
+    
+    metric = request.args.get('metric', 'temperature')
+    if metric not in METRICS:
+        return jsonify({"status": "error", "message": f"metric must be one of {', '.join(METRICS)}"}), 400
+    
+    try:
+        end = datetime.fromisoformat(request.args['to']) if request.args.get('to') else datetime.utcnow()
+        start = datetime.fromisoformat(request.args['from']) if request.args.get('from') else end - timedelta(days=1)
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid from or to timestamp"}), 400
+    
+    # Compare as naive UTC, like the stored timestamps
+    start = start.replace(tzinfo=None) - (start.utcoffset() or timedelta())
+    end = end.replace(tzinfo=None) - (end.utcoffset() or timedelta())
+    if start >= end:
+        return jsonify({"status": "error", "message": "from must be before to"}), 400
+    
+    points = max(3, min(request.args.get('points', 500, type=int), 2000))
+    
+    history = load_history(livestock_id, metric, start, end, points,
+                           raw_retention_days=current_app.config.get('HEALTH_RAW_RETENTION_DAYS', 30))
+    
+    return jsonify({
+        "status": "success",
+        "livestock_id": livestock_id,
+        "metric": metric,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        **history
+    }), 200
 
 @health_monitoring_bp.route('/livestock-health-data/<int:livestock_id>', methods=['POST'])
 def receive_health_data(livestock_id):
@@ -23,7 +89,7 @@ def receive_health_data(livestock_id):
     Returns:
         str: Success message.
     """
-    from app.models import db, LivestockHealth, Livestock
+    from .ingest import ingest_readings
     
     # Get the data from the request
     data = request.get_json()
@@ -33,47 +99,216 @@ def receive_health_data(livestock_id):
         print("❌ No data received")
         return jsonify({"status": "error", "message": "No data received"}), 400
     
-    # Extract temperature and pulse from the data
-    temperature = data.get('temperature')
-    pulse = data.get('pulse')
+    # Validate, resolve the owner and save the health data to the database
+    accepted, errors = ingest_readings([dict(data, livestock_id=livestock_id)])
     
-    # Check if temperature and pulse are present in the data
-    if temperature is None or pulse is None:
-        print("❌ Invalid data format")
-        return jsonify({"status": "error", "message": "Missing temperature or pulse values"}), 400
+    if errors:
+        message = errors[0]["message"]
+        print(f"❌ {message} (livestock ID {livestock_id})")
+        status_code = 404 if message == "Livestock not found" else 400
+        return jsonify({"status": "error", "message": message}), status_code
     
-    # Check if the livestock ID exists in the database
-    livestock = Livestock.query.get(livestock_id)
-    if not livestock:
-        print(f"❌ Livestock with ID {livestock_id} not found")
-        return jsonify({"status": "error", "message": "Livestock not found"}), 404
+    update_latest_health_data(accepted)
+    
+    return jsonify({"status": "succes", "message": "Health data saved successfully", "farmer_id": accepted[0]["farmer_id"]}), 200
 
-    # Check if the livestock belongs to the farmer
-    farmer_id = livestock.farmer_id
-    farmer_phone = livestock.farmer.user.phone
-    if livestock.farmer_id != farmer_id:
-        print(f"❌ Unauthorized access to livestock ID {livestock_id}")
+@health_monitoring_bp.route('/livestock-health-data/batch', methods=['POST'])
+def receive_health_data_batch():
+    """
+    Endpoint to receive a batch of livestock health readings from a LoRa gateway.
+    
+    Accepts either a JSON array of readings or an object with a "readings" array.
+    Each reading carries its own livestock_id, temperature, pulse and an optional
+    ISO-8601 timestamp. Valid readings are stored even if others in the batch are
+    rejected; rejected readings are reported by their index in the batch.
+    
+    Returns:
+        Response: JSON summary of accepted and rejected readings.
+    """
+    from .ingest import ingest_readings, MAX_BATCH_SIZE
+    
+    data = request.get_json(silent=True)
+    readings = data.get('readings') if isinstance(data, dict) else data
+    
+    if not isinstance(readings, list) or not readings:
+        print("❌ No readings received")
+        return jsonify({"status": "error", "message": "No readings received"}), 400
+    
+    if len(readings) > MAX_BATCH_SIZE:
+        print(f"❌ Batch of {len(readings)} readings exceeds the limit of {MAX_BATCH_SIZE}")
+        return jsonify({"status": "error", "message": f"Batch exceeds {MAX_BATCH_SIZE} readings"}), 413
+    
+    accepted, errors = ingest_readings(readings)
+    print(f"📊 Received batch of {len(readings)} readings: {len(accepted)} accepted, {len(errors)} rejected")
+    
+    update_latest_health_data(accepted)
+    
+    return jsonify({
+        "status": "success" if accepted else "error",
+        "accepted": len(accepted),
+        "rejected": len(errors),
+        "errors": errors
+    }), 200 if accepted else 400
+
+def update_latest_health_data(readings):
+    """
+    Update the shared latest health data for real-time transmission.
+    
+    Args:
+        readings (list): Stored readings from the ingest pipeline.
+    """
+    from .shared_data import latest_health_data
+    from .events import broadcaster
+    
+    # Apply in time order so the newest reading per livestock wins
+    for reading in sorted(readings, key=lambda reading: reading["created_at"]):
+        latest_health_data.update(reading["livestock_id"], {
+            "livestock_id": reading["livestock_id"],
+            "temperature": reading["temperature"],
+            "pulse": reading["pulse"],
+            "farmer_id": reading["farmer_id"],
+            "farmer_phone": reading["farmer_phone"],
+            "breed": reading["breed"],
+            "livestock_type": reading["livestock_type"],
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    
+    # Push the new readings to the dashboards without waiting for the next tick
+    if readings:
+        broadcaster.notify()
+
+@health_monitoring_bp.route('/threshold-profiles', methods=['GET'])
+@login_required
+def list_threshold_profiles():
+    """
+    Endpoint to list the alert threshold profiles visible to the current user.
+    
+    Farmers see the species and breed profiles plus the profiles of their own
+    livestock. Vets and admins see every profile.
+    
+    Returns:
+        Response: JSON list of threshold profiles.
+    """
+    from app.models import ThresholdProfile, Livestock
+    
+    query = ThresholdProfile.query
+    if current_user.user_role == 'farmer':
+        farmer = current_user.farmer_profile
+        if not farmer:
+            return jsonify({"status": "error", "message": "Unauthorized access"}), 403
+        query = query.outerjoin(Livestock, ThresholdProfile.livestock_id == Livestock.id)\
+            .filter((ThresholdProfile.livestock_id.is_(None)) | (Livestock.farmer_id == farmer.id))
+    
+    return jsonify({"profiles": [profile.to_dict() for profile in query.all()]}), 200
+
+def can_edit_livestock_thresholds(livestock):
+    """
+    Check whether the current user may manage the threshold profile of one animal.
+    
+    Args:
+        livestock (Livestock): The animal.
+    
+    Returns:
+        bool: True for admins, the animal's farmer and vets with a
+            non-cancelled appointment for the animal.
+    """
+    from app.models import Appointment
+    
+    if current_user.user_role == 'admin':
+        return True
+    if current_user.user_role == 'vet':
+        return Appointment.query.filter(
+            Appointment.vet_id == current_user.id,
+            Appointment.livestock_id == livestock.id,
+            Appointment.status != 'cancelled'
+        ).first() is not None
+    farmer = current_user.farmer_profile
+    return farmer is not None and livestock.farmer_id == farmer.id
+
+@health_monitoring_bp.route('/threshold-profiles', methods=['POST'])
+@login_required
+def save_threshold_profile():
+    """
+    Endpoint to create or update an alert threshold profile.
+    
+    The profile applies to exactly one of a livestock_type (species), a breed
+    or a livestock_id. Species and breed profiles apply to every farm and are
+    managed by admins; see can_edit_livestock_thresholds() for who may set the
+    profile of one animal.
+    
+    Returns:
+        Response: JSON of the saved profile.
+    """
+    from app.models import db, ThresholdProfile, Livestock
+    from .thresholds import rule_cache
+    
+    data = request.get_json(silent=True) or {}
+    scope = {key: data.get(key) for key in ('livestock_type', 'breed', 'livestock_id') if data.get(key)}
+    
+    if len(scope) != 1:
+        return jsonify({"status": "error", "message": "Set exactly one of livestock_type, breed or livestock_id"}), 400
+    
+    try:
+        limits = {
+            "temperature_low": float(data['temperature_low']),
+            "temperature_high": float(data['temperature_high']),
+            "pulse_low": int(data['pulse_low']),
+            "pulse_high": int(data['pulse_high']),
+        }
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"status": "error", "message": "Missing or invalid threshold values"}), 400
+    
+    if limits["temperature_low"] >= limits["temperature_high"] or limits["pulse_low"] >= limits["pulse_high"]:
+        return jsonify({"status": "error", "message": "Low thresholds must be below high thresholds"}), 400
+    
+    if 'livestock_id' in scope:
+        livestock = Livestock.query.get(scope['livestock_id'])
+        if not livestock:
+            return jsonify({"status": "error", "message": "Livestock not found"}), 404
+        if not can_edit_livestock_thresholds(livestock):
+            return jsonify({"status": "error", "message": "Unauthorized access"}), 403
+        scope['livestock_id'] = livestock.id
+    elif current_user.user_role != 'admin':
         return jsonify({"status": "error", "message": "Unauthorized access"}), 403
     
-    # Save the health data to the database
-    health_data = LivestockHealth(
-        livestock_id=livestock_id,
-        temperature=temperature,
-        pulse=pulse
-    )
+    profile = ThresholdProfile.query.filter_by(**scope).first()
+    if profile is None:
+        profile = ThresholdProfile(**scope)
+        db.session.add(profile)
+    
+    for key, value in limits.items():
+        setattr(profile, key, value)
     
-    db.session.add(health_data)
     db.session.commit()
+    rule_cache.invalidate()
     
-    # Update shared latest_data for real-time transmission
-    from .shared_data import latest_health_data
-    latest_health_data.clear()
-    latest_health_data.update({
-        "livestock_id": livestock_id,
-        "temperature": temperature,
-        "pulse": pulse,
-        "farmer_phone": farmer_phone,
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    return jsonify({"status": "success", "profile": profile.to_dict()}), 200
+
+@health_monitoring_bp.route('/threshold-profiles/<int:profile_id>', methods=['DELETE'])
+@login_required
+def delete_threshold_profile(profile_id):
+    """
+    Endpoint to delete an alert threshold profile.
+    
+    Args:
+        profile_id (int): The ID of the profile to delete.
+    
+    Returns:
+        Response: JSON success message.
+    """
+    from app.models import db, ThresholdProfile
+    from .thresholds import rule_cache
+    
+    profile = ThresholdProfile.query.get_or_404(profile_id)
+    
+    if profile.livestock_id is not None:
+        if not can_edit_livestock_thresholds(profile.livestock):
+            return jsonify({"status": "error", "message": "Unauthorized access"}), 403
+    elif current_user.user_role != 'admin':
+        return jsonify({"status": "error", "message": "Unauthorized access"}), 403
+    
+    db.session.delete(profile)
+    db.session.commit()
+    rule_cache.invalidate()
     
-    return jsonify({"status": "succes", "message": "Health data saved successfully", "farmer_id": farmer_id}), 200
\ No newline at end of file
+    return jsonify({"status": "success", "message": "Threshold profile deleted"}), 200
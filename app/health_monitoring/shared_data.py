@@ -1 +1,118 @@
-latest_health_data = {}
\ No newline at end of file
+"""
+This module holds the in-process state shared between the health monitoring
+routes and the Socket.IO events.
+
+It provides the following:
+- LatestReadingStore: Latest reading per livestock, with change tracking and expiry
+- latest_health_data: The process-wide store instance
+"""
+
+import threading
+import time
+
+
+class LatestReadingStore:
+    """
+    Concurrency-safe store of the latest health reading for each livestock.
+
+    Updates are O(1) and mark the livestock as changed. Consumers can then
+    iterate over only the readings that changed since their last call to
+    pop_changed(), and drop readings that have not been refreshed in time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._readings = {}
+        self._updated_at = {}
+        self._changed = set()
+
+    def update(self, livestock_id, reading):
+        """
+        Store the latest reading for a livestock and mark it as changed.
+
+        Args:
+            livestock_id (int): The ID of the livestock.
+            reading (dict): The reading to store.
+        """
+        with self._lock:
+            self._readings[livestock_id] = reading
+            self._updated_at[livestock_id] = time.monotonic()
+            self._changed.add(livestock_id)
+
+    def get(self, livestock_id):
+        """
+        Get the latest reading for a livestock.
+
+        Args:
+            livestock_id (int): The ID of the livestock.
+
+        Returns:
+            dict: The latest reading, or None if there is none.
+        """
+        with self._lock:
+            return self._readings.get(livestock_id)
+
+    def snapshot(self):
+        """
+        Get a copy of the latest reading for every livestock.
+
+        Returns:
+            dict: Mapping of livestock_id to its latest reading.
+        """
+        with self._lock:
+            return dict(self._readings)
+
+    def pop_changed(self):
+        """
+        Get the readings that changed since the previous call and reset the change set.
+
+        Returns:
+            dict: Mapping of livestock_id to its latest reading.
+        """
+        with self._lock:
+            changed = {
+                livestock_id: self._readings[livestock_id]
+                for livestock_id in self._changed
+                if livestock_id in self._readings
+            }
+            self._changed.clear()
+        return changed
+
+    def expire(self, max_age):
+        """
+        Drop readings that have not been updated within max_age seconds.
+
+        Args:
+            max_age (float): Maximum age of a reading in seconds.
+
+        Returns:
+            list: IDs of the livestock whose readings were dropped.
+        """
+        cutoff = time.monotonic() - max_age
+        with self._lock:
+            stale = [
+                livestock_id
+                for livestock_id, updated_at in self._updated_at.items()
+                if updated_at < cutoff
+            ]
+            for livestock_id in stale:
+                del self._readings[livestock_id]
+                del self._updated_at[livestock_id]
+                self._changed.discard(livestock_id)
+        return stale
+
+    def clear(self):
+        """
+        Drop every stored reading.
+        """
+        with self._lock:
+            self._readings.clear()
+            self._updated_at.clear()
+            self._changed.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._readings)
+
+
+latest_health_data = LatestReadingStore()
@@ -0,0 +1,427 @@
+"""
+This module contains the time-series storage layer for livestock health readings.
+
+It provides the following:
+- Incremental minute/hour/day rollups of readings, maintained at ingest
+- Downsampled metric history for the charts, from raw readings or rollups
+- Retention policies that prune raw readings and fine rollups past N days
+- Rebuilding of rollups from raw readings stored before rollups existed
+
+Raw readings are kept for a limited time only. Past the retention period they
+survive as rollups, which store the count, min, max and sum of each metric per
+bucket so averages can be combined across buckets without loss.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+from app import db
+from app.models import LivestockHealth, LivestockHealthRollup
+
+from .downsample import lttb
+
+# Rollup resolutions, finest first, with their bucket sizes
+RESOLUTIONS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Metrics that can be charted
+METRICS = ("temperature", "pulse")
+
+# Read raw readings for spans of at most this many minutes per requested point
+RAW_MINUTES_PER_POINT = 4
+
+
+def bucket_start(timestamp, resolution):
+    """
+    Truncate a timestamp to the start of its bucket.
+
+    Args:
+        timestamp (datetime): The timestamp to truncate.
+        resolution (str): The bucket size ("minute", "hour" or "day").
+
+    Returns:
+        datetime: The start of the bucket containing the timestamp.
+    """
+    if resolution == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def aggregate_readings(readings):
+    """
+    Aggregate readings into rollup rows for every resolution.
+
+    Args:
+        readings (iterable): Reading dicts or objects with livestock_id,
+            temperature, pulse and created_at.
+
+    Returns:
+        list: Rollup row dicts, one per (livestock_id, resolution, bucket_start).
+    """
+    buckets = {}
+
+    for reading in readings:
+        if isinstance(reading, dict):
+            livestock_id, temperature, pulse, created_at = (
+                reading["livestock_id"], reading["temperature"], reading["pulse"], reading["created_at"])
+        else:
+            livestock_id, temperature, pulse, created_at = (
+                reading.livestock_id, reading.temperature, reading.pulse, reading.created_at)
+
+        for resolution in RESOLUTIONS:
+            key = (livestock_id, resolution, bucket_start(created_at, resolution))
+            row = buckets.get(key)
+            if row is None:
+                buckets[key] = {
+                    "livestock_id": livestock_id,
+                    "resolution": resolution,
+                    "bucket_start": key[2],
+                    "sample_count": 1,
+                    "temperature_min": temperature,
+                    "temperature_max": temperature,
+                    "temperature_sum": temperature,
+                    "pulse_min": pulse,
+                    "pulse_max": pulse,
+                    "pulse_sum": pulse,
+                }
+                continue
+            row["sample_count"] += 1
+            row["temperature_min"] = min(row["temperature_min"], temperature)
+            row["temperature_max"] = max(row["temperature_max"], temperature)
+            row["temperature_sum"] += temperature
+            row["pulse_min"] = min(row["pulse_min"], pulse)
+            row["pulse_max"] = max(row["pulse_max"], pulse)
+            row["pulse_sum"] += pulse
+
+    return list(buckets.values())
+
+
+def _merge_rollups_mysql(rows):
+    """
+    Merge rollup rows with a single INSERT ... ON DUPLICATE KEY UPDATE.
+    """
+    rollup = LivestockHealthRollup.__table__
+    stmt = mysql_insert(rollup).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        sample_count=rollup.c.sample_count + stmt.inserted.sample_count,
+        temperature_min=func.least(rollup.c.temperature_min, stmt.inserted.temperature_min),
+        temperature_max=func.greatest(rollup.c.temperature_max, stmt.inserted.temperature_max),
+        temperature_sum=rollup.c.temperature_sum + stmt.inserted.temperature_sum,
+        pulse_min=func.least(rollup.c.pulse_min, stmt.inserted.pulse_min),
+        pulse_max=func.greatest(rollup.c.pulse_max, stmt.inserted.pulse_max),
+        pulse_sum=rollup.c.pulse_sum + stmt.inserted.pulse_sum,
+    )
+    db.session.execute(stmt)
+
+
+def _merge_rollups_generic(rows):
+    """
+    Merge rollup rows on databases without ON DUPLICATE KEY UPDATE.
+
+    Existing buckets are loaded with one query and updated in place; this is
+    only meant for development databases such as SQLite.
+    """
+    keys = [(row["livestock_id"], row["resolution"], row["bucket_start"]) for row in rows]
+    existing = {
+        (rollup.livestock_id, rollup.resolution, rollup.bucket_start): rollup
+        for rollup in LivestockHealthRollup.query.filter(
+            tuple_(LivestockHealthRollup.livestock_id,
+                   LivestockHealthRollup.resolution,
+                   LivestockHealthRollup.bucket_start).in_(keys)
+        )
+    }
+
+    for key, row in zip(keys, rows):
+        rollup = existing.get(key)
+        if rollup is None:
+            db.session.add(LivestockHealthRollup(**row))
+            continue
+        rollup.sample_count += row["sample_count"]
+        rollup.temperature_min = min(rollup.temperature_min, row["temperature_min"])
+        rollup.temperature_max = max(rollup.temperature_max, row["temperature_max"])
+        rollup.temperature_sum += row["temperature_sum"]
+        rollup.pulse_min = min(rollup.pulse_min, row["pulse_min"])
+        rollup.pulse_max = max(rollup.pulse_max, row["pulse_max"])
+        rollup.pulse_sum += row["pulse_sum"]
+
+
+def update_rollups(readings):
+    """
+    Fold a batch of readings into the rollup tables.
+
+    The caller commits, so rollups are written in the same transaction as the
+    raw readings they summarise.
+
+    Args:
+        readings (list): Validated reading dicts with livestock_id, temperature,
+            pulse and created_at.
+    """
+    rows = aggregate_readings(readings)
+    if not rows:
+        return
+
+    if db.session.get_bind().dialect.name == "mysql":
+        _merge_rollups_mysql(rows)
+    else:
+        _merge_rollups_generic(rows)
+
+
+def _to_epoch_ms(timestamps):
+    """Convert naive UTC datetimes to epoch milliseconds"""
+    return np.array(timestamps, dtype='datetime64[ms]').astype(np.int64)
+
+
+def load_history(livestock_id, metric, start, end, points=500, raw_retention_days=30, now=None):
+    """
+    Get the downsampled history of one metric of a livestock.
+
+    Longer spans read the average of the coarsest rollup that still has at
+    least points buckets in the span. Spans of at most RAW_MINUTES_PER_POINT
+    minutes per point are read from the raw readings while they are still
+    retained. Either way the series is reduced to at most points points
+    with LTTB.
+
+    Args:
+        livestock_id (int): The ID of the livestock.
+        metric (str): "temperature" or "pulse".
+        start (datetime): The start of the range.
+        end (datetime): The end of the range.
+        points (int): The maximum number of points to return.
+        raw_retention_days (int): Days of raw readings kept, 0 if kept forever.
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        dict: {"resolution", "timestamps", "values"} where timestamps are epoch
+            milliseconds and resolution is "raw" or the rollup resolution read.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+
+    raw_cutoff = (now or datetime.utcnow()) - timedelta(days=raw_retention_days) if raw_retention_days else None
+    span = end - start
+    resolution = next(
+        (resolution for resolution, size in reversed(RESOLUTIONS.items()) if span / size >= points),
+        "minute"
+    )
+
+    if span <= RESOLUTIONS["minute"] * points * RAW_MINUTES_PER_POINT and (raw_cutoff is None or start >= raw_cutoff):
+        resolution = "raw"
+        column = getattr(LivestockHealth, metric)
+        rows = db.session.execute(
+            select(LivestockHealth.created_at, column).filter(
+                LivestockHealth.livestock_id == livestock_id,
+                LivestockHealth.created_at >= start,
+                LivestockHealth.created_at < end
+            ).order_by(LivestockHealth.created_at.asc())
+        ).all()
+    else:
+        total = getattr(LivestockHealthRollup, f"{metric}_sum")
+        rows = db.session.execute(
+            select(LivestockHealthRollup.bucket_start, total / LivestockHealthRollup.sample_count).filter(
+                LivestockHealthRollup.livestock_id == livestock_id,
+                LivestockHealthRollup.resolution == resolution,
+                LivestockHealthRollup.bucket_start >= bucket_start(start, resolution),
+                LivestockHealthRollup.bucket_start < end
+            ).order_by(LivestockHealthRollup.bucket_start.asc())
+        ).all()
+
+    if not rows:
+        return {"resolution": resolution, "timestamps": [], "values": []}
+
+    timestamps, values = zip(*rows)
+    x, y = lttb(_to_epoch_ms(timestamps), np.array(values, dtype=float), points)
+    return {
+        "resolution": resolution,
+        "timestamps": x.astype(np.int64).tolist(),
+        "values": np.round(y, 2).tolist(),
+    }
+
+
+def _delete_in_batches(model, *criteria, batch_size=10000):
+    """
+    Delete matching rows in primary-key batches so no single transaction
+    locks or logs the whole range.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    deleted = 0
+    while True:
+        ids = db.session.scalars(
+            select(model.id).filter(*criteria).order_by(model.id).limit(batch_size)
+        ).all()
+        if not ids:
+            return deleted
+        db.session.execute(delete(model).where(model.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
+
+
+def prune_readings(retention_days, now=None, batch_size=10000):
+    """
+    Delete raw readings older than the retention period.
+
+    Args:
+        retention_days (int): Number of days of raw readings to keep.
+        now (datetime): The reference time, defaults to the current UTC time.
+        batch_size (int): Number of rows deleted per transaction.
+
+    Returns:
+        int: The number of readings deleted.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    return _delete_in_batches(LivestockHealth, LivestockHealth.created_at < cutoff, batch_size=batch_size)
+
+
+def prune_rollups(resolution, retention_days, now=None, batch_size=10000):
+    """
+    Delete rollups of one resolution older than the retention period.
+
+    Args:
+        resolution (str): The bucket size ("minute", "hour" or "day").
+        retention_days (int): Number of days of rollups to keep.
+        now (datetime): The reference time, defaults to the current UTC time.
+        batch_size (int): Number of rows deleted per transaction.
+
+    Returns:
+        int: The number of rollups deleted.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    return _delete_in_batches(
+        LivestockHealthRollup,
+        LivestockHealthRollup.resolution == resolution,
+        LivestockHealthRollup.bucket_start < cutoff,
+        batch_size=batch_size
+    )
+
+
+def apply_retention(config, now=None):
+    """
+    Apply the configured retention policies.
+
+    A retention period of 0 keeps the data forever.
+
+    Args:
+        config (dict): The Flask application config.
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        dict: Number of rows deleted per table ("raw", "minute", "hour", "day").
+    """
+    policies = {
+        "raw": config.get('HEALTH_RAW_RETENTION_DAYS', 30),
+        "minute": config.get('HEALTH_MINUTE_ROLLUP_RETENTION_DAYS', 90),
+        "hour": config.get('HEALTH_HOUR_ROLLUP_RETENTION_DAYS', 730),
+        "day": config.get('HEALTH_DAY_ROLLUP_RETENTION_DAYS', 0),
+    }
+
+    deleted = {}
+    for name, retention_days in policies.items():
+        if not retention_days:
+            deleted[name] = 0
+        elif name == "raw":
+            deleted[name] = prune_readings(retention_days, now)
+        else:
+            deleted[name] = prune_rollups(name, retention_days, now)
+    return deleted
+
+
+def _rebuild_livestock_day(livestock_id, day):
+    """
+    Replace the rollups of one livestock on one day with ones recomputed from its raw readings.
+
+    The day's rollups are locked first, so an ingest merging into them waits
+    until the new rollups are committed and then adds its readings on top.
+
+    Returns:
+        int: The number of raw readings aggregated.
+    """
+    day_end = day + RESOLUTIONS["day"]
+    in_day = (
+        LivestockHealthRollup.livestock_id == livestock_id,
+        LivestockHealthRollup.resolution.in_(RESOLUTIONS),
+        LivestockHealthRollup.bucket_start >= day,
+        LivestockHealthRollup.bucket_start < day_end,
+    )
+    db.session.execute(select(LivestockHealthRollup.id).filter(*in_day).with_for_update())
+
+    readings = db.session.execute(
+        select(LivestockHealth.livestock_id, LivestockHealth.temperature,
+               LivestockHealth.pulse, LivestockHealth.created_at).filter(
+            LivestockHealth.livestock_id == livestock_id,
+            LivestockHealth.created_at >= day,
+            LivestockHealth.created_at < day_end
+        )
+    ).all()
+
+    db.session.execute(delete(LivestockHealthRollup).where(*in_day))
+    rows = aggregate_readings(readings)
+    if rows:
+        db.session.execute(insert(LivestockHealthRollup), rows)
+    db.session.commit()
+    return len(readings)
+
+
+def rebuild_rollups(start, end, raw_retention_days=30, now=None):
+    """
+    Recompute the rollups of a time range from the raw readings.
+
+    The range is widened to whole days so every bucket that overlaps it is
+    rebuilt from all of its readings, but starts no earlier than the first
+    whole day still within the raw retention period: older days have lost
+    raw readings, and their rollups are all that is left of them.
+
+    Each livestock's day is swapped in its own transaction, so ingest keeps
+    running during a rebuild and its readings are counted exactly once.
+
+    Args:
+        start (datetime): The start of the range.
+        end (datetime): The end of the range.
+        raw_retention_days (int): The raw retention period in days, 0 if raw readings are kept forever.
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        int: The number of raw readings aggregated.
+    """
+    day = RESOLUTIONS["day"]
+    start = bucket_start(start, "day")
+    end = bucket_start(end, "day") + day
+
+    if raw_retention_days:
+        cutoff = (now or datetime.utcnow()) - timedelta(days=raw_retention_days)
+        first_whole_day = bucket_start(cutoff, "day")
+        if first_whole_day < cutoff:
+            first_whole_day += day
+        start = max(start, first_whole_day)
+
+    livestock_ids = set(db.session.scalars(
+        select(LivestockHealth.livestock_id).distinct().filter(
+            LivestockHealth.created_at >= start,
+            LivestockHealth.created_at < end
+        )
+    ))
+    livestock_ids.update(db.session.scalars(
+        select(LivestockHealthRollup.livestock_id).distinct().filter(
+            LivestockHealthRollup.bucket_start >= start,
+            LivestockHealthRollup.bucket_start < end
+        )
+    ))
+    db.session.commit()
+
+    aggregated = 0
+    for livestock_id in sorted(livestock_ids):
+        current = start
+        while current < end:
+            aggregated += _rebuild_livestock_day(livestock_id, current)
+            current += day
+    return aggregated
@@ -0,0 +1,169 @@
+"""
+This module compiles health alert threshold profiles into an in-memory rule table.
+
+It provides the following:
+- RuleTable: Threshold limits indexed by animal, breed and species
+- RuleCache: The compiled rule table, rebuilt when profiles change or expire
+- rule_cache: The process-wide cache instance
+
+Readings are matched to the most specific profile (animal, then breed, then
+species, then the defaults below) and a whole batch of readings is checked
+against its limits with one set of array comparisons.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+# Default thresholds, used when no profile matches a reading
+TEMP_THRESHOLD_HIGH = 40.0
+TEMP_THRESHOLD_LOW = 10.0
+PULSE_THRESHOLD_HIGH = 100
+PULSE_THRESHOLD_LOW = 60
+
+# Column order of the limits array
+TEMP_LOW, TEMP_HIGH, PULSE_LOW, PULSE_HIGH = range(4)
+
+
+def _key(value):
+    """Normalise a breed or species name for lookups"""
+    return value.strip().lower() if value else None
+
+
+class RuleTable:
+    """
+    Compiled threshold rules.
+
+    Row 0 of the limits array holds the defaults; every profile adds one row.
+
+    Attributes:
+        limits (numpy.ndarray): Array of shape (rules, 4) with the low/high limits.
+    """
+
+    def __init__(self, profiles=()):
+        rows = [(TEMP_THRESHOLD_LOW, TEMP_THRESHOLD_HIGH, PULSE_THRESHOLD_LOW, PULSE_THRESHOLD_HIGH)]
+        self.by_livestock = {}
+        self.by_breed = {}
+        self.by_type = {}
+
+        for profile in profiles:
+            index = len(rows)
+            rows.append((profile.temperature_low, profile.temperature_high,
+                         profile.pulse_low, profile.pulse_high))
+            if profile.livestock_id is not None:
+                self.by_livestock[profile.livestock_id] = index
+            elif profile.breed:
+                self.by_breed[_key(profile.breed)] = index
+            elif profile.livestock_type:
+                self.by_type[_key(profile.livestock_type)] = index
+
+        self.limits = np.array(rows, dtype=float)
+
+    def rule_index(self, livestock_id, breed=None, livestock_type=None):
+        """
+        Find the most specific rule for a livestock.
+
+        Args:
+            livestock_id (int): The ID of the livestock.
+            breed (str): The breed of the livestock.
+            livestock_type (str): The species kept by the livestock's farmer.
+
+        Returns:
+            int: Row of the limits array that applies.
+        """
+        index = self.by_livestock.get(livestock_id)
+        if index is None:
+            index = self.by_breed.get(_key(breed))
+        if index is None:
+            index = self.by_type.get(_key(livestock_type))
+        return index or 0
+
+    def lookup(self, readings):
+        """
+        Get the limits that apply to each reading.
+
+        Args:
+            readings (list): Reading dicts with livestock_id and optionally
+                breed and livestock_type.
+
+        Returns:
+            numpy.ndarray: Array of shape (len(readings), 4) with the limits.
+        """
+        indexes = np.fromiter(
+            (self.rule_index(reading["livestock_id"], reading.get("breed"), reading.get("livestock_type"))
+             for reading in readings),
+            dtype=np.intp,
+            count=len(readings)
+        )
+        return self.limits[indexes]
+
+    def evaluate(self, readings):
+        """
+        Check a batch of readings against their limits.
+
+        Args:
+            readings (list): Reading dicts with temperature and pulse.
+
+        Returns:
+            tuple: (limits, breached) where limits is the array from lookup() and
+                breached is a boolean array that is True for readings outside
+                any of their limits.
+        """
+        limits = self.lookup(readings)
+        temperature = np.fromiter((reading["temperature"] for reading in readings), dtype=float, count=len(readings))
+        pulse = np.fromiter((reading["pulse"] for reading in readings), dtype=float, count=len(readings))
+
+        breached = (
+            (temperature < limits[:, TEMP_LOW]) | (temperature > limits[:, TEMP_HIGH]) |
+            (pulse < limits[:, PULSE_LOW]) | (pulse > limits[:, PULSE_HIGH])
+        )
+        return limits, breached
+
+
+class RuleCache:
+    """
+    Cache of the compiled rule table.
+
+    The table is rebuilt from the database on first use, after invalidate()
+    is called, and after max_age seconds so edits made by other processes
+    are eventually picked up.
+
+    Attributes:
+        max_age (float): Seconds after which the table is recompiled.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._table = None
+        self._compiled_at = 0
+
+    def invalidate(self):
+        """
+        Drop the compiled table so the next get() recompiles it.
+        """
+        with self._lock:
+            self._table = None
+
+    def get(self):
+        """
+        Get the compiled rule table, compiling it if needed. Requires an app context.
+
+        Returns:
+            RuleTable: The compiled rules.
+        """
+        with self._lock:
+            if self._table is not None and time.monotonic() - self._compiled_at < self.max_age:
+                return self._table
+
+        from app.models import ThresholdProfile
+
+        table = RuleTable(ThresholdProfile.query.all())
+        with self._lock:
+            self._table = table
+            self._compiled_at = time.monotonic()
+        return table
+
+
+rule_cache = RuleCache()
@@ -0,0 +1,273 @@
+"""
+This module caches the logged-in user and their profile between requests.
+
+It provides the following:
+- IdentityCache: Serves Flask-Login's user loader from a cache instead of the database
+- RedisIdentityStore: Optional shared store so several processes reuse one cache
+
+Each cache entry is a snapshot of plain column values of the user, their
+farmer/vet/admin profile and location, stored as JSON. Secrets such as the
+password hash are left out; they stay unloaded on a cached user and are read
+from the database when accessed. On a hit the snapshot is rebuilt into
+detached objects and merged into the request's session with load=False,
+which attaches them without any SQL. Pages reading current_user or its
+profile therefore cost no identity queries while the entry is cached.
+
+Entries are dropped when any of those rows is changed or deleted through the
+ORM, both when the change is flushed and again after it is committed, so a
+request racing the commit cannot keep a stale copy cached.
+"""
+
+import json
+from datetime import date, datetime, time
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from app.cache import TTLCache
+from app.models import db, User, Farmer, Vet, Admin, Location
+
+# The relationships of User cached with it, and their models
+PROFILE_RELATIONSHIPS = {
+    'farmer_profile': Farmer,
+    'vet_profile': Vet,
+    'admin_profile': Admin,
+    'location': Location,
+}
+
+# Columns never copied into the cache
+SECRET_COLUMNS = frozenset({'password_hash', 'otp_secret'})
+
+_TEMPORAL_TYPES = (datetime, date, time)
+
+
+def _python_type(attr):
+    """Get the Python type of a column attribute's values, or None if it has none"""
+    try:
+        return attr.columns[0].type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _columns(obj):
+    """Get the non-secret column values of a loaded object as JSON-serializable data"""
+    columns = {}
+    for attr in sa_inspect(type(obj)).column_attrs:
+        if attr.key in SECRET_COLUMNS:
+            continue
+        value = getattr(obj, attr.key)
+        columns[attr.key] = value.isoformat() if isinstance(value, _TEMPORAL_TYPES) else value
+    return columns
+
+
+def snapshot_user(user):
+    """
+    Capture a user and their profiles as plain data.
+
+    Args:
+        user (User): A loaded user.
+
+    Returns:
+        dict: Column values of the user and of each profile relationship (None if absent).
+    """
+    snapshot = {'user': _columns(user)}
+    for name in PROFILE_RELATIONSHIPS:
+        related = getattr(user, name)
+        snapshot[name] = _columns(related) if related is not None else None
+    return snapshot
+
+
+def _detached(model, columns):
+    """Build a detached instance of a model from its snapshot column values"""
+    obj = model()
+    attrs = sa_inspect(model).column_attrs
+    for key, value in columns.items():
+        python_type = _python_type(attrs[key])
+        if isinstance(value, str) and python_type in _TEMPORAL_TYPES:
+            value = python_type.fromisoformat(value)
+        set_committed_value(obj, key, value)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def restore_user(snapshot):
+    """
+    Rebuild a user and their profiles from a snapshot and attach them to the session.
+
+    Args:
+        snapshot (dict): A snapshot from snapshot_user().
+
+    Returns:
+        User: The user, persistent in the current session.
+    """
+    user = _detached(User, snapshot['user'])
+    for name, model in PROFILE_RELATIONSHIPS.items():
+        related = None
+        if snapshot[name] is not None:
+            related = _detached(model, snapshot[name])
+            set_committed_value(related, 'user', user)
+        set_committed_value(user, name, related)
+    return db.session.merge(user, load=False)
+
+
+class RedisIdentityStore:
+    """
+    Shared identity cache in Redis, for running several app processes.
+
+    Attributes:
+        prefix (str): Prefix of the Redis keys.
+    """
+
+    def __init__(self, url, prefix='lora:identity:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, user_id):
+        data = self.client.get(f"{self.prefix}{user_id}")
+        return json.loads(data) if data is not None else None
+
+    def set(self, user_id, snapshot, ttl):
+        self.client.set(f"{self.prefix}{user_id}", json.dumps(snapshot), ex=int(ttl))
+
+    def delete(self, user_id):
+        self.client.delete(f"{self.prefix}{user_id}")
+
+
+class IdentityCache:
+    """
+    Cache of user snapshots for Flask-Login's user loader.
+
+    Attributes:
+        local (TTLCache): In-process cache of snapshots by user ID.
+        shared (RedisIdentityStore): Shared store behind the local cache, or None.
+        ttl (float): Seconds a snapshot stays in the shared store.
+    """
+
+    def __init__(self, maxsize=4096, ttl=300):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.shared = None
+        self.ttl = ttl
+        self.app = None
+
+    def init_app(self, app):
+        """
+        Configure the cache from the Flask application.
+
+        With a shared store the local cache only holds entries for
+        USER_CACHE_LOCAL_TTL seconds, since other processes cannot clear it.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        self.app = app
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        local_ttl = self.ttl
+
+        url = app.config.get('USER_CACHE_REDIS_URL')
+        if url:
+            try:
+                self.shared = RedisIdentityStore(url)
+                local_ttl = min(self.ttl, app.config.get('USER_CACHE_LOCAL_TTL', 5))
+            except ImportError:
+                print("⚠️ USER_CACHE_REDIS_URL is set but redis is not installed, using the local cache only")
+
+        self.local = TTLCache(maxsize=app.config.get('USER_CACHE_SIZE', self.local.maxsize), ttl=local_ttl)
+
+    def _get_snapshot(self, user_id):
+        """Get a cached snapshot from the local cache, then the shared store"""
+        snapshot = self.local.get(user_id)
+        if snapshot is None and self.shared is not None:
+            try:
+                snapshot = self.shared.get(user_id)
+            except Exception as e:
+                print(f"⚠️ Identity store unavailable: {e}")
+            if snapshot is not None:
+                self.local.set(user_id, snapshot)
+        return snapshot
+
+    def load_user(self, user_id):
+        """
+        Load a user with their profiles, from the cache when possible.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            User: The user attached to the current session, or None if it does not exist.
+        """
+        if not self.ttl:
+            return db.session.get(User, user_id)
+
+        snapshot = self._get_snapshot(user_id)
+        if snapshot is not None:
+            return restore_user(snapshot)
+
+        user = db.session.get(User, user_id, options=[
+            joinedload(getattr(User, name)) for name in PROFILE_RELATIONSHIPS
+        ])
+        if user is None:
+            return None
+
+        snapshot = snapshot_user(user)
+        self.local.set(user_id, snapshot)
+        if self.shared is not None:
+            try:
+                self.shared.set(user_id, snapshot, self.ttl)
+            except Exception as e:
+                print(f"⚠️ Identity store unavailable: {e}")
+        return user
+
+    def invalidate(self, user_id):
+        """
+        Drop a user's cached snapshot, e.g. after their profile or password changed.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        self.local.delete(user_id)
+        if self.shared is not None:
+            try:
+                self.shared.delete(user_id)
+            except Exception as e:
+                print(f"⚠️ Identity store unavailable: {e}")
+
+
+identity_cache = IdentityCache()
+
+
+def _affected_user_ids(session):
+    """Get the IDs of users whose cached identity a flush changes"""
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, tuple(PROFILE_RELATIONSHIPS.values())):
+            user_ids.add(obj.user_id)
+    user_ids.discard(None)
+    return user_ids
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changed_identities(session, flush_context, instances):
+    """Remember which users a flush changes and drop their cached copies"""
+    user_ids = _affected_user_ids(session)
+    for user_id in user_ids:
+        identity_cache.invalidate(user_id)
+    session.info.setdefault('changed_identities', set()).update(user_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_identities(session):
+    """Drop cached copies again once the change is visible to other requests"""
+    for user_id in session.info.pop('changed_identities', ()):
+        identity_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_changed_identities(session, previous_transaction):
+    """Forget the changes of a rolled back transaction; they were never visible"""
+    session.info.pop('changed_identities', None)
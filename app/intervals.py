@@ -0,0 +1,98 @@
+"""
+This module provides a sorted index of non-overlapping time intervals.
+
+Classes:
+- IntervalIndex: Half-open [start, end) intervals kept sorted by start time.
+
+A vet's availability slots never overlap each other, so once sorted by start
+time their end times are sorted too. That makes "does [a, b) overlap any slot"
+and "which slots fall between a and b" binary searches instead of scans.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex:
+    """
+    Sorted index of non-overlapping half-open intervals with attached values.
+
+    Attributes:
+        starts (list): Start times, ascending.
+        ends (list): End times, ascending, parallel to starts.
+        values (list): The value attached to each interval, parallel to starts.
+    """
+
+    def __init__(self, intervals=()):
+        """
+        Build the index from (start, end, value) tuples.
+
+        Intervals that overlap one already in the index are skipped, so the
+        index stays consistent even if the source data is not.
+
+        Args:
+            intervals (iterable): (start, end, value) tuples in any order.
+        """
+        self.starts = []
+        self.ends = []
+        self.values = []
+        for start, end, value in sorted(intervals, key=lambda interval: interval[0]):
+            if not self.starts or start >= self.ends[-1]:
+                self.starts.append(start)
+                self.ends.append(end)
+                self.values.append(value)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends, self.values))
+
+    def overlaps(self, start, end):
+        """
+        Check whether [start, end) overlaps any interval in the index.
+
+        Args:
+            start: The start of the interval.
+            end: The end of the interval.
+
+        Returns:
+            bool: True if an interval in the index overlaps it.
+        """
+        # The only candidate is the first interval ending after start
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+
+    def add(self, start, end, value=None):
+        """
+        Insert [start, end) unless it overlaps an interval in the index.
+
+        Args:
+            start: The start of the interval.
+            end: The end of the interval.
+            value: The value attached to the interval.
+
+        Returns:
+            bool: True if the interval was inserted, False if it overlaps.
+        """
+        if start >= end or self.overlaps(start, end):
+            return False
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.values.insert(i, value)
+        return True
+
+    def between(self, start, end):
+        """
+        Get the intervals overlapping [start, end), in order.
+
+        Args:
+            start: The start of the range.
+            end: The end of the range.
+
+        Returns:
+            list: (start, end, value) tuples.
+        """
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+        return list(zip(self.starts[first:last], self.ends[first:last], self.values[first:last]))
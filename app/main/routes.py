@@ -4,14 +4,20 @@ This module defines the main routes for the Flask application.
 It includes the following routes:
 - Home page
 - Contact form submission
+- SMS dispatch metrics
+- Email dispatch metrics
 
 Functions:
 - home(): Renders the home page.
-- contact(): Handles the contact form submission and sends an email.
+- contact(): Handles the contact form submission and queues an email.
+- sms_metrics(): Returns the SMS dispatcher's queue and latency metrics.
+- email_metrics(): Returns the email dispatcher's queue and latency metrics.
 """
 
-from flask import render_template, request, redirect, url_for, flash
-from app.utils import send_email
+from flask import render_template, request, redirect, url_for, flash, jsonify, abort
+from flask_login import login_required, current_user
+from app.sms_utils.sms_queue import sms_dispatcher
+from app.email_utils.email_queue import email_dispatcher, queue_email
 import os
 from dotenv import load_dotenv
 
@@ -37,7 +43,7 @@ def contact():
     """
     Route to handle contact form submission.
 
-    Processes the contact form data and sends an email with the provided information.
+    Processes the contact form data and queues an email with the provided information.
 
     Returns:
         Response: Redirects to the home page with a success message.
@@ -46,8 +52,36 @@ def contact():
     user_email = request.form.get('email')
     message = request.form.get('message')
     
-    msg = "Subject: Contact Us\n\n{}\n\n{}\n\n{}".format(user_name, user_email, message)
+    body = "{}\n\n{}\n\n{}".format(user_name, user_email, message)
     
-    send_email(EMAIL_USER, msg)
+    queue_email(EMAIL_USER, 'Contact Us', body)
     flash('Message sent successfully', 'success')
     return redirect(url_for('main.home'))
+
+@main_bp.route('/metrics/sms', methods=['GET'])
+@login_required
+def sms_metrics():
+    """
+    Route to report the SMS dispatcher's queue and latency metrics to admins.
+
+    Returns:
+        Response: JSON object with the dispatcher metrics.
+    """
+    if current_user.user_role != 'admin':
+        abort(403)
+    
+    return jsonify(sms_dispatcher.metrics()), 200
+
+@main_bp.route('/metrics/email', methods=['GET'])
+@login_required
+def email_metrics():
+    """
+    Route to report the email dispatcher's queue and latency metrics to admins.
+
+    Returns:
+        Response: JSON object with the dispatcher metrics.
+    """
+    if current_user.user_role != 'admin':
+        abort(403)
+    
+    return jsonify(email_dispatcher.metrics()), 200
@@ -9,8 +9,14 @@ It includes the following models:
 - Location: Represents a location.
 - Livestock: Represents livestock data.
 - LivestockHealth: Represents livestock health data.
+- LivestockHealthRollup: Represents aggregated livestock health data per time bucket.
+- ThresholdProfile: Represents health alert thresholds for a species, breed or animal.
+- AvailabilityRule: Represents a weekly recurring availability pattern of a vet.
+- AvailabilityException: Represents a day or period a vet is unavailable despite their rules.
 - VetAvailability: Represents the availability slots for vets.
 - Appointment: Represents appointments between farmers and vets.
+- SmsMessage: Represents an outbound SMS waiting in or sent from the outbox.
+- EmailMessage: Represents an outbound email waiting in or sent from the outbox.
 
 Each model includes fields, relationships, and methods relevant to its purpose.
 """
@@ -18,7 +24,7 @@ Each model includes fields, relationships, and methods relevant to its purpose.
 from app import db
 from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.passwords import hash_password, verify_password, needs_rehash
 
 class User(db.Model, UserMixin):
     """
@@ -69,10 +75,12 @@ class User(db.Model, UserMixin):
         """
         Sets the password for the user.
 
+        The hash is computed off the event loop with the configured method.
+
         Args:
             password (str): The password to set.
         """
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """
@@ -84,7 +92,21 @@ class User(db.Model, UserMixin):
         Returns:
             bool: True if the password matches, False otherwise.
         """
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """
+        Checks if the password hash was made with outdated hashing parameters.
+
+        Returns:
+            bool: True if the password should be hashed again, False otherwise.
+        """
+        return needs_rehash(self.password_hash)
+
+    @property
+    def full_name(self):
+        """str: The first and last name of the user."""
+        return f'{self.first_name} {self.last_name}'
 
     def __repr__(self):
         return f'<User {self.email}>'
@@ -165,11 +187,11 @@ class Vet(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True, nullable=False)
     license_number = db.Column(db.String(255), unique=True, nullable=False)
     experience_years = db.Column(db.Integer, nullable=False, default=0)
-    specialization = db.Column(db.String(255), nullable=False)
+    specialization = db.Column(db.String(255), nullable=False, index=True)
     verification_document_path = db.Column(db.String(255), nullable=False)
     clinic_name = db.Column(db.String(255), nullable=True)
     avg_rating = db.Column(db.Float, default=0.0)
-    is_verified = db.Column(db.Boolean, default=False)
+    is_verified = db.Column(db.Boolean, default=False, index=True)
 
     def __repr__(self):
         return f'<Vet {self.specialization}>'
@@ -187,6 +209,9 @@ class Location(db.Model):
     """
 
     __tablename__ = 'locations'
+    __table_args__ = (
+        db.Index('ix_locations_county_town', 'county', 'town'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True, nullable=False)
@@ -239,23 +264,208 @@ class LivestockHealth(db.Model):
         livestock_id (int): The ID of the associated livestock.
         temperature (float): The temperature of the livestock.
         pulse (int): The pulse rate of the livestock.
-        created_at (datetime): The timestamp when the health data was created.
-        updated_at (datetime): The timestamp when the health data was last updated.
+        created_at (datetime): The timestamp when the health data was recorded.
     """
     
     __tablename__ = 'livestock_health'
+    __table_args__ = (
+        db.Index('ix_livestock_health_livestock_id_created_at', 'livestock_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     livestock_id = db.Column(db.Integer, db.ForeignKey('livestock.id'), nullable=False)
     temperature = db.Column(db.Float, nullable=False)
     pulse = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
         return f'<LivestockHealth {self.id}>'
 
 
+class LivestockHealthRollup(db.Model):
+    """
+    Represents aggregated livestock health data for one time bucket.
+
+    Rollups are maintained incrementally as readings are ingested, at minute,
+    hour and day resolution, so charts can read a few rows per bucket instead
+    of scanning raw readings.
+
+    Attributes:
+        id (int): The unique identifier for the rollup.
+        livestock_id (int): The ID of the associated livestock.
+        resolution (str): The bucket size (minute, hour, day).
+        bucket_start (datetime): The start of the time bucket.
+        sample_count (int): The number of readings in the bucket.
+        temperature_min (float): The lowest temperature in the bucket.
+        temperature_max (float): The highest temperature in the bucket.
+        temperature_sum (float): The sum of the temperatures in the bucket.
+        pulse_min (int): The lowest pulse rate in the bucket.
+        pulse_max (int): The highest pulse rate in the bucket.
+        pulse_sum (int): The sum of the pulse rates in the bucket.
+    """
+
+    __tablename__ = 'livestock_health_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('livestock_id', 'resolution', 'bucket_start', name='uq_livestock_health_rollups_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    livestock_id = db.Column(db.Integer, db.ForeignKey('livestock.id'), nullable=False)
+    resolution = db.Column(db.Enum('minute', 'hour', 'day', name='rollup_resolutions'), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=0)
+    temperature_min = db.Column(db.Float, nullable=False)
+    temperature_max = db.Column(db.Float, nullable=False)
+    temperature_sum = db.Column(db.Float, nullable=False)
+    pulse_min = db.Column(db.Integer, nullable=False)
+    pulse_max = db.Column(db.Integer, nullable=False)
+    pulse_sum = db.Column(db.BigInteger, nullable=False)
+
+    @property
+    def temperature_avg(self):
+        """float: The average temperature in the bucket."""
+        return self.temperature_sum / self.sample_count if self.sample_count else None
+
+    @property
+    def pulse_avg(self):
+        """float: The average pulse rate in the bucket."""
+        return self.pulse_sum / self.sample_count if self.sample_count else None
+
+    def __repr__(self):
+        return f'<LivestockHealthRollup {self.livestock_id} {self.resolution} {self.bucket_start}>'
+
+
+class ThresholdProfile(db.Model):
+    """
+    Represents health alert thresholds for a species, a breed or a single animal.
+
+    Exactly one of livestock_type, breed or livestock_id is set. When several
+    profiles match a reading, the most specific one wins: animal, then breed,
+    then species.
+
+    Attributes:
+        id (int): The unique identifier for the profile.
+        livestock_type (str): The species the profile applies to (matches Farmer.livestock_type).
+        breed (str): The breed the profile applies to (matches Livestock.breed).
+        livestock_id (int): The ID of the single livestock the profile applies to.
+        temperature_low (float): Temperature below which an alert is raised.
+        temperature_high (float): Temperature above which an alert is raised.
+        pulse_low (int): Pulse rate below which an alert is raised.
+        pulse_high (int): Pulse rate above which an alert is raised.
+        created_at (datetime): The timestamp when the profile was created.
+        updated_at (datetime): The timestamp when the profile was last updated.
+    """
+
+    __tablename__ = 'threshold_profiles'
+
+    id = db.Column(db.Integer, primary_key=True)
+    livestock_type = db.Column(db.String(255), nullable=True, unique=True)
+    breed = db.Column(db.String(255), nullable=True, unique=True)
+    livestock_id = db.Column(db.Integer, db.ForeignKey('livestock.id'), nullable=True, unique=True)
+    temperature_low = db.Column(db.Float, nullable=False)
+    temperature_high = db.Column(db.Float, nullable=False)
+    pulse_low = db.Column(db.Integer, nullable=False)
+    pulse_high = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    livestock = db.relationship('Livestock', backref=db.backref('threshold_profile', uselist=False, cascade='all, delete-orphan'))
+
+    def to_dict(self):
+        """
+        Serialise the profile for the JSON API.
+
+        Returns:
+            dict: The profile fields.
+        """
+        return {
+            "id": self.id,
+            "livestock_type": self.livestock_type,
+            "breed": self.breed,
+            "livestock_id": self.livestock_id,
+            "temperature_low": self.temperature_low,
+            "temperature_high": self.temperature_high,
+            "pulse_low": self.pulse_low,
+            "pulse_high": self.pulse_high,
+        }
+
+    def __repr__(self):
+        return f'<ThresholdProfile {self.id}>'
+
+
+class AvailabilityRule(db.Model):
+    """
+    Represents a weekly recurring availability pattern of a vet.
+
+    Concrete VetAvailability slots are generated from the rule for a rolling
+    window ahead of today, up to materialized_until.
+
+    Attributes:
+        id (int): The unique identifier for the rule.
+        vet_id (int): The ID of the associated vet.
+        weekday (int): The day of the week (0 is Monday, 6 is Sunday).
+        start_time (time): The time the vet's availability starts on that day.
+        end_time (time): The time the vet's availability ends on that day.
+        slot_minutes (int): The length of each generated slot in minutes.
+        valid_from (date): The first date the rule applies.
+        valid_until (date): The last date the rule applies, or None if open-ended.
+        materialized_until (date): The last date slots have been generated for.
+        created_at (datetime): The timestamp when the rule was created.
+    """
+
+    __tablename__ = 'availability_rules'
+
+    id = db.Column(db.Integer, primary_key=True)
+    vet_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    weekday = db.Column(db.SmallInteger, nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    slot_minutes = db.Column(db.Integer, nullable=False, default=60)
+    valid_from = db.Column(db.Date, nullable=False)
+    valid_until = db.Column(db.Date, nullable=True)
+    materialized_until = db.Column(db.Date, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    vet = db.relationship('User', backref='availability_rules')
+    slots = db.relationship('VetAvailability', backref='rule', passive_deletes=True)
+
+    def __repr__(self):
+        return f'<AvailabilityRule {self.weekday} {self.start_time} to {self.end_time}>'
+
+
+class AvailabilityException(db.Model):
+    """
+    Represents a day or period a vet is unavailable despite their rules, e.g. a holiday.
+
+    Attributes:
+        id (int): The unique identifier for the exception.
+        vet_id (int): The ID of the associated vet.
+        date (date): The date of the exception.
+        start_time (time): The start of the unavailable period, or None for the whole day.
+        end_time (time): The end of the unavailable period, or None for the whole day.
+        reason (str): Why the vet is unavailable.
+        created_at (datetime): The timestamp when the exception was created.
+    """
+
+    __tablename__ = 'availability_exceptions'
+    __table_args__ = (
+        db.Index('ix_availability_exceptions_vet_id_date', 'vet_id', 'date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    vet_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    start_time = db.Column(db.Time, nullable=True)
+    end_time = db.Column(db.Time, nullable=True)
+    reason = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    vet = db.relationship('User', backref='availability_exceptions')
+
+    def __repr__(self):
+        return f'<AvailabilityException {self.date}>'
+
+
 class VetAvailability(db.Model):
     """
     Represents the availability slots for vets.
@@ -266,10 +476,15 @@ class VetAvailability(db.Model):
         start_time (datetime): The start time of the availability slot.
         end_time (datetime): The end time of the availability slot.
         is_booked (bool): Indicates if the slot is booked.
+        rule_id (int): The ID of the recurring rule the slot was generated from, if any.
         created_at (datetime): The timestamp when the slot was created.
     """
 
     __tablename__ = 'vet_availability'
+    __table_args__ = (
+        db.Index('ix_vet_availability_vet_id_is_booked_start_time', 'vet_id', 'is_booked', 'start_time'),
+        db.UniqueConstraint('vet_id', 'start_time', name='uq_vet_availability_vet_id_start_time'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     vet_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -277,6 +492,7 @@ class VetAvailability(db.Model):
     end_time = db.Column(db.DateTime, nullable=False)
     is_booked = db.Column(db.Boolean, nullable=False)
     # available_days = db.Column(db.JSON, nullable=False)
+    rule_id = db.Column(db.Integer, db.ForeignKey('availability_rules.id', ondelete='SET NULL'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     vet = db.relationship('User', backref='availability_slots')
@@ -297,10 +513,18 @@ class Appointment(db.Model):
         livestock_id (int): The ID of the associated livestock.
         notes (str): Additional notes for the appointment.
         status (str): The status of the appointment (pending, confirmed, completed, cancelled).
+        idempotency_key (str): Client-supplied key that makes retried bookings return the same appointment.
+        active_slot_id (int): Generated copy of slot_id while the appointment is pending or confirmed, else NULL.
         created_at (datetime): The timestamp when the appointment was created.
     """
 
     __tablename__ = 'appointments'
+    __table_args__ = (
+        db.Index('ix_appointments_vet_id_created_at', 'vet_id', 'created_at', 'id'),
+        db.Index('ix_appointments_farmer_id_created_at', 'farmer_id', 'created_at', 'id'),
+        db.UniqueConstraint('active_slot_id', name='uq_appointments_active_slot_id'),
+        db.UniqueConstraint('farmer_id', 'idempotency_key', name='uq_appointments_farmer_id_idempotency_key'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     farmer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -309,6 +533,12 @@ class Appointment(db.Model):
     livestock_id = db.Column(db.Integer, db.ForeignKey('livestock.id'), nullable=False)
     notes = db.Column(db.Text)
     status = db.Column(db.Enum('pending', 'confirmed', 'completed', 'cancelled'), default='pending', nullable=False)
+    idempotency_key = db.Column(db.String(64), nullable=True)
+    # At most one active appointment per slot: NULLs do not collide in the unique constraint
+    active_slot_id = db.Column(
+        db.Integer,
+        db.Computed("CASE WHEN status IN ('pending', 'confirmed') THEN slot_id END", persisted=True)
+    )
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     farmer = db.relationship('User', foreign_keys=[farmer_id], backref='farmer_appointments')
@@ -317,3 +547,215 @@ class Appointment(db.Model):
 
     def __repr__(self):
         return f'<Appointment {self.id} - {self.status}>'
+
+
+class SmsMessage(db.Model):
+    """
+    Represents an outbound SMS in the outbox.
+
+    Messages are written here before they are handed to the SMS provider so
+    pending messages survive restarts and failed sends can be retried.
+
+    Attributes:
+        id (int): The unique identifier for the message.
+        phone_number (str): The recipient's phone number.
+        message (str): The text of the message.
+        ref_id (str): A reference ID for tracking the message.
+        status (str): The delivery status of the message (pending, sent, failed).
+        attempts (int): The number of send attempts made so far.
+        last_error (str): The error returned by the last failed attempt.
+        next_attempt_at (datetime): The earliest time of the next send attempt.
+        created_at (datetime): The timestamp when the message was queued.
+        sent_at (datetime): The timestamp when the message was accepted by the provider.
+    """
+
+    __tablename__ = 'sms_outbox'
+    __table_args__ = (
+        db.Index('ix_sms_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    phone_number = db.Column(db.String(20), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    ref_id = db.Column(db.String(255), nullable=False, default='defaultRefId')
+    status = db.Column(db.Enum('pending', 'sent', 'failed', name='sms_statuses'), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<SmsMessage {self.id} - {self.status}>'
+
+
+class EmailMessage(db.Model):
+    """
+    Represents an outbound email in the outbox.
+
+    Emails are written here before they are handed to the SMTP server so
+    pending emails survive restarts and failed sends can be retried.
+
+    Attributes:
+        id (int): The unique identifier for the email.
+        recipient (str): The recipient's email address.
+        subject (str): The subject line.
+        body (str): The plain text body.
+        html_body (str): An optional HTML version of the body.
+        status (str): The delivery status of the email (pending, sent, failed).
+        attempts (int): The number of send attempts made so far.
+        last_error (str): The error returned by the last failed attempt.
+        next_attempt_at (datetime): The earliest time of the next send attempt.
+        created_at (datetime): The timestamp when the email was queued.
+        sent_at (datetime): The timestamp when the email was accepted by the SMTP server.
+    """
+
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    html_body = db.Column(db.Text, nullable=True)
+    status = db.Column(db.Enum('pending', 'sent', 'failed', name='email_statuses'), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<EmailMessage {self.id} - {self.status}>'
+
+
+class ChatbotConversation(db.Model):
+    """
+    Represents a user's conversation with the chatbot.
+
+    Older turns are folded into a rolling summary so the prompt sent to the
+    model stays within a fixed token budget however long the conversation runs.
+
+    Attributes:
+        id (int): The unique identifier for the conversation.
+        user_id (int): The ID of the user having the conversation.
+        summary (str): A summary of the turns folded so far, or None.
+        summary_tokens (int): The estimated token count of the summary.
+        summarized_through (int): The ID of the last turn folded into the summary.
+        created_at (datetime): The timestamp when the conversation started.
+        updated_at (datetime): The timestamp of the latest change.
+    """
+
+    __tablename__ = 'chatbot_conversations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    summary = db.Column(db.Text, nullable=True)
+    summary_tokens = db.Column(db.Integer, nullable=False, default=0)
+    summarized_through = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user = db.relationship('User', backref='chatbot_conversations')
+
+    def __repr__(self):
+        return f'<ChatbotConversation {self.id} - user {self.user_id}>'
+
+
+class ChatbotTurn(db.Model):
+    """
+    Represents one message of a chatbot conversation.
+
+    Attributes:
+        id (int): The unique identifier for the turn.
+        conversation_id (int): The ID of the conversation.
+        role (str): Who wrote the message (user, assistant).
+        content (str): The text of the message.
+        tokens (int): The estimated token count of the message.
+        created_at (datetime): The timestamp when the message was written.
+    """
+
+    __tablename__ = 'chatbot_turns'
+    __table_args__ = (
+        db.Index('ix_chatbot_turns_conversation_id_id', 'conversation_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('chatbot_conversations.id', ondelete='CASCADE'), nullable=False)
+    role = db.Column(db.Enum('user', 'assistant', name='chatbot_roles'), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    tokens = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    conversation = db.relationship('ChatbotConversation', backref=db.backref('turns', passive_deletes=True))
+
+    def __repr__(self):
+        return f'<ChatbotTurn {self.id} - {self.role}>'
+
+
+class Conversation(db.Model):
+    """
+    Represents a chat conversation between a farmer and a vet.
+
+    Each farmer and vet pair has at most one conversation; its messages are
+    sent only to the sockets of those two users.
+
+    Attributes:
+        id (int): The unique identifier for the conversation.
+        farmer_id (int): The ID of the farmer.
+        vet_id (int): The ID of the vet.
+        created_at (datetime): The timestamp when the conversation started.
+        last_message_at (datetime): The timestamp of the latest message, or None.
+    """
+
+    __tablename__ = 'conversations'
+    __table_args__ = (
+        db.UniqueConstraint('farmer_id', 'vet_id', name='uq_conversations_farmer_id_vet_id'),
+        db.Index('ix_conversations_vet_id', 'vet_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    farmer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    vet_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_message_at = db.Column(db.DateTime, nullable=True)
+
+    farmer = db.relationship('User', foreign_keys=[farmer_id], backref='farmer_conversations')
+    vet = db.relationship('User', foreign_keys=[vet_id], backref='vet_conversations')
+
+    def __repr__(self):
+        return f'<Conversation {self.id} - farmer {self.farmer_id}, vet {self.vet_id}>'
+
+
+class ChatMessage(db.Model):
+    """
+    Represents a message in a conversation.
+
+    Messages are only ever appended; history is read newest first by ID.
+
+    Attributes:
+        id (int): The unique identifier for the message.
+        conversation_id (int): The ID of the conversation.
+        sender_id (int): The ID of the user who sent the message.
+        body (str): The text of the message.
+        created_at (datetime): The timestamp when the message was sent.
+    """
+
+    __tablename__ = 'chat_messages'
+    __table_args__ = (
+        db.Index('ix_chat_messages_conversation_id_id', 'conversation_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    conversation = db.relationship('Conversation', backref=db.backref('messages', lazy='dynamic'))
+    sender = db.relationship('User')
+
+    def __repr__(self):
+        return f'<ChatMessage {self.id} - conversation {self.conversation_id}>'
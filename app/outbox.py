@@ -0,0 +1,325 @@
+"""
+This module provides the persistent outbox shared by the SMS and email dispatchers.
+
+Classes:
+- OutboxDispatcher: Base class of the outbound message queues, with a bounded
+  worker pool, batching, retries with exponential backoff and metrics
+
+Messages are written to the channel's outbox table before they are sent, so
+pending messages survive restarts. Each worker drains up to a batch of queued
+messages at a time and hands them to the channel's send() in one call. Failed
+sends are retried with exponential backoff until max_retries attempts have
+been made; errors the channel reports as permanent fail straight away.
+
+Several app processes can share one outbox: a worker locks the rows it is
+about to send with SELECT ... FOR UPDATE SKIP LOCKED until their outcome is
+committed, so a message claimed by one process is skipped by the others.
+
+A channel subclass only provides its outbox model, how a batch is sent and
+which errors are permanent.
+"""
+
+import queue
+import random
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+from app.health_monitoring.extensions import socketio
+
+
+class OutboxDispatcher:
+    """
+    Outbound message queue backed by an outbox table.
+
+    Subclasses set name and config_prefix and implement model() and send().
+
+    Attributes:
+        name (str): Name of the channel in log messages, e.g. "SMS".
+        config_prefix (str): Prefix of the channel's config keys, e.g. "SMS" for SMS_WORKERS.
+        workers (int): Number of worker tasks sending messages concurrently.
+        max_retries (int): Maximum number of send attempts per message.
+        backoff_base (float): Base of the exponential backoff, in seconds.
+        backoff_max (float): Upper bound of the backoff delay, in seconds.
+        poll_interval (float): Seconds between scans of the outbox for due retries.
+        queue_size (int): Maximum number of messages held in memory at once.
+        batch_size (int): Maximum number of messages a worker sends in one call.
+    """
+
+    name = "message"
+    config_prefix = None
+
+    def __init__(self, workers=4, max_retries=5, backoff_base=2, backoff_max=300, poll_interval=5,
+                 queue_size=1000, batch_size=50):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.app = None
+        self._queue = None
+        self._lock = threading.Lock()
+        self._started = False
+        self._in_flight = set()
+        self._counters = {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0}
+        self._latencies = deque(maxlen=1000)
+
+    def model(self):
+        """
+        Get the outbox model of the channel.
+
+        Returns:
+            type: The model class, with status, attempts, last_error,
+                next_attempt_at, created_at and sent_at columns.
+        """
+        raise NotImplementedError
+
+    def send(self, messages):
+        """
+        Make one send attempt for a batch of messages.
+
+        Args:
+            messages (list): Pending outbox rows.
+
+        Returns:
+            list: For each message, None if it was accepted or the error that
+                made it fail, in the same order as messages.
+        """
+        raise NotImplementedError
+
+    def is_permanent(self, error):
+        """
+        Check whether a send error will fail again on retry.
+
+        Args:
+            error: An error returned by send().
+
+        Returns:
+            bool: True if the message should fail without further attempts.
+        """
+        return False
+
+    def init_app(self, app):
+        """
+        Bind the dispatcher to the Flask application.
+
+        The worker pool is started on the first request rather than here, so
+        CLI commands such as database migrations do not start it.
+
+        Args:
+            app (Flask): The Flask application instance.
+        """
+        prefix = self.config_prefix
+        self.app = app
+        self.workers = app.config.get(f'{prefix}_WORKERS', self.workers)
+        self.max_retries = app.config.get(f'{prefix}_MAX_RETRIES', self.max_retries)
+        self.backoff_base = app.config.get(f'{prefix}_BACKOFF_BASE', self.backoff_base)
+        self.backoff_max = app.config.get(f'{prefix}_BACKOFF_MAX', self.backoff_max)
+        self.poll_interval = app.config.get(f'{prefix}_POLL_INTERVAL', self.poll_interval)
+        self.batch_size = app.config.get(f'{prefix}_BATCH_SIZE', self.batch_size)
+        app.extensions[f'{prefix.lower()}_dispatcher'] = self
+        app.before_request(self.start)
+
+    def start(self):
+        """
+        Start the worker pool and the retry scheduler if they are not running.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._queue = socketio.server.eio.create_queue(maxsize=self.queue_size)
+
+        print(f"📨 Starting {self.name} dispatcher with {self.workers} workers")
+        for _ in range(self.workers):
+            socketio.start_background_task(self._worker)
+        socketio.start_background_task(self._scheduler)
+
+    def _enqueue(self, **columns):
+        """
+        Persist a message to the outbox and hand it to the worker pool.
+
+        The message is written in its own session so the caller's pending
+        changes are not committed as a side effect.
+
+        Args:
+            **columns: Column values of the new outbox row.
+
+        Returns:
+            int: The ID of the queued message.
+        """
+        from sqlalchemy.orm import Session
+        from app.models import db
+
+        self.start()
+
+        with Session(db.engine) as session:
+            message = self.model()(**columns)
+            session.add(message)
+            session.commit()
+            message_id = message.id
+
+        with self._lock:
+            self._counters["enqueued"] += 1
+
+        self._submit(message_id)
+        return message_id
+
+    def status(self, message_id):
+        """
+        Get the delivery status of a queued message.
+
+        Args:
+            message_id (int): The ID of the queued message.
+
+        Returns:
+            str: "pending", "sent" or "failed", or None if the message does not exist.
+        """
+        from app.models import db
+
+        message = db.session.get(self.model(), message_id)
+        return message.status if message else None
+
+    def metrics(self):
+        """
+        Get the dispatcher's counters and delivery latency.
+
+        Returns:
+            dict: Counters, queue depth and enqueue-to-sent latency in seconds.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = dict(self._counters)
+            metrics["in_flight"] = len(self._in_flight)
+
+        metrics["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        metrics["latency_avg"] = sum(latencies) / len(latencies) if latencies else None
+        metrics["latency_p95"] = latencies[int(len(latencies) * 0.95)] if latencies else None
+        return metrics
+
+    def backoff(self, attempts):
+        """
+        Get the delay before the next attempt of a message.
+
+        Args:
+            attempts (int): The number of attempts made so far.
+
+        Returns:
+            float: Delay in seconds, with jitter so retries do not arrive in lockstep.
+        """
+        delay = min(self.backoff_max, self.backoff_base ** attempts)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _submit(self, message_id):
+        """
+        Put a message on the in-memory queue unless it is already there.
+
+        If the queue is full the message stays pending in the outbox and the
+        scheduler submits it again later.
+        """
+        with self._lock:
+            if message_id in self._in_flight:
+                return
+            self._in_flight.add(message_id)
+
+        try:
+            self._queue.put_nowait(message_id)
+        except queue.Full:
+            with self._lock:
+                self._in_flight.discard(message_id)
+
+    def _worker(self):
+        """
+        Send queued messages in batches, forever.
+        """
+        while True:
+            message_ids = [self._queue.get()]
+            while len(message_ids) < self.batch_size:
+                try:
+                    message_ids.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with self.app.app_context():
+                    self._deliver(message_ids)
+            except Exception as e:
+                print(f"❌ {self.name} worker failed on messages {message_ids}: {e}")
+            finally:
+                with self._lock:
+                    self._in_flight.difference_update(message_ids)
+
+    def _deliver(self, message_ids):
+        """
+        Make one send attempt for a batch of messages and record the outcomes.
+
+        The messages stay locked from the claim until the outcomes are
+        committed; messages another process has claimed are left to it.
+        """
+        from app.models import db
+
+        model = self.model()
+        pending = model.query.filter(
+            model.id.in_(message_ids),
+            model.status == 'pending',
+            model.next_attempt_at <= datetime.utcnow()
+        ).with_for_update(skip_locked=True).all()
+        if not pending:
+            return
+
+        errors = self.send(pending)
+        now = datetime.utcnow()
+
+        for message, error in zip(pending, errors):
+            self._record_attempt(message, error, now)
+
+        db.session.commit()
+
+    def _record_attempt(self, message, error, now):
+        """
+        Update a message with the outcome of a send attempt.
+        """
+        message.attempts += 1
+
+        if error is None:
+            message.status = 'sent'
+            message.sent_at = now
+            message.last_error = None
+            with self._lock:
+                self._counters["sent"] += 1
+                self._latencies.append((now - message.created_at).total_seconds())
+        elif self.is_permanent(error) or message.attempts >= self.max_retries:
+            message.status = 'failed'
+            message.last_error = str(error)
+            with self._lock:
+                self._counters["failed"] += 1
+            print(f"❌ Giving up on {self.name} {message.id} after {message.attempts} attempts: {error}")
+        else:
+            message.last_error = str(error)
+            message.next_attempt_at = now + timedelta(seconds=self.backoff(message.attempts))
+            with self._lock:
+                self._counters["retried"] += 1
+
+    def _scheduler(self):
+        """
+        Periodically submit pending messages that are due, including those
+        left over from before a restart and those waiting for a retry.
+        """
+        model = self.model()
+
+        while True:
+            try:
+                with self.app.app_context():
+                    due = model.query.with_entities(model.id).filter(
+                        model.status == 'pending',
+                        model.next_attempt_at <= datetime.utcnow()
+                    ).order_by(model.next_attempt_at.asc()).limit(self.queue_size).all()
+
+                for (message_id,) in due:
+                    self._submit(message_id)
+            except Exception as e:
+                print(f"❌ {self.name} scheduler failed: {e}")
+
+            socketio.sleep(self.poll_interval)
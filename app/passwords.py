@@ -0,0 +1,99 @@
+"""
+This module hashes and verifies passwords without blocking the event loop.
+
+It provides the following:
+- hash_password(): Hash a password with the configured method
+- verify_password(): Check a password against a stored hash
+- needs_rehash(): Check whether a stored hash uses outdated parameters
+
+Password hashing is deliberately slow, tens of milliseconds of pure CPU. When
+the app runs under eventlet (wsgi.py monkey patches it), doing that on the hub
+would freeze every socket and background loop for as long, so the work is
+handed to eventlet's native thread pool (tpool) instead. The pool size is set
+with the EVENTLET_THREADPOOL_SIZE environment variable. Outside eventlet, e.g.
+in CLI commands and scripts, hashing runs inline.
+
+The method and cost come from PASSWORD_HASH_METHOD (any Werkzeug method string,
+such as "scrypt:32768:8:1" or "pbkdf2:sha256:1000000"); use
+scripts/password_hash_benchmark.py to pick one. Existing hashes keep working
+after it changes and are upgraded when their owner next logs in.
+"""
+
+from functools import lru_cache
+
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Werkzeug's default method, used when no app is configured
+DEFAULT_HASH_METHOD = 'scrypt:32768:8:1'
+
+
+def _offload(func, *args):
+    """Run a CPU-bound function in eventlet's thread pool if the app runs under eventlet"""
+    try:
+        from eventlet import patcher, tpool
+    except ImportError:
+        return func(*args)
+    if not patcher.is_monkey_patched('thread'):
+        return func(*args)
+    return tpool.execute(func, *args)
+
+
+def hash_method():
+    """
+    Get the configured hashing method.
+
+    Returns:
+        str: A Werkzeug method string.
+    """
+    if has_app_context():
+        return current_app.config.get('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD)
+    return DEFAULT_HASH_METHOD
+
+
+@lru_cache(maxsize=8)
+def _hash_prefix(method):
+    """Get the prefix Werkzeug writes for a method, with its default parameters filled in"""
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+def hash_password(password):
+    """
+    Hash a password with the configured method.
+
+    Args:
+        password (str): The password to hash.
+
+    Returns:
+        str: The password hash.
+    """
+    return _offload(generate_password_hash, password, hash_method())
+
+
+def verify_password(password_hash, password):
+    """
+    Check a password against a stored hash.
+
+    Args:
+        password_hash (str): The stored hash.
+        password (str): The password to check.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+    if not password_hash:
+        return False
+    return _offload(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """
+    Check whether a hash was made with a different method or cost than configured.
+
+    Args:
+        password_hash (str): The stored hash.
+
+    Returns:
+        bool: True if the hash should be replaced on the next successful login.
+    """
+    return password_hash.split('$', 1)[0] != _hash_prefix(hash_method())
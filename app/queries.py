@@ -0,0 +1,287 @@
+"""
+This module provides shared database queries for listing pages.
+
+Functions:
+- vet_appointments(vet_id, cursor, limit): A page of a vet's appointments.
+- farmer_appointments(farmer_id, cursor, limit): A page of a farmer's appointments.
+- search_vets(...): A page of vets matching location, specialization and rating filters.
+- week_start(now), week_end(now): The bounds of the current week.
+- vets_free_this_week(county): Cached list of vets in a county with a free slot this week.
+- invalidate_vet_search(): Drop cached vet search results; called whenever a slot
+  is added, booked, freed or deleted.
+
+Listings eager-load the relationships their templates use in the same query
+and load only the columns those templates read, so a page costs one query no
+matter how many appointments it shows. Pages are ordered newest first and
+paginated with keyset cursors, which stay fast on deep pages where OFFSET
+would scan and discard every earlier row.
+
+Vet search projects the columns the results page shows into plain rows, so
+they can be cached without holding on to ORM objects.
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, event, func, or_, select
+from sqlalchemy.orm import joinedload, load_only
+
+from app import db
+from app.cache import TTLCache
+from app.models import Appointment, Location, User, Vet, VetAvailability
+
+# Default number of appointments per page
+APPOINTMENTS_PER_PAGE = 20
+
+# Default number of vets per page
+VETS_PER_PAGE = 20
+
+# A page of results and the cursor of the next page, or None on the last page
+Page = namedtuple('Page', ['items', 'next_cursor'])
+
+# A page of vet search results, numbered from 1
+VetPage = namedtuple('VetPage', ['items', 'page', 'has_next'])
+
+# Vets with a free slot this week, keyed by (county, week start)
+free_vets_cache = TTLCache(maxsize=256, ttl=300)
+
+
+def encode_cursor(created_at, appointment_id):
+    """
+    Encode the position after an appointment as an opaque cursor.
+
+    Args:
+        created_at (datetime): The creation time of the last appointment on the page.
+        appointment_id (int): The ID of the last appointment on the page.
+
+    Returns:
+        str: The cursor.
+    """
+    return f"{created_at.isoformat()}_{appointment_id}"
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor created by encode_cursor().
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        tuple: (created_at, appointment_id), or None if the cursor is missing or invalid.
+    """
+    if not cursor:
+        return None
+    try:
+        created_at, appointment_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(appointment_id)
+    except ValueError:
+        return None
+
+
+def _appointment_page(query, cursor=None, limit=APPOINTMENTS_PER_PAGE):
+    """
+    Apply newest-first keyset pagination to an appointment query.
+
+    Returns:
+        Page: The appointments and the cursor of the next page.
+    """
+    position = decode_cursor(cursor)
+    if position:
+        created_at, appointment_id = position
+        query = query.filter(or_(
+            Appointment.created_at < created_at,
+            and_(Appointment.created_at == created_at, Appointment.id < appointment_id)
+        ))
+
+    appointments = query.order_by(Appointment.created_at.desc(), Appointment.id.desc())\
+        .limit(limit + 1).all()
+
+    next_cursor = None
+    if len(appointments) > limit:
+        appointments = appointments[:limit]
+        next_cursor = encode_cursor(appointments[-1].created_at, appointments[-1].id)
+
+    return Page(appointments, next_cursor)
+
+
+def _appointment_query(counterpart):
+    """
+    Build an appointment query that eager-loads the slot and the other party.
+
+    Args:
+        counterpart (relationship): Appointment.farmer or Appointment.vet.
+    """
+    return Appointment.query.options(
+        load_only(Appointment.id, Appointment.status, Appointment.created_at),
+        joinedload(Appointment.slot).load_only(VetAvailability.start_time, VetAvailability.end_time),
+        joinedload(counterpart).load_only(User.first_name, User.last_name, User.phone, User.email),
+    )
+
+
+def vet_appointments(vet_id, cursor=None, limit=APPOINTMENTS_PER_PAGE):
+    """
+    Get a page of a vet's appointments with their farmers and slots loaded.
+
+    Args:
+        vet_id (int): The user ID of the vet.
+        cursor (str): The cursor of the page, or None for the first page.
+        limit (int): The maximum number of appointments on the page.
+
+    Returns:
+        Page: The appointments, newest first, and the cursor of the next page.
+    """
+    query = _appointment_query(Appointment.farmer).filter(Appointment.vet_id == vet_id)
+    return _appointment_page(query, cursor, limit)
+
+
+def farmer_appointments(farmer_id, cursor=None, limit=APPOINTMENTS_PER_PAGE):
+    """
+    Get a page of a farmer's appointments with their vets and slots loaded.
+
+    Args:
+        farmer_id (int): The user ID of the farmer.
+        cursor (str): The cursor of the page, or None for the first page.
+        limit (int): The maximum number of appointments on the page.
+
+    Returns:
+        Page: The appointments, newest first, and the cursor of the next page.
+    """
+    query = _appointment_query(Appointment.vet).filter(Appointment.farmer_id == farmer_id)
+    return _appointment_page(query, cursor, limit)
+
+
+def week_start(now=None):
+    """
+    Get the start of the current week (Monday 00:00 UTC).
+
+    Args:
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        datetime: The start of the week.
+    """
+    now = now or datetime.utcnow()
+    return (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def week_end(now=None):
+    """
+    Get the end of the current week (the start of next week).
+
+    Args:
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        datetime: The end of the week.
+    """
+    return week_start(now) + timedelta(days=7)
+
+
+def search_vets(county=None, town=None, specialization=None, min_rating=None, verified_only=False,
+                free_before=None, page=1, per_page=VETS_PER_PAGE, now=None):
+    """
+    Search vets by location, specialization, rating and availability.
+
+    Each result carries the vet's next free slot, from one grouped subquery
+    that the (vet_id, is_booked, start_time) index answers without touching
+    booked or past slots.
+
+    Args:
+        county (str): Only vets located in this county.
+        town (str): Only vets located in this town.
+        specialization (str): Only vets with this specialization.
+        min_rating (float): Only vets with at least this average rating.
+        verified_only (bool): Only verified vets.
+        free_before (datetime): Only vets with a free slot starting before this time.
+        page (int): The page number, starting at 1.
+        per_page (int): The number of vets per page, or None for all matches.
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        VetPage: Result rows with vet_id, first_name, last_name, specialization,
+            clinic_name, avg_rating, is_verified, county, town and next_free_slot,
+            best rated first.
+    """
+    now = now or datetime.utcnow()
+
+    next_slot = select(
+        VetAvailability.vet_id,
+        func.min(VetAvailability.start_time).label('next_free_slot')
+    ).filter(
+        VetAvailability.is_booked == False,
+        VetAvailability.start_time > now
+    ).group_by(VetAvailability.vet_id).subquery()
+
+    query = db.session.query(
+        Vet.id.label('vet_id'),
+        User.first_name,
+        User.last_name,
+        Vet.specialization,
+        Vet.clinic_name,
+        Vet.avg_rating,
+        Vet.is_verified,
+        Location.county,
+        Location.town,
+        next_slot.c.next_free_slot
+    ).join(User, Vet.user_id == User.id)\
+        .outerjoin(Location, Location.user_id == User.id)\
+        .outerjoin(next_slot, next_slot.c.vet_id == User.id)
+
+    if county:
+        query = query.filter(Location.county == county)
+    if town:
+        query = query.filter(Location.town == town)
+    if specialization:
+        query = query.filter(Vet.specialization == specialization)
+    if min_rating is not None:
+        query = query.filter(Vet.avg_rating >= min_rating)
+    if verified_only:
+        query = query.filter(Vet.is_verified == True)
+    if free_before is not None:
+        query = query.filter(next_slot.c.next_free_slot < free_before)
+
+    query = query.order_by(Vet.avg_rating.desc(), Vet.id.asc())
+
+    if per_page is None:
+        return VetPage(query.all(), 1, False)
+
+    page = max(page, 1)
+    vets = query.offset((page - 1) * per_page).limit(per_page + 1).all()
+    return VetPage(vets[:per_page], page, len(vets) > per_page)
+
+
+def vets_free_this_week(county, now=None):
+    """
+    Get the vets in a county with a free slot before the end of this week.
+
+    Results are cached for a few minutes per county and week, and dropped
+    whenever a vet availability slot changes.
+
+    Args:
+        county (str): The county to search.
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        list: Result rows as returned by search_vets().
+    """
+    now = now or datetime.utcnow()
+    key = (county, week_start(now))
+
+    vets = free_vets_cache.get(key)
+    if vets is None:
+        vets = search_vets(county=county, free_before=week_end(now), per_page=None, now=now).items
+        free_vets_cache.set(key, vets)
+    return vets
+
+
+def invalidate_vet_search():
+    """
+    Drop cached vet search results, e.g. after slots are added, booked or freed.
+    """
+    free_vets_cache.clear()
+
+
+# Any slot change can move a vet in or out of the cached results
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(VetAvailability, _event, lambda mapper, connection, target: invalidate_vet_search())
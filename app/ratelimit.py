@@ -0,0 +1,73 @@
+"""
+This module provides in-memory rate limiting for the Flask application.
+
+Classes:
+- TokenBucketLimiter: A thread-safe token bucket per key, e.g. per user or per IP.
+
+Each key gets a bucket of `capacity` tokens that refills by one token every
+`refill_seconds`. A request takes a token; when the bucket is empty the
+request is refused until the next token arrives. That allows short bursts
+while capping the sustained rate. Buckets are refilled lazily on access, so
+idle keys cost nothing but their memory, which is bounded by `maxsize`.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    A thread-safe token bucket rate limiter keyed by an arbitrary value.
+
+    Attributes:
+        capacity (float): Maximum number of tokens, i.e. the allowed burst.
+        refill_seconds (float): Seconds it takes to regain one token.
+        maxsize (int): Maximum number of buckets kept; the least recently used is dropped.
+    """
+
+    def __init__(self, capacity, refill_seconds, maxsize=10000):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def hit(self, key, cost=1):
+        """
+        Take tokens from a key's bucket if it has enough.
+
+        Args:
+            key: The key to limit, e.g. a user ID or an IP address.
+            cost (float): The number of tokens the request takes.
+
+        Returns:
+            float: 0 if the request is allowed, otherwise the seconds until it would be.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) / self.refill_seconds)
+
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (cost - tokens) * self.refill_seconds
+
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self, key):
+        """
+        Refill a key's bucket, e.g. after a successful verification.
+        """
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._buckets)
@@ -0,0 +1,74 @@
+"""
+This module provides asynchronous delivery of outbound SMS.
+
+It provides the following:
+- SMSDispatcher: The sms_outbox table's dispatcher, see app.outbox
+- sms_dispatcher: The process-wide dispatcher instance
+- queue_sms(): Queue an SMS and return without waiting for the provider
+
+Messages are written to the sms_outbox table before they are sent, so pending
+messages survive restarts. Each worker drains up to SMS_BATCH_SIZE queued
+messages at a time and sends them with one bulk call. Failed sends are retried
+with exponential backoff until SMS_MAX_RETRIES attempts have been made.
+"""
+
+from app.outbox import OutboxDispatcher
+
+from .sms_service import send_bulk_sms
+
+
+class SMSDispatcher(OutboxDispatcher):
+    """
+    Outbound SMS queue backed by the sms_outbox table.
+
+    Configured by the SMS_* settings; see OutboxDispatcher for the attributes.
+    """
+
+    name = "SMS"
+    config_prefix = "SMS"
+
+    def model(self):
+        """The sms_outbox model"""
+        from app.models import SmsMessage
+
+        return SmsMessage
+
+    def send(self, messages):
+        """Send a batch of SMS with one bulk call to the provider"""
+        responses = send_bulk_sms([
+            {"phone_number": sms.phone_number, "message": sms.message, "ref_id": sms.ref_id}
+            for sms in messages
+        ])
+        return [
+            response.get("error") if isinstance(response, dict) else f"Unexpected response: {response!r}"
+            for response in responses
+        ]
+
+    def enqueue(self, phone_number, message, ref_id="defaultRefId"):
+        """
+        Persist an SMS to the outbox and hand it to the worker pool.
+
+        Args:
+            phone_number (str): The recipient's phone number.
+            message (str): The message to be sent.
+            ref_id (str): A reference ID for tracking the message.
+
+        Returns:
+            int: The ID of the queued message.
+        """
+        return self._enqueue(phone_number=phone_number, message=message, ref_id=ref_id)
+
+
+sms_dispatcher = SMSDispatcher()
+
+
+def queue_sms(phone_number: str, message: str, ref_id: str = "defaultRefId"):
+    """
+    Queue an SMS for asynchronous delivery.
+
+    :param phone_number: The recipient's phone number.
+    :param message: The message to be sent.
+    :param ref_id: A reference ID for tracking the message.
+    :return: The ID of the queued message.
+    """
+    return sms_dispatcher.enqueue(phone_number, message, ref_id)
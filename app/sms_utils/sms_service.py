@@ -1,4 +1,6 @@
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import os
 from dotenv import load_dotenv
 
@@ -6,6 +8,7 @@ load_dotenv()
 
 # API Endpoint and Key
 API_URL = os.getenv('SEND_SMS_ENDPOINT')
+BULK_API_URL = os.getenv('SEND_BULK_SMS_ENDPOINT')
 API_KEY = os.getenv('TIARA_API_KEY')
 
 HEADERS = {
@@ -13,33 +16,131 @@ HEADERS = {
     "Authorization": f"Bearer {API_KEY}"
 }
 
-def send_sms(phone_number: str, message: str, ref_id: str = "defaultRefId"):
+# Connection settings
+CONNECT_TIMEOUT = float(os.getenv('SMS_CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.getenv('SMS_READ_TIMEOUT', 10))
+POOL_SIZE = int(os.getenv('SMS_POOL_SIZE', 10))
+BULK_SIZE = int(os.getenv('SMS_BULK_SIZE', 100))
+
+
+def _create_session():
     """
-    Send an SMS using the Tiara SMS service.
+    Create a keep-alive HTTP session with a connection pool for the SMS provider.
 
-    :param phone_number: The recipient's phone number.
-    :param message: The message to be sent.
-    :param ref_id: A reference ID for tracking the message.
-    :return: Response from the SMS service.
+    :return: The configured requests session.
     """
-    sms_data = {
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared session so every message reuses open connections to the provider
+session = _create_session()
+
+
+def _sms_payload(phone_number, message, ref_id):
+    return {
         "from": "CONNECT",
         "to": phone_number,
         "message": message,
         "redId": ref_id,
         "messageType": "1"
     }
-    
+
+
+def _result(body, response):
+    """
+    Turn one parsed result of the SMS service into a result dict.
+
+    :param body: The parsed JSON result for one message.
+    :param response: The HTTP response it came from.
+    :return: The result, or a dict with an error if it is not a JSON object.
+    """
+    if isinstance(body, dict):
+        return body
+    return {"error": f"Unexpected response from the SMS service: {response.text[:200]}"}
+
+
+def send_sms(phone_number: str, message: str, ref_id: str = "defaultRefId"):
+    """
+    Send an SMS using the Tiara SMS service.
+
+    :param phone_number: The recipient's phone number.
+    :param message: The message to be sent.
+    :param ref_id: A reference ID for tracking the message.
+    :return: Response from the SMS service.
+    """
+    sms_data = _sms_payload(phone_number, message, ref_id)
+
     try:
-        response = requests.post(API_URL, json=sms_data, headers=HEADERS)
-        
-        if response.status_code == 200:
-            print(f"✅ SMS sent to {phone_number}")
-            return response.json()
-        else:
-            print(f"❌ Failed to send SMS to {phone_number}: {response.text}")
-            return {"error": response.text}
-    
+        response = session.post(API_URL, json=sms_data, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
     except requests.exceptions.RequestException as e:
         print(f"❌ Request failed: {e}")
         return {"error": str(e)}
+
+    if response.status_code != 200:
+        print(f"❌ Failed to send SMS to {phone_number}: {response.text}")
+        return {"error": response.text}
+
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    result = _result(body, response)
+    if "error" in result:
+        print(f"❌ Failed to send SMS to {phone_number}: {result['error']}")
+    else:
+        print(f"✅ SMS sent to {phone_number}")
+    return result
+
+
+def send_bulk_sms(messages: list):
+    """
+    Send many SMS with as few provider calls as possible.
+
+    When SEND_BULK_SMS_ENDPOINT is set, messages are posted to it in chunks of
+    SMS_BULK_SIZE as a JSON array of the same objects send_sms() posts, and the
+    provider is expected to answer with an array of per-message results.
+    Otherwise the messages are sent one by one, concurrently, over the pooled
+    session.
+
+    :param messages: Dicts with phone_number, message and optionally ref_id.
+    :return: Responses from the SMS service, in the same order as messages.
+    """
+    if not messages:
+        return []
+
+    if not BULK_API_URL:
+        with ThreadPoolExecutor(max_workers=min(POOL_SIZE, len(messages))) as executor:
+            return list(executor.map(
+                lambda sms: send_sms(sms["phone_number"], sms["message"], sms.get("ref_id", "defaultRefId")),
+                messages
+            ))
+
+    results = []
+    for start in range(0, len(messages), BULK_SIZE):
+        chunk = messages[start:start + BULK_SIZE]
+        payload = [
+            _sms_payload(sms["phone_number"], sms["message"], sms.get("ref_id", "defaultRefId"))
+            for sms in chunk
+        ]
+
+        try:
+            response = session.post(BULK_API_URL, json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            body = response.json() if response.status_code == 200 else None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"❌ Bulk request failed: {e}")
+            results.extend({"error": str(e)} for _ in chunk)
+            continue
+
+        if isinstance(body, list) and len(body) == len(chunk):
+            print(f"✅ Bulk SMS sent to {len(chunk)} recipients")
+            results.extend(_result(result, response) for result in body)
+        else:
+            print(f"❌ Failed to send bulk SMS: {response.text}")
+            results.extend({"error": response.text} for _ in chunk)
+
+    return results
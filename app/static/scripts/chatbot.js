@@ -1,40 +1,104 @@
 const chatBox = document.getElementById("chat-box");
 const inputField = document.getElementById("user-input");
 const sendBtn = document.getElementById("send_btn");
+const newChatBtn = document.getElementById("new_chat_btn");
+
+// Escape text before putting it into the chat box
+const escapeHtml = (text) => {
+  const div = document.createElement("div");
+  div.textContent = text;
+  return div.innerHTML;
+};
+
+// Split a server-sent events buffer into complete events and the unfinished rest
+const parseEvents = (buffer) => {
+  const parts = buffer.split("\n\n");
+  const rest = parts.pop();
+  const events = parts.map((part) => {
+    let event = "message";
+    let data = "";
+    part.split("\n").forEach((line) => {
+      if (line.startsWith("event:")) event = line.slice(6).trim();
+      else if (line.startsWith("data:")) data += line.slice(5).trim();
+    });
+    return { event, data: data ? JSON.parse(data) : {} };
+  });
+  return { events, rest };
+};
 
 const sendMessage = async () => {
   const userMessage = inputField.value.trim();
   if (!userMessage) return;
 
-  chatBox.innerHTML += `<p><strong>You:</strong> ${userMessage} </p>`;
+  chatBox.innerHTML += `<p><strong>You:</strong> ${escapeHtml(userMessage)} </p>`;
   inputField.value = "";
 
-  // let url = "http://localhost:5000/chatbot/get_response";
-  let url = "/chatbot/get_response"; // Use relative URL for production
-  let response = await fetch(url, {
-    method: "POST",
-    headers: {
-      "Content-Type": "application/json",
-    },
-    body: JSON.stringify({ message: userMessage }),
-  });
+  // Show the reply as it is generated instead of waiting for all of it
+  const reply = document.createElement("p");
+  reply.innerHTML = "<strong>Bot:</strong> <span></span>";
+  const label = reply.querySelector("strong");
+  const text = reply.querySelector("span");
+  chatBox.appendChild(reply);
+
+  try {
+    // let url = "http://localhost:5000/chatbot/stream";
+    let url = "/chatbot/stream"; // Use relative URL for production
+    let response = await fetch(url, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ message: userMessage }),
+    });
+    if (!response.ok || !response.body) throw new Error(response.statusText);
 
-  let data = await response.json();
-  if (data.reply) {
-    chatBox.innerHTML += `<p><strong>Bot: ${data.language.toUpperCase()} </strong> ${data.reply} </p>`;
-  } else {
-    chatBox.innerHTML += `<p><strong>Bot:</strong> Sorry, something went wrong. </p>`;
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const parsed = parseEvents(buffer);
+      buffer = parsed.rest;
+
+      parsed.events.forEach(({ event, data }) => {
+        if (event === "language") {
+          label.textContent = `Bot: ${data.language.toUpperCase()} `;
+        } else if (event === "token") {
+          text.textContent += data.text;
+        } else if (event === "error") {
+          text.textContent = data.error;
+        }
+      });
+      chatBox.scrollTop = chatBox.scrollHeight;
+    }
+  } catch (e) {
+    text.textContent = "Sorry, something went wrong.";
   }
 
   chatBox.scrollTop = chatBox.scrollHeight;
 };
 
+// Forget the conversation so far on the server and on the page
+const newChat = async () => {
+  let response = await fetch("/chatbot/new", { method: "POST" });
+  if (response.ok) chatBox.innerHTML = "";
+};
+
 // Send message on button click
 sendBtn.addEventListener("click", sendMessage);
 
+// Start a new conversation on button click
+newChatBtn.addEventListener("click", newChat);
+
 // Send message on Enter key press
 inputField.addEventListener("keypress", (event) => {
   if (event.key === "Enter") {
     sendMessage();
   }
-});
\ No newline at end of file
+});
+
+// Show the end of the conversation loaded with the page
+chatBox.scrollTop = chatBox.scrollHeight;
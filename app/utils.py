@@ -3,22 +3,17 @@ This module provides utility functions for the Flask application.
 
 Functions:
 - allowed_file(filename): Checks if a file is allowed based on its extension.
-- send_email(recipient_email, msg): Sends an email using SMTP.
+- send_email(recipient_email, msg): Queues a raw "Subject: ..." message for delivery.
 """
 
 from flask import current_app
 from werkzeug.utils import secure_filename
-import smtplib
 import os
 from dotenv import load_dotenv
 
 # Load environment variables from .env
 load_dotenv()
 
-# Fetch email credentials from environment variables
-EMAIL_USER = os.getenv("EMAIL_USER")
-EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png'}
 
 def allowed_file(filename):
@@ -55,26 +50,25 @@ def save_file(file, upload_folder):
 
 def send_email(recipient_email, msg):
     """
-    Send an email using SMTP.
+    Queue an email given as a raw message with an optional "Subject:" header line.
+
+    Delivery happens in the background; see app.email_utils.email_queue.
 
     Args:
         recipient_email (str): The email address of the recipient.
-        msg (str): The message to send.
+        msg (str): The message to send, e.g. "Subject: Hello\\n\\nBody".
 
-    Raises:
-        smtplib.SMTPException: If there is an error sending the email.
-        Exception: If there is a general error.
+    Returns:
+        int: The ID of the queued email.
     """
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.sendmail(EMAIL_USER, recipient_email, msg=msg)
-        server.quit()
-    except smtplib.SMTPException as e:
-        print('Error sending email: {}'.format(e))
-    except Exception as e:
-        print('Error: {}'.format(e))
+    from app.email_utils.email_queue import queue_email
+
+    subject = ''
+    if msg.startswith('Subject:'):
+        header, _, msg = msg.partition('\n')
+        subject = header[len('Subject:'):].strip()
+        msg = msg.lstrip('\n')
+    return queue_email(recipient_email, subject, msg)
         
 
 KENYA_COUNTIES = [
@@ -128,6 +122,16 @@ KENYA_COUNTIES = [
     ('west_pokot', 'West Pokot')
 ]
 
+VET_SPECIALIZATIONS = [
+    ('', 'Select Specialization'),
+    ('cattle', 'Cattle'),
+    ('poultry', 'Poultry'),
+    ('sheep', 'Sheep'),
+    ('goat', 'Goat'),
+    ('pig', 'Pig'),
+    ('general', 'General')
+]
+
 COUNTY_TOWNS = {
     "baringo": ["Kabarnet", "Eldama Ravine", "Mogotio", "Marigat", "Ravine"],
     "bomet": ["Bomet Town", "Sotik", "Kaplong", "Mulot", "Longisa"],
@@ -4,6 +4,7 @@ This module initializes the vet blueprint for the Flask application.
 It sets up the following:
 - Blueprint for vet routes
 - Imports the routes for vet
+- Imports the `flask vet` CLI commands
 
 The blueprint handles functionalities related to vets, such as managing availability slots, viewing appointments, and managing appointments.
 """
@@ -13,5 +14,5 @@ from flask import Blueprint
 # Create a blueprint for vet
 vet_bp = Blueprint('vet', __name__, template_folder='templates')
 
-# Import the routes for vet
-from . import routes
\ No newline at end of file
+# Import the routes and CLI commands for vet
+from . import routes, commands
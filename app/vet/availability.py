@@ -0,0 +1,366 @@
+"""
+This module generates vet availability slots from recurring rules.
+
+It provides the following:
+- expand_rules(): Turn weekly rules and exceptions into concrete slot times
+- load_slot_index(): Load a vet's slots in a time range into an IntervalIndex
+- materialize_slots(): Create the slots of a vet's rules up to a rolling horizon
+- free_slots(): Get a vet's unbooked slots between two times
+- create_slots(): Validate and insert a batch of proposed slots in one transaction
+- unmaterialize_slots(): Remove unbooked generated slots, e.g. when a rule is deleted
+- rematerialize_days(): Regenerate the slots of some days after their exceptions change
+
+Rules are only expanded into VetAvailability rows for AVAILABILITY_WINDOW_DAYS
+ahead of today. Each rule records how far it has been expanded, so the
+expansion happens lazily, when a vet's availability is viewed or by
+`flask vet materialize-slots`, and costs nothing once the window is covered.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.intervals import IntervalIndex
+from app.models import db, AvailabilityRule, AvailabilityException, User, VetAvailability
+from app.queries import invalidate_vet_search
+
+# Default number of days ahead to generate slots for
+AVAILABILITY_WINDOW_DAYS = 28
+
+# Maximum number of slots accepted by one create_slots() call
+MAX_BULK_SLOTS = 1000
+
+# Longest slot a vet can add by hand
+MAX_SLOT_LENGTH = timedelta(hours=12)
+
+
+def window_end(today=None):
+    """
+    Get the last date slots are generated for.
+
+    Args:
+        today (date): The reference date, defaults to the current UTC date.
+
+    Returns:
+        date: The end of the rolling window.
+    """
+    days = current_app.config.get('AVAILABILITY_WINDOW_DAYS', AVAILABILITY_WINDOW_DAYS)
+    return (today or datetime.utcnow().date()) + timedelta(days=days)
+
+
+def _first_unmaterialized_day(rule, today):
+    """Get the first date a rule still has to be expanded for"""
+    if rule.materialized_until is None:
+        return today
+    return max(rule.materialized_until + timedelta(days=1), today)
+
+
+def _blocked(exceptions, start, end):
+    """Check whether [start, end) falls in any exception of its day"""
+    for exception in exceptions.get(start.date(), ()):
+        if exception.start_time is None or exception.end_time is None:
+            return True
+        if datetime.combine(start.date(), exception.start_time) < end and \
+                start < datetime.combine(start.date(), exception.end_time):
+            return True
+    return False
+
+
+def expand_rules(rules, exceptions, first_day, last_day):
+    """
+    Expand weekly rules into concrete slot times.
+
+    Args:
+        rules (iterable): AvailabilityRule objects.
+        exceptions (iterable): AvailabilityException objects of the same vet.
+        first_day (date): The first date to expand.
+        last_day (date): The last date to expand.
+
+    Yields:
+        tuple: (start, end, rule) for every slot not blocked by an exception.
+    """
+    by_date = {}
+    for exception in exceptions:
+        by_date.setdefault(exception.date, []).append(exception)
+
+    for rule in rules:
+        first = max(first_day, rule.valid_from)
+        last = min(last_day, rule.valid_until) if rule.valid_until else last_day
+        # Jump straight to the first matching weekday
+        day = first + timedelta(days=(rule.weekday - first.weekday()) % 7)
+        length = timedelta(minutes=rule.slot_minutes)
+
+        while day <= last:
+            start = datetime.combine(day, rule.start_time)
+            day_end = datetime.combine(day, rule.end_time)
+            while start + length <= day_end:
+                if not _blocked(by_date, start, start + length):
+                    yield start, start + length, rule
+                start += length
+            day += timedelta(days=7)
+
+
+def load_slot_index(vet_id, start, end):
+    """
+    Load a vet's slots overlapping a time range with one query.
+
+    Args:
+        vet_id (int): The user ID of the vet.
+        start (datetime): The start of the range.
+        end (datetime): The end of the range.
+
+    Returns:
+        IntervalIndex: The slots, with their VetAvailability rows as values.
+    """
+    slots = VetAvailability.query.filter(
+        VetAvailability.vet_id == vet_id,
+        VetAvailability.start_time < end,
+        VetAvailability.end_time > start
+    ).all()
+    return IntervalIndex((slot.start_time, slot.end_time, slot) for slot in slots)
+
+
+def materialize_slots(vet_id, until=None, now=None):
+    """
+    Create the slots of a vet's rules up to a date.
+
+    Only rules not yet expanded up to the date do any work. Slots that would
+    overlap an existing slot, including manually added ones, are skipped.
+
+    Args:
+        vet_id (int): The user ID of the vet.
+        until (date): The last date to generate slots for, defaults to window_end().
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        int: The number of slots created.
+    """
+    now = now or datetime.utcnow()
+    until = until or window_end(now.date())
+
+    rules = AvailabilityRule.query.filter(
+        AvailabilityRule.vet_id == vet_id,
+        (AvailabilityRule.materialized_until.is_(None)) | (AvailabilityRule.materialized_until < until)
+    ).all()
+    if not rules:
+        return 0
+
+    first_day = min(_first_unmaterialized_day(rule, now.date()) for rule in rules)
+    exceptions = AvailabilityException.query.filter(
+        AvailabilityException.vet_id == vet_id,
+        AvailabilityException.date.between(first_day, until)
+    ).all()
+    index = load_slot_index(vet_id, datetime.combine(first_day, datetime.min.time()),
+                            datetime.combine(until + timedelta(days=1), datetime.min.time()))
+
+    rows = []
+    for rule in rules:
+        rule_first = _first_unmaterialized_day(rule, now.date())
+        for start, end, _ in expand_rules([rule], exceptions, rule_first, until):
+            if start > now and index.add(start, end, rule.id):
+                rows.append({"vet_id": vet_id, "start_time": start, "end_time": end,
+                             "is_booked": False, "rule_id": rule.id, "created_at": now})
+        rule.materialized_until = until
+
+    if rows:
+        db.session.execute(insert(VetAvailability), rows)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request materialized the same slots first
+        db.session.rollback()
+        return 0
+
+    if rows:
+        invalidate_vet_search()
+    return len(rows)
+
+
+def free_slots(vet_id, start, end):
+    """
+    Get a vet's unbooked slots between two times, generating them first if needed.
+
+    Args:
+        vet_id (int): The user ID of the vet.
+        start (datetime): The start of the range.
+        end (datetime): The end of the range.
+
+    Returns:
+        list: VetAvailability objects, earliest first.
+    """
+    materialize_slots(vet_id)
+    index = load_slot_index(vet_id, start, end)
+    return [slot for _, _, slot in index.between(start, end) if not slot.is_booked]
+
+
+def _parse_slot(proposed, now):
+    """Parse one proposed slot, returning (start, end, None) or (None, None, error)"""
+    if not isinstance(proposed, dict):
+        return None, None, "Slot must be an object with start_time and end_time"
+    try:
+        start = datetime.fromisoformat(str(proposed.get('start_time')))
+        end = datetime.fromisoformat(str(proposed.get('end_time')))
+    except ValueError:
+        return None, None, "Invalid date/time format"
+    if start.tzinfo is not None or end.tzinfo is not None:
+        return None, None, "Times must not carry a timezone offset"
+    if start >= end:
+        return None, None, "End time must be after start time"
+    if end - start > MAX_SLOT_LENGTH:
+        return None, None, "Slot is longer than 12 hours"
+    if start <= now:
+        return None, None, "Slot must start in the future"
+    return start, end, None
+
+
+def create_slots(vet_id, proposed_slots, now=None):
+    """
+    Validate a batch of proposed slots and insert the valid ones together.
+
+    Every slot is checked against the vet's existing slots, loaded with one
+    query into an IntervalIndex, and against the slots accepted before it in
+    the same batch. Slots that pass are inserted in one transaction; the
+    others are reported with the reason they were rejected.
+
+    Args:
+        vet_id (int): The user ID of the vet.
+        proposed_slots (list): Dicts with ISO-8601 start_time and end_time.
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        list: One result dict per proposed slot, in order, with index, status
+            ("created" or "rejected") and either id, start_time and end_time
+            or error.
+    """
+    now = now or datetime.utcnow()
+
+    results = []
+    parsed = []
+    for i, proposed in enumerate(proposed_slots):
+        start, end, error = _parse_slot(proposed, now)
+        if error:
+            results.append({"index": i, "status": "rejected", "error": error})
+        else:
+            results.append(None)
+            parsed.append((i, start, end))
+
+    if parsed:
+        # Serialize batches of the same vet so two of them cannot interleave
+        db.session.query(User.id).filter(User.id == vet_id).with_for_update().one()
+        index = load_slot_index(vet_id, min(start for _, start, _ in parsed),
+                                max(end for _, _, end in parsed))
+
+        rows = []
+        for i, start, end in parsed:
+            if index.add(start, end, i):
+                rows.append({"vet_id": vet_id, "start_time": start, "end_time": end,
+                             "is_booked": False, "created_at": now})
+                continue
+            conflict = index.between(start, end)[0][2]
+            results[i] = {
+                "index": i,
+                "status": "rejected",
+                "error": f"Overlaps slot {conflict} in this batch" if isinstance(conflict, int)
+                else "Overlaps an existing slot"
+            }
+
+        if rows:
+            try:
+                db.session.execute(insert(VetAvailability), rows)
+                # Bulk inserts do not return the new IDs on MySQL, so read them back
+                ids = dict(db.session.query(VetAvailability.start_time, VetAvailability.id).filter(
+                    VetAvailability.vet_id == vet_id,
+                    VetAvailability.start_time.in_([row["start_time"] for row in rows])
+                ))
+                db.session.commit()
+            except IntegrityError:
+                # Slots were generated from a rule at the same time; nothing was inserted
+                db.session.rollback()
+                ids = None
+            invalidate_vet_search()
+
+            for i, start, end in parsed:
+                if results[i] is not None:
+                    continue
+                if ids is None:
+                    results[i] = {"index": i, "status": "rejected",
+                                  "error": "Slots changed while saving, please retry"}
+                else:
+                    results[i] = {"index": i, "status": "created", "id": ids.get(start),
+                                  "start_time": start.isoformat(), "end_time": end.isoformat()}
+        else:
+            db.session.commit()
+
+    return results
+
+
+def unmaterialize_slots(vet_id, first_day, last_day=None, rule_id=None):
+    """
+    Delete unbooked generated slots so they can be regenerated or stay removed.
+
+    Slots an appointment still points to, e.g. one that was cancelled, are
+    kept with the appointment's history. The caller commits.
+
+    Args:
+        vet_id (int): The user ID of the vet.
+        first_day (date): The first date to clear.
+        last_day (date): The last date to clear, or None for no limit.
+        rule_id (int): Only clear slots of this rule.
+    """
+    query = VetAvailability.query.filter(
+        VetAvailability.vet_id == vet_id,
+        VetAvailability.rule_id.isnot(None),
+        VetAvailability.is_booked == False,
+        ~VetAvailability.appointment.any(),
+        VetAvailability.start_time >= datetime.combine(first_day, datetime.min.time())
+    )
+    if last_day is not None:
+        query = query.filter(VetAvailability.start_time < datetime.combine(last_day + timedelta(days=1), datetime.min.time()))
+    if rule_id is not None:
+        query = query.filter(VetAvailability.rule_id == rule_id)
+    query.delete(synchronize_session=False)
+    invalidate_vet_search()
+
+
+def rematerialize_days(vet_id, first_day, last_day, now=None):
+    """
+    Regenerate the slots of already expanded rules for a range of days, e.g.
+    after an exception is added or removed. Booked slots are kept.
+
+    Args:
+        vet_id (int): The user ID of the vet.
+        first_day (date): The first date to regenerate.
+        last_day (date): The last date to regenerate.
+        now (datetime): The reference time, defaults to the current UTC time.
+
+    Returns:
+        int: The number of slots created.
+    """
+    now = now or datetime.utcnow()
+    unmaterialize_slots(vet_id, first_day, last_day)
+
+    rules = AvailabilityRule.query.filter(
+        AvailabilityRule.vet_id == vet_id,
+        AvailabilityRule.materialized_until >= first_day
+    ).all()
+    exceptions = AvailabilityException.query.filter(
+        AvailabilityException.vet_id == vet_id,
+        AvailabilityException.date.between(first_day, last_day)
+    ).all()
+    index = load_slot_index(vet_id, datetime.combine(first_day, datetime.min.time()),
+                            datetime.combine(last_day + timedelta(days=1), datetime.min.time()))
+
+    rows = []
+    for rule in rules:
+        for start, end, _ in expand_rules([rule], exceptions, first_day, min(last_day, rule.materialized_until)):
+            if start > now and index.add(start, end, rule.id):
+                rows.append({"vet_id": vet_id, "start_time": start, "end_time": end,
+                             "is_booked": False, "rule_id": rule.id, "created_at": now})
+
+    if rows:
+        db.session.execute(insert(VetAvailability), rows)
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,24 @@
+"""
+This module defines the `flask vet` CLI commands for vet maintenance tasks.
+
+It provides the following:
+- flask vet materialize-slots: Generate slots from recurring rules for the rolling window
+
+Run `flask vet materialize-slots` daily, e.g. from cron, so vets with rules
+keep showing up in searches even if nobody opened their availability.
+"""
+
+from app.models import db, AvailabilityRule
+
+from . import vet_bp
+from .availability import materialize_slots
+
+
+@vet_bp.cli.command('materialize-slots')
+def materialize_all_slots():
+    """
+    Generate the slots of every vet's recurring rules up to the rolling window.
+    """
+    vet_ids = [vet_id for (vet_id,) in db.session.query(AvailabilityRule.vet_id).distinct()]
+    created = sum(materialize_slots(vet_id) for vet_id in vet_ids)
+    print(f"📅 Created {created} slots for {len(vet_ids)} vets")
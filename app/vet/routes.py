@@ -3,28 +3,40 @@ This module defines the routes for vet-related functionalities in the Flask appl
 
 It includes the following routes:
 - Manage availability slots
+- Add many availability slots in one request
 - Delete availability slot
+- Add and delete weekly availability rules
+- Add and delete availability exceptions (days off)
 - View appointments
 - Manage appointments
 - View and update vet profile
 
 Functions:
 - manage_availability(): Allows vets to manage their availability slots.
+- bulk_add_availability(): Allows vets to add a batch of availability slots at once.
 - delete_availability(slot_id): Allows vets to delete an availability slot.
+- add_availability_rule(): Allows vets to add a weekly recurring schedule.
+- delete_availability_rule(rule_id): Allows vets to delete a weekly schedule and its free slots.
+- add_availability_exception(): Allows vets to block a day or part of a day.
+- delete_availability_exception(exception_id): Allows vets to remove a blocked day.
 - view_appointments(): Allows vets to view their appointments.
 - manage_appointment(appointment_id, action): Allows vets to manage appointments.
 - vet_profile(): Allows vets to view and update their profile.
 """
 
-from flask import render_template, request, redirect, url_for, flash, abort
-from app.models import db, VetAvailability, Appointment
+from flask import render_template, request, redirect, url_for, flash, abort, jsonify
+from app.models import db, VetAvailability, Appointment, AvailabilityRule, AvailabilityException
+from app.queries import vet_appointments
 from app.utils import send_email
-from datetime import datetime
+from datetime import datetime, date, time
 from flask_login import login_required, current_user
-from app.sms_utils.sms_service import send_sms
+from app.sms_utils.sms_queue import queue_sms
 from app.sms_utils.sms_templates import appointment_booked_farmer_template, appointment_cancelled_farmer_template
 
 from . import vet_bp
+from .availability import materialize_slots, unmaterialize_slots, rematerialize_days, create_slots, MAX_BULK_SLOTS
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
 @vet_bp.route('/manage_availability', methods=['GET', 'POST'])
 @login_required
@@ -42,45 +54,68 @@ def manage_availability():
         abort(403)
         
     if request.method == 'POST':
-        try:
-            start_time = datetime.fromisoformat(request.form.get('start_time'))
-            end_time = datetime.fromisoformat(request.form.get('end_time'))
-            
-            if start_time >= end_time:
-                flash('End time must be after start time', 'danger')
-                return redirect(url_for('vet.manage_availability'))
-            
-            # check for overlapping slots
-            overlapping = VetAvailability.query.filter(
-                VetAvailability.vet_id == current_user.id,
-                VetAvailability.start_time < end_time,
-                VetAvailability.end_time > start_time
-            ).first()
-            
-            if overlapping:
-                flash('Time slot overlaps with existing availability', 'danger')
-                return redirect(url_for('vet.manage_availability'))
-            
-            new_slot = VetAvailability(
-                vet_id=current_user.id,
-                start_time=start_time,
-                end_time=end_time,
-                is_booked=False
-            )
-            
-            db.session.add(new_slot)
-            db.session.commit()
+        result = create_slots(current_user.id, [{
+            'start_time': request.form.get('start_time'),
+            'end_time': request.form.get('end_time')
+        }])[0]
+        
+        if result['status'] == 'created':
             flash('Availability slot added successfully', 'success')
-            
-        except ValueError:
-            flash('Invalid date/time format', 'danger')
+        else:
+            flash(result['error'], 'danger')
             
         return redirect(url_for('vet.manage_availability'))
     
-    # Get request - show existing slots
+    # Get request - generate any slots due from the weekly rules, then show existing slots
+    materialize_slots(current_user.id)
     slots = VetAvailability.query.filter_by(vet_id=current_user.id)\
             .order_by(VetAvailability.start_time.asc()).all()
-    return render_template('manage_availability.html', slots=slots)
+    rules = AvailabilityRule.query.filter_by(vet_id=current_user.id)\
+            .order_by(AvailabilityRule.weekday.asc(), AvailabilityRule.start_time.asc()).all()
+    exceptions = AvailabilityException.query.filter(
+        AvailabilityException.vet_id == current_user.id,
+        AvailabilityException.date >= datetime.utcnow().date()
+    ).order_by(AvailabilityException.date.asc()).all()
+    return render_template('manage_availability.html', slots=slots, rules=rules, exceptions=exceptions,
+                           weekdays=WEEKDAYS)
+
+@vet_bp.route('/manage_availability/bulk', methods=['POST'])
+@login_required
+def bulk_add_availability():
+    """
+    Route for vets to add many availability slots in one request.
+    
+    Accepts either a JSON array of slots or an object with a "slots" array,
+    each slot carrying ISO-8601 start_time and end_time. Slots that overlap
+    an existing slot or an earlier slot in the batch are rejected; all others
+    are saved together.
+    
+    Returns:
+        Response: JSON with the number of created and rejected slots and a
+        result for each slot, in the order they were sent.
+    """
+    if current_user.user_role != 'vet':
+        return jsonify({"status": "error", "message": "Unauthorized access"}), 403
+    
+    data = request.get_json(silent=True)
+    slots = data.get('slots') if isinstance(data, dict) else data
+    
+    if not isinstance(slots, list) or not slots:
+        return jsonify({"status": "error", "message": "No slots received"}), 400
+    
+    if len(slots) > MAX_BULK_SLOTS:
+        return jsonify({"status": "error", "message": f"Batch exceeds {MAX_BULK_SLOTS} slots"}), 413
+    
+    results = create_slots(current_user.id, slots)
+    created = sum(1 for result in results if result['status'] == 'created')
+    print(f"📅 Vet {current_user.id} added {created} of {len(slots)} slots")
+    
+    return jsonify({
+        "status": "success" if created else "error",
+        "created": created,
+        "rejected": len(results) - created,
+        "results": results
+    }), 200 if created else 400
 
 @vet_bp.route('/manage_availability/<int:slot_id>/delete', methods=['POST'])
 @login_required
@@ -107,6 +142,143 @@ def delete_availability(slot_id):
     
     return redirect(url_for('vet.manage_availability'))
 
+@vet_bp.route('/manage_availability/rules', methods=['POST'])
+@login_required
+def add_availability_rule():
+    """
+    Route for vets to add a weekly recurring schedule.
+    
+    One rule is created per selected weekday, and its slots are generated
+    for the rolling availability window straight away.
+    
+    Returns:
+        Response: Redirects to the manage availability page with a success or error message.
+    """
+    if current_user.user_role != 'vet':
+        abort(403)
+    
+    try:
+        weekdays = sorted({int(day) for day in request.form.getlist('weekdays')})
+        start_time = time.fromisoformat(request.form.get('start_time'))
+        end_time = time.fromisoformat(request.form.get('end_time'))
+        slot_minutes = int(request.form.get('slot_minutes') or 60)
+        valid_from = date.fromisoformat(request.form.get('valid_from')) if request.form.get('valid_from') \
+            else datetime.utcnow().date()
+        valid_until = date.fromisoformat(request.form.get('valid_until')) if request.form.get('valid_until') else None
+    except (TypeError, ValueError):
+        flash('Invalid schedule', 'danger')
+        return redirect(url_for('vet.manage_availability'))
+    
+    if not weekdays or any(day not in range(7) for day in weekdays):
+        flash('Select at least one weekday', 'danger')
+    elif start_time >= end_time:
+        flash('End time must be after start time', 'danger')
+    elif not 5 <= slot_minutes <= 8 * 60:
+        flash('Slot length must be between 5 minutes and 8 hours', 'danger')
+    elif valid_until and valid_until < valid_from:
+        flash('The schedule must end after it starts', 'danger')
+    else:
+        for weekday in weekdays:
+            db.session.add(AvailabilityRule(
+                vet_id=current_user.id,
+                weekday=weekday,
+                start_time=start_time,
+                end_time=end_time,
+                slot_minutes=slot_minutes,
+                valid_from=valid_from,
+                valid_until=valid_until
+            ))
+        db.session.commit()
+        created = materialize_slots(current_user.id)
+        flash(f'Weekly schedule added, {created} slots created', 'success')
+    
+    return redirect(url_for('vet.manage_availability'))
+
+@vet_bp.route('/manage_availability/rules/<int:rule_id>/delete', methods=['POST'])
+@login_required
+def delete_availability_rule(rule_id):
+    """
+    Route for vets to delete a weekly schedule.
+    
+    The schedule's free upcoming slots are removed with it; booked slots stay.
+    
+    Args:
+        rule_id (int): The ID of the rule to delete.
+    
+    Returns:
+        Response: Redirects to the manage availability page with a success message.
+    """
+    rule = AvailabilityRule.query.get_or_404(rule_id)
+    if rule.vet_id != current_user.id:
+        abort(403)
+    
+    unmaterialize_slots(current_user.id, datetime.utcnow().date(), rule_id=rule.id)
+    db.session.delete(rule)
+    db.session.commit()
+    flash('Weekly schedule deleted', 'success')
+    return redirect(url_for('vet.manage_availability'))
+
+@vet_bp.route('/manage_availability/exceptions', methods=['POST'])
+@login_required
+def add_availability_exception():
+    """
+    Route for vets to block a whole day or part of a day, e.g. for a holiday.
+    
+    Free slots generated for that day are regenerated without the blocked time.
+    
+    Returns:
+        Response: Redirects to the manage availability page with a success or error message.
+    """
+    if current_user.user_role != 'vet':
+        abort(403)
+    
+    try:
+        day = date.fromisoformat(request.form.get('date'))
+        start_time = time.fromisoformat(request.form.get('start_time')) if request.form.get('start_time') else None
+        end_time = time.fromisoformat(request.form.get('end_time')) if request.form.get('end_time') else None
+    except (TypeError, ValueError):
+        flash('Invalid date/time format', 'danger')
+        return redirect(url_for('vet.manage_availability'))
+    
+    if (start_time is None) != (end_time is None):
+        flash('Give both a start and an end time, or neither to block the whole day', 'danger')
+    elif start_time and start_time >= end_time:
+        flash('End time must be after start time', 'danger')
+    else:
+        db.session.add(AvailabilityException(
+            vet_id=current_user.id,
+            date=day,
+            start_time=start_time,
+            end_time=end_time,
+            reason=request.form.get('reason', '')[:255]
+        ))
+        rematerialize_days(current_user.id, day, day)
+        flash('Day off added', 'success')
+    
+    return redirect(url_for('vet.manage_availability'))
+
+@vet_bp.route('/manage_availability/exceptions/<int:exception_id>/delete', methods=['POST'])
+@login_required
+def delete_availability_exception(exception_id):
+    """
+    Route for vets to remove a blocked day and get its slots back.
+    
+    Args:
+        exception_id (int): The ID of the exception to delete.
+    
+    Returns:
+        Response: Redirects to the manage availability page with a success message.
+    """
+    exception = AvailabilityException.query.get_or_404(exception_id)
+    if exception.vet_id != current_user.id:
+        abort(403)
+    
+    day = exception.date
+    db.session.delete(exception)
+    rematerialize_days(current_user.id, day, day)
+    flash('Day off removed', 'success')
+    return redirect(url_for('vet.manage_availability'))
+
 @vet_bp.route('/appointments', methods=['GET'])
 @login_required
 def view_appointments():
@@ -119,10 +291,8 @@ def view_appointments():
     if current_user.user_role != 'vet':
         abort(403)
         
-    appointments = Appointment.query.filter(
-        Appointment.vet_id == current_user.id
-    ).all()
-    return render_template('vet_appointments.html', appointments=appointments)
+    page = vet_appointments(current_user.id, request.args.get('cursor'))
+    return render_template('vet_appointments.html', appointments=page.items, next_cursor=page.next_cursor)
 
 @vet_bp.route('/appointment/<int:appointment_id>/<action>', methods=['POST'])
 @login_required
@@ -146,7 +316,7 @@ def manage_appointment(appointment_id, action):
         appointment.status = 'confirmed'
         message = f"Hello {appointment.farmer.last_name},\n\nYour appointment with Dr {current_user.last_name} has been confirmed."
         msg = 'Subject: Appointment Confirmed\n\n{}'.format(message)
-        send_sms(
+        queue_sms(
             appointment.farmer.phone.lstrip('+'),
             appointment_booked_farmer_template(
                 current_user.last_name,
@@ -159,7 +329,7 @@ def manage_appointment(appointment_id, action):
         appointment.status = 'cancelled'
         message = f"Hello {appointment.farmer.last_name},\n\nYour appointment with Dr {current_user.last_name} has been cancelled."
         msg = 'Subject: Appointment Cancelled\n\n{}'.format(message)
-        send_sms(
+        queue_sms(
             appointment.farmer.phone.lstrip('+'),
             appointment_cancelled_farmer_template(
                 current_user.last_name,
@@ -196,8 +366,6 @@ def vet_profile():
     if current_user.user_role != 'vet':
         abort(403)
     
-    appointments = Appointment.query.filter(
-        Appointment.vet_id == current_user.id
-    ).all()
+    page = vet_appointments(current_user.id, request.args.get('cursor'))
     
-    return render_template('vet_profile.html', appointments=appointments)
+    return render_template('vet_profile.html', appointments=page.items, next_cursor=page.next_cursor)
@@ -0,0 +1,153 @@
+"""
+Load test for concurrent slot booking.
+
+Creates a vet with a few free slots and many farmers, then fires hundreds of
+concurrent booking attempts at those slots, including retries that reuse an
+idempotency key. Afterwards it checks that every slot has at most one active
+appointment and that retried attempts did not create extra appointments.
+
+Run it against a development database (it uses the app's configured one) and
+it removes everything it created when done:
+
+    python scripts/booking_load_test.py --slots 10 --farmers 50 --attempts 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app  # noqa: E402
+from app.models import db, User, Farmer, Vet, Livestock, VetAvailability, Appointment  # noqa: E402
+from app.farmer.booking import book_slot, SlotUnavailable  # noqa: E402
+
+
+def create_fixtures(slot_count, farmer_count):
+    """
+    Create a vet with free slots and farmers with one livestock each.
+
+    Returns:
+        tuple: (vet user ID, slot IDs, list of (farmer user ID, livestock ID), run tag)
+    """
+    tag = uuid.uuid4().hex[:8]
+    start = datetime.utcnow() + timedelta(days=1)
+
+    vet = User(first_name='Load', last_name=f'Vet {tag}', email=f'vet-{tag}@loadtest.invalid',
+               phone=f'+999{tag}', password_hash='!', user_role='vet')
+    vet.vet_profile = Vet(license_number=f'LOAD-{tag}', specialization='general',
+                          verification_document_path='-')
+    db.session.add(vet)
+    db.session.flush()
+
+    slots = [
+        VetAvailability(vet_id=vet.id, start_time=start + timedelta(hours=i),
+                        end_time=start + timedelta(hours=i, minutes=30), is_booked=False)
+        for i in range(slot_count)
+    ]
+    db.session.add_all(slots)
+
+    farmers = []
+    for i in range(farmer_count):
+        farmer = User(first_name='Load', last_name=f'Farmer {i}', email=f'farmer-{tag}-{i}@loadtest.invalid',
+                      phone=f'+998{tag}{i}', password_hash='!', user_role='farmer')
+        farmer.farmer_profile = Farmer(livestock_type='cattle', animal_count=1)
+        db.session.add(farmer)
+        db.session.flush()
+        livestock = Livestock(farmer_id=farmer.farmer_profile.id, name='Cow', age=1, breed='Load', weight=1)
+        db.session.add(livestock)
+        db.session.flush()
+        farmers.append((farmer.id, livestock.id))
+
+    db.session.commit()
+    return vet.id, [slot.id for slot in slots], farmers, tag
+
+
+def remove_fixtures(vet_id, farmers):
+    """
+    Delete everything created by create_fixtures().
+    """
+    farmer_ids = [farmer_id for farmer_id, _ in farmers]
+    Appointment.query.filter(Appointment.vet_id == vet_id).delete(synchronize_session=False)
+    VetAvailability.query.filter(VetAvailability.vet_id == vet_id).delete(synchronize_session=False)
+    for user in User.query.filter(User.id.in_(farmer_ids + [vet_id])):
+        db.session.delete(user)
+    db.session.commit()
+
+
+def attempt(app, farmer_id, livestock_id, slot_id, idempotency_key):
+    """
+    Make one booking attempt in its own app context and session.
+
+    Returns:
+        str: "booked", "replayed" or "rejected".
+    """
+    with app.app_context():
+        try:
+            _, created = book_slot(farmer_id, slot_id, livestock_id, idempotency_key=idempotency_key)
+            return "booked" if created else "replayed"
+        except SlotUnavailable:
+            return "rejected"
+        finally:
+            db.session.remove()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slots', type=int, default=10, help='Number of slots to fight over')
+    parser.add_argument('--farmers', type=int, default=50, help='Number of farmers booking')
+    parser.add_argument('--attempts', type=int, default=500, help='Number of booking attempts')
+    parser.add_argument('--concurrency', type=int, default=64, help='Number of concurrent attempts')
+    parser.add_argument('--retry-rate', type=float, default=0.2,
+                        help='Fraction of attempts sent twice with the same idempotency key')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        vet_id, slot_ids, farmers, tag = create_fixtures(args.slots, args.farmers)
+
+    jobs = []
+    for i in range(args.attempts):
+        farmer_id, livestock_id = random.choice(farmers)
+        job = (farmer_id, livestock_id, random.choice(slot_ids), f'{tag}-{i}')
+        jobs.append(job)
+        if random.random() < args.retry_rate:
+            jobs.append(job)
+    random.shuffle(jobs)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = Counter(executor.map(lambda job: attempt(app, *job), jobs))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        try:
+            appointments = Appointment.query.filter(Appointment.vet_id == vet_id).all()
+            active = Counter(a.slot_id for a in appointments if a.status in ('pending', 'confirmed'))
+            double_booked = {slot_id: count for slot_id, count in active.items() if count > 1}
+            booked_slots = VetAvailability.query.filter(
+                VetAvailability.vet_id == vet_id, VetAvailability.is_booked == True
+            ).count()
+
+            print(f"Attempts:        {len(jobs)} ({len(jobs) - args.attempts} retries) in {elapsed:.2f}s "
+                  f"({len(jobs) / elapsed:.0f}/s)")
+            print(f"Outcomes:        {dict(outcomes)}")
+            print(f"Appointments:    {len(appointments)} for {len(slot_ids)} slots ({booked_slots} marked booked)")
+            print(f"Double bookings: {len(double_booked)}")
+
+            ok = not double_booked and len(appointments) == booked_slots == outcomes["booked"]
+            print("✅ No double bookings" if ok else f"❌ Booking invariant violated: {double_booked}")
+        finally:
+            remove_fixtures(vet_id, farmers)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark the chatbot's language detection against plain langdetect.
+
+It runs a set of labelled English and Swahili questions through:
+
+- langdetect.detect() per call, as the chatbot did before: unseeded, with
+  profiles loaded by the first call
+- app.chatbot.language.LanguageDetector: keywords, conversation memos and
+  seeded langdetect with profiles loaded up front
+
+and reports the cold-start cost, per-message latency, accuracy and how many
+messages plain langdetect labelled inconsistently across repeated runs:
+
+    python scripts/language_detection_benchmark.py
+    python scripts/language_detection_benchmark.py --rounds 20 --repeats 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import langdetect  # noqa: E402
+from app.chatbot.language import LanguageDetector  # noqa: E402
+
+SAMPLES = [
+    ("my cow has fever what to do", "en"),
+    ("goat not eating", "en"),
+    ("help", "en"),
+    ("okay thanks", "en"),
+    ("how much water should a calf drink every day?", "en"),
+    ("My chickens are coughing and some have died, is it a disease?", "en"),
+    ("when should I vaccinate my sheep", "en"),
+    ("the pig has diarrhea since yesterday and is weak", "en"),
+    ("is it normal for a cow to have a temperature of 39.5 after calving?", "en"),
+    ("ng'ombe wangu ana homa nifanye nini", "sw"),
+    ("mbuzi hali", "sw"),
+    ("habari daktari", "sw"),
+    ("jambo rafiki", "sw"),
+    ("kuku wangu wanakohoa na wengine wamekufa", "sw"),
+    ("ndama anaharisha tangu jana, nimpe dawa gani?", "sw"),
+    ("je, ni lini nipe kondoo chanjo?", "sw"),
+    ("nguruwe wangu hali chakula na ana homa kali sana", "sw"),
+    ("Ng'ombe wangu amezaa jana na sasa hataki kusimama, nifanye nini tafadhali?", "sw"),
+]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(name, timings, correct, total):
+    print(f"{name:<22} mean {statistics.mean(timings) * 1000:7.3f} ms  "
+          f"p95 {percentile(timings, 0.95) * 1000:7.3f} ms  "
+          f"accuracy {correct}/{total}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10, help="Times each message is detected")
+    parser.add_argument("--repeats", type=int, default=10, help="Runs per message for the consistency check")
+    args = parser.parse_args()
+
+    # Plain langdetect, cold: the first call loads every profile
+    started = time.perf_counter()
+    langdetect.detect(SAMPLES[0][0])
+    print(f"langdetect first call  {(time.perf_counter() - started) * 1000:7.1f} ms (profile loading)")
+
+    started = time.perf_counter()
+    detector = LanguageDetector()
+    detector._load_factory()
+    print(f"detector startup       {(time.perf_counter() - started) * 1000:7.1f} ms (once, in init_app)\n")
+
+    timings, correct = [], 0
+    for _ in range(args.rounds):
+        for text, expected in SAMPLES:
+            started = time.perf_counter()
+            language = langdetect.detect(text)
+            timings.append(time.perf_counter() - started)
+            correct += language == expected
+    report("langdetect.detect", timings, correct, len(timings))
+
+    timings, correct = [], 0
+    for _ in range(args.rounds):
+        for text, expected in SAMPLES:
+            started = time.perf_counter()
+            language, _ = detector.from_langdetect(text)
+            timings.append(time.perf_counter() - started)
+            correct += language == expected
+    report("seeded langdetect", timings, correct, len(timings))
+
+    timings, correct = [], 0
+    for _ in range(args.rounds):
+        for number, (text, expected) in enumerate(SAMPLES):
+            # Each sample stands for a conversation that keeps asking in its language
+            started = time.perf_counter()
+            language = detector.detect(text, conversation_id=number)
+            timings.append(time.perf_counter() - started)
+            correct += language == expected
+    report("LanguageDetector", timings, correct, len(timings))
+    print(f"  answered by: {detector.metrics()['sources']}\n")
+
+    unstable = []
+    for text, _ in SAMPLES:
+        answers = {langdetect.detect(text) for _ in range(args.repeats)}
+        if len(answers) > 1:
+            unstable.append((text, sorted(answers)))
+    print(f"unseeded langdetect gave varying answers for {len(unstable)}/{len(SAMPLES)} messages")
+    for text, answers in unstable:
+        print(f"  {text!r}: {', '.join(answers)}")
+
+
+if __name__ == "__main__":
+    main()
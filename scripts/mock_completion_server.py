@@ -0,0 +1,128 @@
+"""
+Serve a mock OpenAI chat completions API for testing the chatbot locally.
+
+It answers POST /v1/chat/completions like the real API, both streamed and
+not, with a canned reply split into words. --first-token-ms and --token-ms
+simulate the model's time to first token and its generation speed, so the
+chatbot's streaming and its metrics (GET /chatbot/metrics) can be checked
+without an API key:
+
+    python scripts/mock_completion_server.py --port 8001 --first-token-ms 400 --token-ms 30
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=test python wsgi.py
+"""
+
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "Keep the animal hydrated, check its temperature twice a day and "
+    "contact a vet if the fever lasts more than two days."
+)
+
+
+def make_handler(reply, first_token_delay, token_delay):
+    """
+    Build a request handler serving a canned reply.
+
+    Args:
+        reply (str): The reply every request gets.
+        first_token_delay (float): Seconds before the first token.
+        token_delay (float): Seconds between tokens.
+
+    Returns:
+        type: The request handler class.
+    """
+    words = reply.split(" ")
+    tokens = [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _chunk(self, payload, completion_id, model):
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, **payload}],
+            }
+
+        def _write_event(self, data):
+            body = f"data: {data}\n\n".encode()
+            self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            model = request.get("model", "mock")
+            completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+            time.sleep(first_token_delay)
+
+            if not request.get("stream"):
+                time.sleep(token_delay * (len(tokens) - 1))
+                body = json.dumps({
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": reply}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            self._write_event(json.dumps(self._chunk(
+                {"delta": {"role": "assistant", "content": ""}, "finish_reason": None}, completion_id, model)))
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(token_delay)
+                self._write_event(json.dumps(self._chunk(
+                    {"delta": {"content": token}, "finish_reason": None}, completion_id, model)))
+            self._write_event(json.dumps(self._chunk({"delta": {}, "finish_reason": "stop"}, completion_id, model)))
+            self._write_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--reply", default=DEFAULT_REPLY, help="Reply every request gets")
+    parser.add_argument("--first-token-ms", type=float, default=300, help="Delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=25, help="Delay between tokens")
+    args = parser.parse_args()
+
+    handler = make_handler(args.reply, args.first_token_ms / 1000, args.token_ms / 1000)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"🤖 Mock completion server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark password hashing methods and their effect on the event loop.
+
+For each method it measures how long one hash takes, then runs a simulated
+login storm under eventlet twice: once hashing on the hub, as the app did
+before, and once through eventlet's thread pool, as app.passwords does. A
+ticker green thread measures how late it wakes up while the storm runs; that
+lag is what every socket and telemetry loop in the app would see.
+
+Pick the strongest method whose single-hash time is acceptable for a login,
+then set it as PASSWORD_HASH_METHOD:
+
+    python scripts/password_hash_benchmark.py --target-ms 250
+    python scripts/password_hash_benchmark.py --methods pbkdf2:sha256:600000 scrypt:16384:8:1 --storm 50
+"""
+
+import eventlet
+eventlet.monkey_patch()
+
+import argparse  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+
+from eventlet import tpool  # noqa: E402
+from werkzeug.security import generate_password_hash, check_password_hash  # noqa: E402
+
+DEFAULT_METHODS = [
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:1000000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'scrypt:65536:8:1',
+]
+
+
+def time_hash(method, rounds):
+    """
+    Measure the time of one hash with a method.
+
+    Returns:
+        float: The median time in milliseconds.
+    """
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        generate_password_hash('correct horse battery staple', method=method)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def storm(password_hash, logins, offload):
+    """
+    Verify a password concurrently while measuring event loop lag.
+
+    Args:
+        password_hash (str): The hash to verify against.
+        logins (int): Number of concurrent verifications.
+        offload (bool): Verify in eventlet's thread pool instead of on the hub.
+
+    Returns:
+        tuple: (total seconds, worst ticker lag in ms)
+    """
+    interval = 0.005
+    lags = []
+    running = True
+
+    def ticker():
+        while running:
+            expected = time.perf_counter() + interval
+            eventlet.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    def login():
+        if offload:
+            tpool.execute(check_password_hash, password_hash, 'correct horse battery staple')
+        else:
+            check_password_hash(password_hash, 'correct horse battery staple')
+
+    ticker_thread = eventlet.spawn(ticker)
+    eventlet.sleep(interval * 2)
+
+    started = time.perf_counter()
+    pool = eventlet.GreenPool(logins)
+    for _ in range(logins):
+        pool.spawn(login)
+    pool.waitall()
+    elapsed = time.perf_counter() - started
+
+    running = False
+    ticker_thread.wait()
+    return elapsed, max(lags) if lags else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--methods', nargs='+', default=DEFAULT_METHODS, help='Werkzeug method strings to compare, weakest first')
+    parser.add_argument('--rounds', type=int, default=5, help='Hashes per method for the timing')
+    parser.add_argument('--storm', type=int, default=20, help='Concurrent logins in the storm test')
+    parser.add_argument('--target-ms', type=float, default=250,
+                        help='Longest acceptable single-hash time for the recommendation')
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'hash ms':>8} {'storm s':>8} {'hub lag ms':>11} {'tpool s':>8} {'tpool lag ms':>13}")
+    recommended = None
+    for method in args.methods:
+        hash_ms = time_hash(method, args.rounds)
+        password_hash = generate_password_hash('correct horse battery staple', method=method)
+        inline_s, inline_lag = storm(password_hash, args.storm, offload=False)
+        offload_s, offload_lag = storm(password_hash, args.storm, offload=True)
+        print(f"{method:<24} {hash_ms:>8.1f} {inline_s:>8.2f} {inline_lag:>11.1f} {offload_s:>8.2f} {offload_lag:>13.1f}")
+        if hash_ms <= args.target_ms:
+            recommended = method
+
+    if recommended:
+        print(f"\n✅ Strongest method within {args.target_ms:.0f} ms: PASSWORD_HASH_METHOD={recommended}")
+    else:
+        print(f"\n⚠️ No method hashes within {args.target_ms:.0f} ms on this machine")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Regression tests for removing generated vet availability slots.
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import unittest
+from datetime import date, datetime, time, timedelta
+
+os.environ.setdefault('SECRET_KEY', 'test')
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.config import Config
+from app.models import (User, Farmer, Vet, Livestock, AvailabilityRule, AvailabilityException,
+                        VetAvailability, Appointment)
+from app.vet.availability import materialize_slots
+
+
+class CancelledAppointmentSlotTest(unittest.TestCase):
+    """
+    A free slot that a cancelled appointment still points to must survive
+    removing its day or its rule instead of failing on the foreign key.
+    """
+
+    def setUp(self):
+        Config.SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        Config.WTF_CSRF_ENABLED = False
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        event.listen(db.engine, 'connect', lambda connection, _: connection.execute('PRAGMA foreign_keys=ON'))
+        db.engine.dispose()
+        db.create_all()
+
+        farmer = User(first_name='Test', last_name='Farmer', email='farmer@example.com', phone='+254700000001',
+                      user_role='farmer', password_hash='x')
+        farmer.farmer_profile = Farmer(livestock_type='cattle', animal_count=1)
+        self.vet = User(first_name='Test', last_name='Vet', email='vet@example.com', phone='+254700000002',
+                        user_role='vet', password_hash='x')
+        self.vet.vet_profile = Vet(license_number='L1', specialization='cattle',
+                                   verification_document_path='doc', is_verified=True)
+        db.session.add_all([farmer, self.vet])
+        db.session.commit()
+        livestock = Livestock(farmer_id=farmer.farmer_profile.id, name='Cow', age=2, breed='Friesian', weight=300)
+        db.session.add(livestock)
+
+        self.day = date.today() + timedelta(days=1)
+        self.rule = AvailabilityRule(vet_id=self.vet.id, weekday=self.day.weekday(), start_time=time(9),
+                                     end_time=time(12), slot_minutes=60, valid_from=date.today())
+        db.session.add(self.rule)
+        db.session.commit()
+        materialize_slots(self.vet.id, until=self.day)
+
+        # Book the first slot of the day, then cancel the appointment
+        slot = VetAvailability.query.filter(
+            VetAvailability.vet_id == self.vet.id,
+            VetAvailability.start_time == datetime.combine(self.day, time(9))
+        ).one()
+        self.slot_id = slot.id
+        db.session.add(Appointment(farmer_id=farmer.id, vet_id=self.vet.id, slot_id=slot.id,
+                                   livestock_id=livestock.id, status='cancelled'))
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.vet.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_add_exception_keeps_referenced_slot(self):
+        response = self.client.post('/vet/manage_availability/exceptions', data={'date': self.day.isoformat()})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(AvailabilityException.query.count(), 1)
+        self.assertIsNotNone(db.session.get(VetAvailability, self.slot_id))
+        self.assertEqual(VetAvailability.query.filter(VetAvailability.id != self.slot_id).count(), 0)
+
+    def test_delete_rule_keeps_referenced_slot(self):
+        response = self.client.post(f'/vet/manage_availability/rules/{self.rule.id}/delete')
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNone(db.session.get(AvailabilityRule, self.rule.id))
+        self.assertIsNotNone(db.session.get(VetAvailability, self.slot_id))
+        self.assertEqual(VetAvailability.query.filter(VetAvailability.id != self.slot_id).count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()